@@ -1,66 +1,79 @@
 import streamlit as st
 import leafmap.foliumap as leafmap
 
+from utils.alerts import get_alert_engine
+
 # Set page configuration
 st.set_page_config(
-    page_title="AI-Driven Dengue Prevention System",
-    layout="wide",
-    page_icon="🌍"
+    page_title="AI-Driven Dengue Prevention System", layout="wide", page_icon="🌍"
 )
 
+# Start the background alert engine with the server, not with the alerts page
+get_alert_engine()
+
 # Customize the sidebar
 st.sidebar.title("About")
-st.sidebar.info("""
+st.sidebar.info(
+    """
 **UN SDG 3 — Good Health and Well-being**  
 This application utilizes AI and geospatial technologies to predict and prevent dengue outbreaks, offering actionable insights to safeguard vulnerable communities.
-""")
+"""
+)
 
 # Page title and introduction
 st.title("🌍 AI-Driven Dengue Prevention System")
-st.markdown("""
+st.markdown(
+    """
 ### Predict and prevent outbreaks of infectious diseases in vulnerable communities
 This app leverages **AI-driven predictive analytics** and **geospatial technologies** to identify, forecast, and mitigate the risks of infectious disease outbreaks, such as dengue, malaria, and chikungunya, in vulnerable regions.
-""")
+"""
+)
 
 # Define pages with their descriptions
 pages = [
     {
         "title": "Dengue Risk Map",
         "path": "/Dengue_Risk_Map",
-        "description": "Analyze dengue risk with a heatmap."
+        "description": "Analyze dengue risk with a heatmap.",
     },
     {
         "title": "Fumigation Progress",
         "path": "/Fumigation_Progress",
-        "description": "Displays progress of fumigation by government staff."
+        "description": "Displays progress of fumigation by government staff.",
     },
     {
         "title": "Reported Cases",
         "path": "/Reported_Cases",
-        "description": "Visualize historically reported cases."
+        "description": "Visualize historically reported cases.",
     },
     {
         "title": "Environmental Factors",
         "path": "/Environmental_Factors",
-        "description": "Analyze weather and environmental risks."
+        "description": "Analyze weather and environmental risks.",
+    },
+    {
+        "title": "Community Alerts",
+        "path": "/Community_Alerts",
+        "description": "Alerts sent when risk or cases cross thresholds.",
     },
     {
         "title": "Stagnant Water",
         "path": "/Stagnant_Water",
-        "description": "Satellite-based analysis of stagnant water and associated risk."
+        "description": "Satellite-based analysis of stagnant water and associated risk.",
     },
     {
         "title": "Guidelines",
         "path": "/Guidelines",
-        "description": "Prevention and Awareness."
-    }
+        "description": "Prevention and Awareness.",
+    },
 ]
 
 # Cards with Page Descriptions in Multi-Column Layout
 st.header("Explore the App")
 
 # Add custom CSS for card styling and row spacing
-st.markdown("""
+st.markdown(
+    """
 <style>
 .card {
     border: 1px solid #e1e4e8;
@@ -92,11 +105,10 @@ st.markdown("""
     margin-bottom: 80px;  /* Increase space between rows */
 }
 </style>
-""", unsafe_allow_html=True)
+""",
+    unsafe_allow_html=True,
+)
 
-# Create two rows of three columns each
-row1_col1, row1_col2, row1_col3 = st.columns(3)  # First row
-row2_col1, row2_col2, row2_col3 = st.columns(3)  # Second row
 
 # Function to create a card
 def create_card(page):
@@ -109,27 +121,18 @@ def create_card(page):
     </a>
     """
 
-# Add cards to the first row
-with row1_col1:
-    st.markdown(create_card(pages[0]), unsafe_allow_html=True)
-with row1_col2:
-    st.markdown(create_card(pages[1]), unsafe_allow_html=True)
-with row1_col3:
-    st.markdown(create_card(pages[2]), unsafe_allow_html=True)
-
-# Add spacing between rows
-st.markdown('<div class="row-spacing"></div>', unsafe_allow_html=True)
-
-# Add cards to the second row
-with row2_col1:
-    st.markdown(create_card(pages[3]), unsafe_allow_html=True)
-with row2_col2:
-    st.markdown(create_card(pages[4]), unsafe_allow_html=True)
-with row2_col3:
-    st.markdown(create_card(pages[5]), unsafe_allow_html=True)
+
+# Add cards in rows of three columns each, with spacing between rows
+for start in range(0, len(pages), 3):
+    if start:
+        st.markdown('<div class="row-spacing"></div>', unsafe_allow_html=True)
+    for column, page in zip(st.columns(3), pages[start : start + 3]):
+        with column:
+            st.markdown(create_card(page), unsafe_allow_html=True)
 
 # Custom CSS for key feature boxes
-st.markdown("""
+st.markdown(
+    """
 <style>
 .key-feature-box {
     background-color: rgba(70, 130, 180, 0.5); /* darker blue with some opacity */
@@ -150,14 +153,17 @@ li {
     margin-bottom: 10px;
 }
 </style>
-""", unsafe_allow_html=True)
+""",
+    unsafe_allow_html=True,
+)
 
 # Key Features section
 st.header("Key Features")
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    st.markdown("""
+    st.markdown(
+        """
         <div class="key-feature-box">
             <strong>Real-Time Risk Mapping</strong>  
             <ul>
@@ -165,10 +171,13 @@ with col1:
                 <li>Identify stagnant water sources and mosquito breeding grounds.</li>
             </ul>
         </div>
-    """, unsafe_allow_html=True)
+    """,
+        unsafe_allow_html=True,
+    )
 
 with col2:
-    st.markdown("""
+    st.markdown(
+        """
         <div class="key-feature-box">
             <strong>Predictive Analytics</strong>  
             <ul>
@@ -176,10 +185,13 @@ with col2:
                 <li>AI models trained on historical outbreak data.</li>
             </ul>
         </div>
-    """, unsafe_allow_html=True)
+    """,
+        unsafe_allow_html=True,
+    )
 
 with col3:
-    st.markdown("""
+    st.markdown(
+        """
         <div class="key-feature-box">
             <strong>Community Alerts</strong>  
             <ul>
@@ -187,18 +199,23 @@ with col3:
                 <li>Engage communities in reporting and prevention efforts.</li>
             </ul>
         </div>
-    """, unsafe_allow_html=True)
+    """,
+        unsafe_allow_html=True,
+    )
 
 # Call-to-action section
 st.header("Get Started")
-st.markdown("""
+st.markdown(
+    """
 Explore the tools and features of this app to understand how AI and geospatial technologies can help prevent infectious disease outbreaks.  
 **Select a page from the sidebar** or click on the cards above to get started!
-""")
+"""
+)
 
 # Footer
 st.markdown("---")
-st.markdown("""
+st.markdown(
+    """
 **Disclaimer**: This app is a prototype designed for educational and demonstration purposes.  
-""")
-
+"""
+)
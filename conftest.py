@@ -0,0 +1 @@
+# Lets tests under tests/ import the app's ``utils`` package from the repository root
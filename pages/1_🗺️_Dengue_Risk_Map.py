@@ -1,13 +1,19 @@
 import streamlit as st
-import leafmap.foliumap as leafmap
-import pandas as pd
+import streamlit.components.v1 as components
+
+from utils.hotspots import get_hotspots
+from utils.neighborhoods import get_neighborhood_index, get_neighborhood_risk
+from utils.risk_data import RISK_FACTORS, load_risk_data
+from utils.risk_map import render_risk_map
+from utils.tiles import get_tile_pyramid
 
 st.set_page_config(layout="wide")
 
 st.title("Dengue Risk Heatmap")
 
 # Custom CSS to add a translucent blue background to the markdown
-st.markdown("""
+st.markdown(
+    """
     <style>
         .translucent-blue-box {
             background-color: rgba(70, 130, 180, 0.5); /* Translucent blue with opacity */
@@ -23,49 +29,64 @@ st.markdown("""
             margin-bottom: 20px;
         }
     </style>
-""", unsafe_allow_html=True)
+""",
+    unsafe_allow_html=True,
+)
 
 # Apply the class to the markdown text
-st.markdown("""
+st.markdown(
+    """
     <div class="translucent-blue-box">
         <p>A comprehensive visualization of dengue risk levels, indicating areas with varying degrees of risk. The map illustrates the influence of specific factors, including weather conditions, stagnant water coverage, and historical dengue cases, on the overall risk assessment.</p>
     </div>
-""", unsafe_allow_html=True)
+""",
+    unsafe_allow_html=True,
+)
 
 # Add some space after the description
 st.markdown('<div class="spacer"></div>', unsafe_allow_html=True)
 
-# Load data
-data = pd.read_csv('https://raw.githubusercontent.com/QamarAyesha/test-data/refs/heads/main/lahore_dengue_data.csv')
+# Load data (downloaded once, then served from the local cache)
+data = load_risk_data()
+
+# Pre-aggregated grid cells, built once per dataset version
+pyramid = get_tile_pyramid(data, data.attrs["version"])
+
+# Neighborhood polygons joined with their risk rollup, for the choropleth layer
+neighborhood_risk = get_neighborhood_risk(data, data.attrs["version"])
+neighborhoods = get_neighborhood_index().polygons.join(neighborhood_risk, on="name")
+
+# Ranked Gi* hotspots, patched incrementally when only some points change
+hotspots = get_hotspots(data, data.attrs["version"])
 
-# Dropdown for factor selection
-factor_mapping = {
-    'Overall Risk': 'Total_Risk_Score',
-    'Weather': 'Weather_Risk_Score',
-    'Stagnant water': 'Water_Coverage_Risk_Score',
-    'Past Cases': 'Past_Cases_Risk_Score'
-}
-factor_label = st.selectbox("Select Risk Factor to Display", list(factor_mapping.keys()), index=0)
-factor = factor_mapping[factor_label]
+# Map view
+map_center = [31.5204, 74.3587]
+map_zoom = 12
+map_height = 700
 
-# Add some space between the dropdown and the map
+# Factors are map layers; switching happens in the map, without a rerun
+st.caption(
+    f"Use the layer control on the map to switch between {', '.join(RISK_FACTORS)}, "
+    "and to show neighborhoods and hotspots."
+)
+
+# Add some space between the caption and the map
 st.markdown('<div class="spacer"></div>', unsafe_allow_html=True)
 
 # Create layout
 col1, col2 = st.columns([6, 1])
 
 with col1:
-    # Create map
-    m = leafmap.Map(center=[31.5204, 74.3587], zoom=12)
-    m.add_heatmap(
-        data,
-        latitude="Latitude",
-        longitude="Longitude",
-        value=factor,
-        name="Heatmap",
-        radius=20,
+    # Layered map (one heatmap per factor), rendered once per dataset version
+    map_html = render_risk_map(
+        pyramid,
+        data.attrs["version"],
+        map_center,
+        map_zoom,
+        _neighborhoods=neighborhoods,
+        _hotspots=hotspots,
     )
-    m.to_streamlit(height=700)
+    components.html(map_html, height=map_height)
 
 with col2:
     # Color key explanation using gradient bar
@@ -77,8 +98,24 @@ with col2:
             <span style="font-family: Arial, sans-serif; font-size: 10px;">High</span>
         </div>
         """,
-        unsafe_allow_html=True
+        unsafe_allow_html=True,
     )
 
+# Neighborhood summary, highest mean overall risk first
+st.subheader("Risk by Neighborhood")
+st.dataframe(
+    neighborhood_risk.sort_values("Total_Risk_Score_mean", ascending=False).round(3),
+    use_container_width=True,
+)
 
-
+# Ranked target list for field teams
+st.subheader("Hotspots")
+if hotspots.empty:
+    st.info("No statistically significant risk hotspots in the current data.")
+else:
+    index = get_neighborhood_index()
+    codes = index.assign(hotspots["Longitude"], hotspots["Latitude"])
+    targets = hotspots.drop(columns="geometry").assign(
+        Neighborhood=[index.names[code] if code >= 0 else None for code in codes]
+    )
+    st.dataframe(targets.set_index("rank").round(3), use_container_width=True)
@@ -1,76 +1,347 @@
+from datetime import date, timedelta
+
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from utils.feedback import FeedbackQueue
+from utils.fumigation_store import (
+    REPORT_COLUMNS,
+    FumigationStore,
+    city_summary,
+    progress_curves,
+    sector_name,
+)
+from utils.risk_data import load_risk_data
+from utils.routes import (
+    DEFAULT_STOPS,
+    SERVICE_MINUTES,
+    SPEED_KMH,
+    plan_routes,
+    route_summary,
+    top_risk_stops,
+)
+
 # Page Config
-st.set_page_config(page_title='Fumigation Progress', layout='wide')
+st.set_page_config(page_title="Fumigation Progress", layout="wide")
+
+st.title("Fumigation Progress")
+
+# Cities under the current campaign; sectors are the units teams report on
+SEED_PLAN = pd.DataFrame(
+    {
+        "City": ["Lahore", "Karachi", "Islamabad", "Faisalabad", "Multan"],
+        "Latitude": [31.5497, 24.8607, 33.6844, 31.4504, 30.1575],
+        "Longitude": [74.3436, 67.0011, 73.0479, 73.1350, 71.5249],
+        "Sectors": [20, 30, 12, 15, 10],
+    }
+)
+
+
+@st.cache_resource
+def fumigation_store():
+    # One SQLite-backed store shared by every session
+    store = FumigationStore()
+    store.seed_plan(SEED_PLAN)
+    return store
+
+
+# Summaries are cached per store version, so each new report refreshes them
+@st.cache_data(max_entries=8)
+def fumigation_progress(version):
+    store = fumigation_store()
+    plan, sector_days = store.plan(), store.sector_days()
+    return city_summary(sector_days, plan), progress_curves(sector_days, plan)
+
 
-st.title('Fumigation Progress')
+@st.cache_resource
+def feedback_queue():
+    # Submissions are committed by the queue's background writer
+    return FeedbackQueue()
 
-# Load Data (Sample Data)
-data = pd.DataFrame({
-    'City': ['Lahore', 'Karachi', 'Islamabad', 'Faisalabad', 'Multan'],
-    'Progress (%)': [85, 70, 60, 75, 90],
-    'Latitude': [31.5497, 24.8607, 33.6844, 31.4504, 30.1575],
-    'Longitude': [74.3436, 67.0011, 73.0479, 73.1350, 71.5249],
-    'Estimated Completion (Days)': [5, 12, 15, 8, 3]
-})
+
+FEEDBACK_PAGE_SIZE = 20
+
+# The risk-map dataset (and so route planning) covers Lahore
+ROUTE_CITY = "Lahore"
+
+
+# Plans are cached per risk data version and planning inputs
+@st.cache_data(max_entries=8, show_spinner="Planning routes...")
+def team_routes(
+    _risk_data, version, starts, stop_count, budget_minutes, speed, service
+):
+    stops = top_risk_stops(_risk_data, stop_count)
+    return plan_routes(stops, starts, budget_minutes, speed, service)
+
+
+def record_report(city):
+    # Runs before the rerun, so the summaries above already include the report
+    sector = sector_name(st.session_state.report_sector)
+    if not sector:
+        st.session_state.report_error = "Please enter the sector you are reporting on."
+        return
+    fumigation_store().report(
+        pd.DataFrame(
+            {
+                "Date": [st.session_state.report_date],
+                "City": [city],
+                "Sector": [sector],
+                "Team": [st.session_state.report_team.strip() or None],
+                "Progress": [st.session_state.report_progress],
+            }
+        )
+    )
+    st.session_state.report_saved = f"Report recorded for {city}, sector {sector}."
+
+
+def import_reports(upload):
+    try:
+        count = fumigation_store().report(pd.read_csv(upload))
+    except (ValueError, pd.errors.ParserError) as e:
+        st.session_state.report_error = f"Could not import the reports: {e}"
+    else:
+        st.session_state.report_saved = f"Recorded {count} reports."
+
+
+store = fumigation_store()
+data, curves = fumigation_progress(store.version())
 
 # City Selector
-selected_city = st.selectbox('Select a city to view progress:', data['City'])
+selected_city = st.selectbox("Select a city to view progress:", data["City"])
 
 # Display City Progress
-city_data = data[data['City'] == selected_city]
-st.metric(label='Fumigation Progress', value=f"{city_data['Progress (%)'].values[0]}%")
-st.write(f"Estimated Completion: {city_data['Estimated Completion (Days)'].values[0]} days")
+city_data = data[data["City"] == selected_city].iloc[0]
+st.metric(
+    label="Fumigation Progress",
+    value=f"{city_data['Progress (%)']:.0f}%",
+    delta=f"{city_data['Daily Rate (%)']:.1f}% per day",
+)
+if pd.isna(city_data["Estimated Completion (Days)"]):
+    st.write("Estimated Completion: not enough recent reports to estimate.")
+else:
+    st.write(
+        f"Estimated Completion: {city_data['Estimated Completion (Days)']:.0f} days"
+    )
 
 # Map Visualization
 st.write("### City Progress Overview")
 fig = px.scatter_mapbox(
-    data, lat='Latitude', lon='Longitude', size='Progress (%)',
-    color='Progress (%)', hover_name='City', zoom=5,
-    mapbox_style='carto-positron', color_continuous_scale='Blues'
+    data.assign(Size=data["Progress (%)"].clip(lower=5)),
+    lat="Latitude",
+    lon="Longitude",
+    size="Size",
+    color="Progress (%)",
+    hover_name="City",
+    zoom=5,
+    range_color=[0, 100],
+    hover_data={
+        "Size": False,
+        "Daily Rate (%)": ":.1f",
+        "Estimated Completion (Days)": True,
+    },
+    mapbox_style="carto-positron",
+    color_continuous_scale="Blues",
 )
 st.plotly_chart(fig, use_container_width=True)
 
-# Progress Timeline with Fixed Scaling
-st.write("### Estimated Fumigation Progress Over Time")
+# Progress Timeline from reported progress, projected at the current rate
+st.write("### Fumigation Progress Over Time")
 
-# Get the estimated completion days for the selected city
-estimated_completion_days = city_data['Estimated Completion (Days)'].values[0]
-initial_progress = city_data['Progress (%)'].values[0] / 100  # Normalize to [0, 1]
+if selected_city in curves.columns and curves[selected_city].any():
+    timeline_data = pd.DataFrame(
+        {
+            "Date": curves.index,
+            "Progress (%)": curves[selected_city].to_numpy() / 100,
+            "Series": "Reported",
+        }
+    )
+    eta = city_data["Estimated Completion (Days)"]
+    if not pd.isna(eta) and eta > 0:
+        projected_days = pd.date_range(curves.index[-1], periods=int(eta) + 1, freq="D")
+        projected = city_data["Progress (%)"] + city_data["Daily Rate (%)"] * np.arange(
+            len(projected_days)
+        )
+        timeline_data = pd.concat(
+            [
+                timeline_data,
+                pd.DataFrame(
+                    {
+                        "Date": projected_days,
+                        "Progress (%)": np.minimum(projected, 100) / 100,
+                        "Series": "Projected",
+                    }
+                ),
+            ],
+            ignore_index=True,
+        )
 
-timeline_data = pd.DataFrame({
-    'Day': range(1, estimated_completion_days + 1),
-    'Progress (%)': [initial_progress * (day / estimated_completion_days) for day in range(1, estimated_completion_days + 1)]
-})
+    fig_timeline = px.line(
+        timeline_data,
+        x="Date",
+        y="Progress (%)",
+        color="Series",
+        title=f"Progress Timeline for {selected_city}",
+        markers=True,
+        line_dash="Series",
+    )
 
+    # Format the Y-axis to show percentage format
+    fig_timeline.update_layout(
+        yaxis=dict(
+            tickformat=".0%",  # Show as percentages
+            range=[0, 1],  # Set Y-axis range to [0, 1] for percentages
+        )
+    )
 
-# Plotting the timeline with fixed progress
-fig_timeline = px.line(
-    timeline_data, x='Day', y='Progress (%)',
-    title=f'Progress Timeline for {selected_city}',
-    markers=True, line_shape='spline'  # Smooth curve
-)
+    # Display the timeline plot
+    st.plotly_chart(fig_timeline, use_container_width=True)
+else:
+    st.info(f"No fumigation progress has been reported for {selected_city} yet.")
 
-# Format the Y-axis to show percentage format
-fig_timeline.update_layout(
-    yaxis=dict(
-        tickformat=".0%",  # Show as percentages
-        range=[0, 1]  # Set Y-axis range to [0, 1] for percentages
+# Progress reports from field teams
+st.write("### Report Progress")
+with st.form("report_form"):
+    st.date_input("Date", value=date.today(), key="report_date")
+    st.text_input("Sector", key="report_sector")
+    st.text_input("Team", key="report_team")
+    st.slider(
+        "Sector fumigated (%)",
+        min_value=0,
+        max_value=100,
+        value=0,
+        key="report_progress",
+    )
+    st.form_submit_button(
+        "Submit Report", on_click=record_report, args=(selected_city,)
     )
+
+uploaded_reports = st.file_uploader(
+    f"Upload team reports (CSV with columns {', '.join(REPORT_COLUMNS)})", type="csv"
 )
+if uploaded_reports is not None:
+    st.button("Import Reports", on_click=import_reports, args=(uploaded_reports,))
+
+if "report_error" in st.session_state:
+    st.error(st.session_state.pop("report_error"))
+elif "report_saved" in st.session_state:
+    st.success(st.session_state.pop("report_saved"))
+
+with st.expander("Latest reports"):
+    st.dataframe(store.recent_reports(selected_city), use_container_width=True)
 
+# Route planning over the highest-risk points
+st.write("### Plan Team Routes")
+st.caption(
+    f"Routes visit the highest-risk points of the {ROUTE_CITY} risk map, nearest first, then shortened."
+)
+route_depot = data[data["City"] == ROUTE_CITY].iloc[0]
+team_starts = st.data_editor(
+    pd.DataFrame(
+        {
+            "Team": [f"Team {n}" for n in range(1, 4)],
+            "Latitude": [route_depot["Latitude"]] * 3,
+            "Longitude": [route_depot["Longitude"]] * 3,
+        }
+    ),
+    num_rows="dynamic",
+    use_container_width=True,
+    key="team_starts",
+)
+route_cols = st.columns(4)
+stop_count = route_cols[0].number_input(
+    "High-risk stops", min_value=1, max_value=5000, value=DEFAULT_STOPS
+)
+shift_hours = route_cols[1].number_input(
+    "Shift length (hours, 0 for no limit)", min_value=0.0, value=8.0, step=0.5
+)
+speed = route_cols[2].number_input(
+    "Travel speed (km/h)", min_value=1.0, value=SPEED_KMH
+)
+service = route_cols[3].number_input(
+    "Minutes per stop", min_value=0.0, value=SERVICE_MINUTES
+)
 
-# Display the timeline plot
-st.plotly_chart(fig_timeline, use_container_width=True)
+team_starts = team_starts.dropna()
+try:
+    risk_data = load_risk_data()
+except OSError:
+    risk_data = None  # offline with no cached copy; the rest of the page still works
+if risk_data is None:
+    st.info("Route planning is unavailable until the risk map data can be loaded.")
+elif team_starts.empty:
+    st.info("Add at least one team start point to plan routes.")
+else:
+    routes = team_routes(
+        risk_data,
+        risk_data.attrs["version"],
+        team_starts.reset_index(drop=True),
+        int(stop_count),
+        shift_hours * 60 or None,
+        speed,
+        service,
+    )
+    st.caption(f"{len(routes)} of {int(stop_count)} stops fit into the teams' shifts.")
+    st.dataframe(route_summary(routes).round(1), use_container_width=True)
+    fig_routes = px.line_mapbox(
+        routes,
+        lat="Latitude",
+        lon="Longitude",
+        color="Team",
+        hover_data=["Order", "Total_Risk_Score"],
+        zoom=11,
+        mapbox_style="carto-positron",
+    )
+    fig_routes.update_traces(mode="lines+markers")
+    st.plotly_chart(fig_routes, use_container_width=True)
+    with st.expander("Visit order"):
+        st.dataframe(routes.round(3), use_container_width=True)
 
 # Feedback Form
 st.write("### Provide Feedback")
-feedback = st.text_area('Do you have any concerns or suggestions about the fumigation process?')
-if st.button('Submit Feedback'):
-    st.success('Thank you for your feedback!')
-
-st.write("Stay informed and help keep your city safe from dengue.")
+feedback = st.text_area(
+    "Do you have any concerns or suggestions about the fumigation process?"
+)
+if st.button("Submit Feedback"):
+    if not feedback.strip():
+        st.error("Please write your feedback before submitting.")
+    elif feedback_queue().submit(selected_city, feedback):
+        st.success("Thank you for your feedback!")
+    else:
+        st.error(
+            "We are receiving a lot of feedback right now. Please try again in a moment."
+        )
 
+with st.expander("Review feedback"):
+    if feedback_queue().last_error:
+        st.warning(
+            f"Some feedback could not be saved yet and will be retried: {feedback_queue().last_error}"
+        )
+    review_city = st.selectbox(
+        "City", ["All"] + data["City"].tolist(), key="review_city"
+    )
+    review_dates = st.date_input(
+        "Submitted between", value=(date.today() - timedelta(days=30), date.today())
+    )
+    start, end = (
+        review_dates if len(review_dates) == 2 else (review_dates[0], review_dates[0])
+    )
+    city_filter = None if review_city == "All" else review_city
+    total = feedback_queue().count(city_filter, start, end)
+    if total:
+        page_count = (total - 1) // FEEDBACK_PAGE_SIZE + 1
+        review_page = (
+            st.number_input("Page", min_value=1, max_value=page_count, value=1) - 1
+        )
+        st.caption(f"{total} submissions, page {review_page + 1} of {page_count}")
+        st.dataframe(
+            feedback_queue().page(
+                review_page, FEEDBACK_PAGE_SIZE, city_filter, start, end
+            ),
+            use_container_width=True,
+        )
+    else:
+        st.info("No feedback for this selection.")
 
+st.write("Stay informed and help keep your city safe from dengue.")
@@ -1,10 +1,22 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
 
-# Initialize session state to store reported cases data
-if "reported_cases" not in st.session_state:
-    st.session_state.reported_cases = pd.DataFrame({
+from utils.case_store import (
+    CASE_COLUMNS,
+    LINE_LIST_COLUMNS,
+    MONTHS,
+    WIDE_COLUMNS,
+    CaseStore,
+    case_records,
+)
+from utils.forecast import DEFAULT_HORIZON, forecast_cases
+
+# Cases the store starts with before anything is reported
+SEED_CASES = pd.DataFrame(
+    {
         "City": ["Lahore", "Karachi", "Islamabad", "Faisalabad", "Multan"],
         "Year": [2023, 2023, 2023, 2023, 2023],
         "January": [10, 5, 8, 12, 15],
@@ -18,65 +30,168 @@ if "reported_cases" not in st.session_state:
         "September": [120, 80, 75, 90, 100],
         "October": [10, 8, 20, 15, 25],
         "November": [2, 0, 0, 5, 8],
-        "December": [0, 1, 3, 2, 4]
-    })
+        "December": [0, 1, 3, 2, 4],
+    }
+)
+
+
+@st.cache_resource
+def case_store():
+    # One SQLite-backed store shared by every session
+    store = CaseStore()
+    store.seed(SEED_CASES)
+    return store
+
+
+# Reads are cached per store version, so any write invalidates them
+@st.cache_data(max_entries=64)
+def case_table(version, city=None, year=None):
+    return case_store().wide(city, year)
+
+
+@st.cache_data(max_entries=1)
+def case_totals(version):
+    # Yearly per-city totals come from the store's incrementally kept rollup
+    return case_store().yearly_totals()
+
+
+@st.cache_data(max_entries=64)
+def case_chart(version, city=None, year=None):
+    # Figure JSON per (city, year, version); switching filters reuses it
+    series = case_store().query(city, year)
+    series["Date"] = pd.to_datetime(
+        {"year": series["Year"], "month": series["Month"], "day": 1}
+    )
+    fig = px.line(
+        series,
+        x="Date",
+        y="Cases",
+        color="City",
+        markers=True,
+        labels={"Cases": "Number of Cases"},
+        title="Reported Dengue Cases Over Time",
+    )
+    fig.update_layout(
+        xaxis_title="Month",
+        yaxis_title="Number of Cases",
+        legend_title="City",
+        xaxis_tickformat="%b %Y",
+        template="plotly_white",
+    )
+    return fig.to_json()
+
+
+@st.cache_data(max_entries=16)
+def case_forecast(version, horizon):
+    # Every city is fitted in one pass, once per data version
+    return forecast_cases(case_store().query(), horizon)
+
+
+@st.cache_data(max_entries=64)
+def forecast_chart(version, horizon, city=None):
+    forecast = case_forecast(version, horizon)
+    if city is not None:
+        forecast = forecast[forecast["City"] == city]
+    fig = go.Figure()
+    for name, rows in forecast.groupby("City"):
+        if city is not None:
+            # Shaded 80% interval for a single city
+            fig.add_trace(
+                go.Scatter(
+                    x=list(rows["Date"]) + list(rows["Date"][::-1]),
+                    y=list(rows["Upper"]) + list(rows["Lower"][::-1]),
+                    fill="toself",
+                    fillcolor="rgba(99, 110, 250, 0.2)",
+                    line={"width": 0},
+                    hoverinfo="skip",
+                    name="80% interval",
+                )
+            )
+        fig.add_trace(
+            go.Scatter(
+                x=rows["Date"], y=rows["Forecast"], mode="lines+markers", name=name
+            )
+        )
+    fig.update_layout(
+        title="Forecast Cases",
+        xaxis_title="Month",
+        yaxis_title="Number of Cases",
+        xaxis_tickformat="%b %Y",
+        template="plotly_white",
+    )
+    return fig.to_json()
+
+
+def save_edits(base, editor_key):
+    # Apply only the rows the editor reports as edited, added or deleted
+    try:
+        changed = case_store().apply_edits(base, st.session_state[editor_key])
+    except ValueError as e:
+        st.session_state.edit_error = str(e)
+    else:
+        st.session_state.edit_saved = changed
+
 
 # Streamlit page
 def main():
     st.set_page_config(page_title="Reported Dengue Cases", layout="wide")
     st.title("Reported Dengue Cases")
-    st.write("View and manage reported dengue cases data city-wise, month-wise, and year-wise.")
+    st.write(
+        "View and manage reported dengue cases data city-wise, month-wise, and year-wise."
+    )
+
+    store = case_store()
+    version = store.version()
+
+    totals = case_totals(version)
 
     # Add filters for city and year
     st.subheader("Filters")
-    cities = st.session_state.reported_cases["City"].unique().tolist()
-    selected_city = st.selectbox("Select City", ["All"] + cities)
-    years = st.session_state.reported_cases["Year"].unique().tolist()
-    selected_year = st.selectbox("Select Year", ["All"] + years)
-
-    # Filter data based on user selection
-    filtered_data = st.session_state.reported_cases.copy()
-    if selected_city != "All":
-        filtered_data = filtered_data[filtered_data["City"] == selected_city]
-    if selected_year != "All":
-        filtered_data = filtered_data[filtered_data["Year"] == selected_year]
+    selected_city = st.selectbox(
+        "Select City", ["All"] + sorted(totals["City"].unique().tolist())
+    )
+    selected_year = st.selectbox(
+        "Select Year", ["All"] + sorted(totals["Year"].unique().tolist())
+    )
+
+    # Filters are applied by the store's query
+    city_filter = None if selected_city == "All" else selected_city
+    year_filter = None if selected_year == "All" else selected_year
+    filtered_data = case_table(version, city_filter, year_filter)
 
     # Display filtered data
     st.subheader("Reported Cases Data")
+    selected_totals = totals
+    if city_filter is not None:
+        selected_totals = selected_totals[selected_totals["City"] == city_filter]
+    if year_filter is not None:
+        selected_totals = selected_totals[selected_totals["Year"] == year_filter]
+    st.metric("Total Reported Cases", f"{int(selected_totals['Cases'].sum()):,}")
     st.dataframe(filtered_data, use_container_width=True)
 
     # Visualize data
     st.subheader("Visualization")
     if not filtered_data.empty:
-        # Melt the data for visualization
-        melted_data = filtered_data.melt(
-            id_vars=["City", "Year"],
-            value_vars=[
-                "January", "February", "March", "April", "May", "June",
-                "July", "August", "September", "October", "November", "December"
-            ],
-            var_name="Month",
-            value_name="Number of Cases"
-        )
-        melted_data["Year-Month"] = melted_data["Month"] + " " + melted_data["Year"].astype(str)
-
-        # Plot the data using Plotly
-        fig = px.line(
-            melted_data,
-            x="Year-Month",
-            y="Number of Cases",
-            color="City",
-            markers=True,
-            title="Reported Dengue Cases Over Time"
-        )
-        fig.update_layout(
-            xaxis_title="Year-Month",
-            yaxis_title="Number of Cases",
-            legend_title="City",
-            xaxis_tickangle=-45,
-            template="plotly_white"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        history_column, forecast_column = st.columns([3, 2])
+        with history_column:
+            fig = pio.from_json(case_chart(version, city_filter, year_filter))
+            st.plotly_chart(fig, use_container_width=True)
+        with forecast_column:
+            horizon = st.slider(
+                "Forecast months", min_value=1, max_value=12, value=DEFAULT_HORIZON
+            )
+            forecast = case_forecast(version, horizon)
+            if city_filter is not None:
+                forecast = forecast[forecast["City"] == city_filter]
+            st.plotly_chart(
+                pio.from_json(forecast_chart(version, horizon, city_filter)),
+                use_container_width=True,
+            )
+            st.dataframe(
+                forecast.assign(Date=forecast["Date"].dt.strftime("%b %Y")).round(1),
+                use_container_width=True,
+                hide_index=True,
+            )
     else:
         st.info("No data available for visualization.")
 
@@ -84,66 +199,93 @@ def main():
     st.subheader("Add New Data")
     with st.form("add_data_form"):
         city = st.selectbox(
-            "City",
-            ["Lahore", "Karachi", "Islamabad", "Faisalabad", "Multan", "Other"]
+            "City", ["Lahore", "Karachi", "Islamabad", "Faisalabad", "Multan", "Other"]
         )
         year = st.number_input("Year", min_value=2000, max_value=2100, value=2023)
         month = st.selectbox(
             "Month",
             [
-                "January", "February", "March", "April", "May", "June",
-                "July", "August", "September", "October", "November", "December"
-            ]
+                "January",
+                "February",
+                "March",
+                "April",
+                "May",
+                "June",
+                "July",
+                "August",
+                "September",
+                "October",
+                "November",
+                "December",
+            ],
         )
         cases = st.number_input("Number of Cases", min_value=0, value=0)
         submit_button = st.form_submit_button("Add Data")
 
         if submit_button:
             if year and month and cases >= 0:
-                # Check if the city and year already exist in the data
-                existing_entry = st.session_state.reported_cases[
-                    (st.session_state.reported_cases["City"] == city) &
-                    (st.session_state.reported_cases["Year"] == year)
-                ]
-                if not existing_entry.empty:
-                    # Update the existing entry
-                    st.session_state.reported_cases.loc[existing_entry.index, month] = cases
-                else:
-                    # Add a new entry
-                    new_entry = {
-                        "City": city,
-                        "Year": year,
-                        "January": 0,
-                        "February": 0,
-                        "March": 0,
-                        "April": 0,
-                        "May": 0,
-                        "June": 0,
-                        "July": 0,
-                        "August": 0,
-                        "September": 0,
-                        "October": 0,
-                        "November": 0,
-                        "December": 0
-                    }
-                    new_entry[month] = cases
-                    st.session_state.reported_cases = pd.concat(
-                        [st.session_state.reported_cases, pd.DataFrame([new_entry])], ignore_index=True
-                    )
+                store.set_count(city, year, MONTHS.index(month) + 1, cases)
                 st.success("Data added/updated successfully!")
             else:
                 st.error("Please fill in all fields correctly.")
 
+    # Bulk import of line lists or monthly counts
+    st.subheader("Import Cases")
+    st.write(
+        "Upload a line list with one row per case (columns "
+        f"{', '.join(f'`{name}`' for name in LINE_LIST_COLUMNS)}) to add its cases, or a table of monthly "
+        f"counts in long ({', '.join(f'`{name}`' for name in CASE_COLUMNS)}) or wide (`City`, `Year`, one "
+        "column per month) format to overwrite those months."
+    )
+    template = pd.DataFrame(
+        {
+            "City": ["Lahore", "Lahore", "Karachi"],
+            "Date": ["2024-08-03", "2024-08-05", "2024-09-12"],
+        }
+    )
+    st.download_button(
+        "Download line list template",
+        template.to_csv(index=False),
+        file_name="dengue_line_list.csv",
+        mime="text/csv",
+    )
+    uploaded_file = st.file_uploader("Upload cases (CSV)", type="csv")
+    if uploaded_file is not None and st.button("Import"):
+        try:
+            imported = pd.read_csv(uploaded_file)
+            if "Date" in imported.columns:
+                written = store.ingest_line_list(imported)
+                st.success(f"Added {len(imported)} cases across {written} city-months.")
+            elif set(WIDE_COLUMNS) <= set(imported.columns):
+                written = store.upsert_wide(imported)
+                st.success(f"Imported {written} city-months.")
+            else:
+                written = store.upsert(case_records(imported))
+                st.success(f"Imported {written} city-months.")
+        except (ValueError, pd.errors.ParserError) as e:
+            st.error(f"Could not import the uploaded file: {e}")
+
     # Edit existing data
     st.subheader("Edit Data")
-    edited_df = st.data_editor(
-        st.session_state.reported_cases,
+    stored_data = case_table(version)
+    # A new key per version gives the editor a fresh base after every save
+    editor_key = f"case_editor_{version}"
+    st.data_editor(
+        stored_data,
         use_container_width=True,
-        num_rows="dynamic"
+        num_rows="dynamic",
+        key=editor_key,
+        on_change=save_edits,
+        args=(stored_data, editor_key),
     )
-    if not edited_df.equals(st.session_state.reported_cases):
-        st.session_state.reported_cases = edited_df
+    if "edit_error" in st.session_state:
+        st.error(f"Could not save changes: {st.session_state.pop('edit_error')}")
+    elif st.session_state.pop("edit_saved", 0):
         st.success("Data updated successfully!")
 
+    with st.expander("Change log"):
+        st.dataframe(store.audit_log(), use_container_width=True)
+
+
 if __name__ == "__main__":
     main()
@@ -1,33 +1,92 @@
+import os
+
 import streamlit as st
 import numpy as np
 import pandas as pd
 
-# Initialize session state to store results
-if "last_predictions" not in st.session_state:
-    st.session_state.last_predictions = []
-
-# Placeholder for model loading
-def load_model(model_path):
-    st.info("The model is being loaded. Please wait...")
-    # Simulate a delay for loading
-    st.spinner("Loading model...")
-    return None
-
-# Placeholder for prediction
-def predict_risk(model, input_data):
-    st.info("Predicting risk based on environmental data...")
-    # Simulate a delay for prediction
-    st.spinner("Analyzing data...")
-    # Return random risk level (0 = Low, 1 = Medium, 2 = High)
-    return np.random.randint(0, 3)
+from utils.env_model import (
+    FEATURES,
+    INTERVENTIONS,
+    RISK_LEVELS,
+    load_model,
+    predict_batch,
+    predict_risk,
+)
+from utils.env_feed import EnvironmentStore
+from utils.history import RingBufferHistory, SqliteHistory
+from utils.neighborhoods import get_neighborhood_risk
+from utils.paths import DATA_DIR
+from utils.risk_data import load_risk_data
+
+# Lahore neighborhoods offered for prediction
+NEIGHBORHOODS = [
+    "Gulberg",
+    "Defence",
+    "Model Town",
+    "Johar Town",
+    "Faisal Town",
+    "Cantt",
+    "Iqbal Town",
+    "Garden Town",
+    "Wapda Town",
+    "DHA",
+]  # Add more neighborhoods as needed
+
+# Bounds of the environmental inputs (feed readings are clipped to them)
+INPUT_RANGES = {
+    "rainfall": (0.0, None),
+    "temperature": (0.0, None),
+    "humidity": (0.0, 100.0),
+    "vegetation": (-1.0, 1.0),
+}
+
+# Shared prediction history file; set DENGUE_SHARED_HISTORY=1 to enable
+SHARED_HISTORY_PATH = DATA_DIR / "prediction_history.sqlite"
+
+# Predictions shown per dashboard page
+HISTORY_PAGE_SIZE = 20
+
+
+@st.cache_resource
+def shared_history():
+    return SqliteHistory(SHARED_HISTORY_PATH)
+
+
+@st.cache_resource
+def environment_store():
+    return EnvironmentStore()
+
+
+# Pick up new or changed feed files at most once an hour
+@st.cache_data(ttl=3600, show_spinner="Checking the environmental data feed...")
+def refresh_feed():
+    return environment_store().ingest()
+
+
+@st.cache_data(max_entries=4)
+def latest_conditions(version):
+    return environment_store().latest()
+
+
+# Initialize the bounded prediction history (shared across sessions or per session)
+if os.environ.get("DENGUE_SHARED_HISTORY") == "1":
+    prediction_history = shared_history()
+else:
+    if "prediction_history" not in st.session_state:
+        st.session_state.prediction_history = RingBufferHistory()
+    prediction_history = st.session_state.prediction_history
+
 
 # Streamlit page
 def main():
     st.title("📊 Predictive Analytics Using Environmental Data")
-    st.write("Use rainfall, temperature, humidity, and vegetation data to predict mosquito breeding conditions and dengue risk for specific areas in Lahore.")
+    st.write(
+        "Use rainfall, temperature, humidity, and vegetation data to predict mosquito breeding conditions and dengue risk for specific areas in Lahore."
+    )
 
     # Explanation of the model
-    st.markdown("""
+    st.markdown(
+        """
     ### How the Model Works
     This predictive model uses **environmental data** to assess the risk of dengue outbreaks in specific areas of Lahore. The model analyzes the following factors:
     - **Rainfall**: Stagnant water from rainfall is a breeding ground for mosquitoes.
@@ -36,74 +95,111 @@ def main():
     - **Vegetation Index (NDVI)**: Dense vegetation can provide breeding sites for mosquitoes.
 
     Based on these inputs, the model predicts the **risk level** (Low, Medium, or High) and suggests **intervention strategies**.
-    """)
+    """
+    )
 
-    # Placeholder for model path
-    model_path = "model/environmental_model.h5"  # Replace with the path to your model later
-    model = load_model(model_path)
+    # Load the model (cached once per process)
+    model = load_model()
 
     # Location selection (Lahore neighborhoods)
     st.subheader("Select Location in Lahore")
     location = st.selectbox(
         "Choose a neighborhood in Lahore",
-        [
-            "Gulberg", "Defence", "Model Town", "Johar Town", "Faisal Town",
-            "Cantt", "Iqbal Town", "Garden Town", "Wapda Town", "DHA"
-        ],  # Add more neighborhoods as needed
+        NEIGHBORHOODS,
         index=0,  # Default to Gulberg
-        help="Select the neighborhood in Lahore for which you want to predict dengue risk."
+        help="Select the neighborhood in Lahore for which you want to predict dengue risk.",
     )
 
+    # Risk observed on the risk map inside this neighborhood
+    try:
+        risk_data = load_risk_data()
+    except OSError:
+        risk_data = None  # offline with no cached copy; the prediction still works
+    if risk_data is not None:
+        rollup = get_neighborhood_risk(risk_data, risk_data.attrs["version"])
+        if location not in rollup.index:
+            st.caption(f"No risk map boundary is available for {location}.")
+        elif rollup.loc[location, "count"]:
+            mapped = rollup.loc[location]
+            st.caption(
+                f"Risk map for {location}: mean overall risk {mapped['Total_Risk_Score_mean']:.2f}, "
+                f"max {mapped['Total_Risk_Score_max']:.2f} across {int(mapped['count'])} points."
+            )
+
+    # Latest ingested feed readings prefill the inputs
+    refresh_feed()
+    conditions = latest_conditions(environment_store().version())
+    defaults = {
+        "rainfall": 50.0,
+        "temperature": 25.0,
+        "humidity": 60.0,
+        "vegetation": 0.5,
+    }
+    if location in conditions.index:
+        observed = conditions.loc[location]
+        defaults.update(
+            {
+                name: float(np.clip(observed[name], *INPUT_RANGES[name]))
+                for name in FEATURES
+                if pd.notna(observed[name])
+            }
+        )
+        st.caption(
+            f"Inputs are prefilled with feed readings for {location} up to {observed['day']:%d %b %Y}."
+        )
+
     # Input fields for environmental data
     st.subheader("Enter Environmental Data")
     rainfall = st.number_input(
         "Rainfall (mm)",
         min_value=0.0,
-        value=50.0,
-        help="Enter the amount of rainfall in millimeters. Higher rainfall increases the risk of stagnant water."
+        value=defaults["rainfall"],
+        help="Enter the amount of rainfall in millimeters. Higher rainfall increases the risk of stagnant water.",
     )
     temperature = st.number_input(
         "Temperature (°C)",
         min_value=0.0,
-        value=25.0,
-        help="Enter the average temperature in Celsius. Higher temperatures accelerate mosquito breeding."
+        value=defaults["temperature"],
+        help="Enter the average temperature in Celsius. Higher temperatures accelerate mosquito breeding.",
     )
     humidity = st.number_input(
         "Humidity (%)",
         min_value=0.0,
         max_value=100.0,
-        value=60.0,
-        help="Enter the relative humidity percentage. High humidity favors mosquito survival."
+        value=defaults["humidity"],
+        help="Enter the relative humidity percentage. High humidity favors mosquito survival.",
     )
     vegetation = st.number_input(
         "Vegetation Index (NDVI)",
         min_value=-1.0,
         max_value=1.0,
-        value=0.5,
-        help="Enter the Normalized Difference Vegetation Index (NDVI). Dense vegetation can provide breeding sites."
+        value=defaults["vegetation"],
+        help="Enter the Normalized Difference Vegetation Index (NDVI). Dense vegetation can provide breeding sites.",
     )
 
     # Predict button
-    if st.button("Predict Risk", help="Click to predict the dengue risk based on the entered data."):
+    if st.button(
+        "Predict Risk",
+        help="Click to predict the dengue risk based on the entered data.",
+    ):
         # Prepare input data
         input_data = np.array([[rainfall, temperature, humidity, vegetation]])
 
-        # Predict risk level (placeholder)
-        risk_level = predict_risk(model, input_data)
+        # Predict risk level and class probabilities
+        risk_level, probabilities = predict_risk(model, input_data)
 
         # Map risk level to text
-        risk_levels = ["Low", "Medium", "High"]
+        risk_levels = RISK_LEVELS
         risk_text = risk_levels[risk_level]
+        st.write(
+            f"Predicted risk: **{risk_text}** ({probabilities[risk_level]:.0%} confidence)"
+        )
+        st.bar_chart(pd.DataFrame({"Probability": probabilities}, index=risk_levels))
 
         # Suggested intervention strategies
-        interventions = {
-            "Low": "No immediate action required. Monitor conditions regularly.",
-            "Medium": "Increase surveillance and public awareness. Remove stagnant water sources.",
-            "High": "Implement emergency measures. Conduct fogging and distribute mosquito nets."
-        }
-        intervention = interventions[risk_text]
+        intervention = INTERVENTIONS[risk_text]
 
-        # Store results in session state
+        # Store results in the prediction history
         result = {
             "location": location,
             "rainfall": rainfall,
@@ -111,26 +207,77 @@ def main():
             "humidity": humidity,
             "vegetation": vegetation,
             "risk_level": risk_text,
-            "intervention": intervention
+            "confidence": float(probabilities[risk_level]),
+            "intervention": intervention,
+        }
+        prediction_history.append(result)
+
+    # Current risk for every neighborhood with a full set of feed readings
+    complete = conditions.dropna(subset=FEATURES)
+    if not complete.empty:
+        st.subheader("Current Conditions")
+        st.dataframe(
+            predict_batch(model, complete.rename_axis("location").reset_index()),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    # Batch prediction from a file of readings
+    st.subheader("Batch Prediction")
+    st.write(
+        "Upload a CSV of environmental readings to score many neighborhoods or grid cells at once. "
+        f"Required columns: {', '.join(f'`{name}`' for name in FEATURES)}; any other columns (e.g. `location`) are kept."
+    )
+    template = pd.DataFrame(
+        {
+            "location": NEIGHBORHOODS,
+            "rainfall": rainfall,
+            "temperature": temperature,
+            "humidity": humidity,
+            "vegetation": vegetation,
         }
-        st.session_state.last_predictions.append(result)
+    )
+    st.download_button(
+        "Download CSV template",
+        template.to_csv(index=False),
+        file_name="environmental_readings.csv",
+        mime="text/csv",
+    )
+    uploaded_file = st.file_uploader("Upload environmental readings (CSV)", type="csv")
+    if uploaded_file is not None:
+        try:
+            # One vectorized forward pass over every row
+            batch_results = predict_batch(model, pd.read_csv(uploaded_file))
+        except (ValueError, pd.errors.ParserError) as e:
+            st.error(f"Could not score the uploaded file: {e}")
+        else:
+            st.write(f"Scored {len(batch_results)} rows.")
+            st.dataframe(batch_results, use_container_width=True)
+            st.download_button(
+                "Download results",
+                batch_results.to_csv(index=False),
+                file_name="dengue_risk_predictions.csv",
+                mime="text/csv",
+            )
 
     # Display last predictions
     st.subheader("Dynamic Risk Dashboard")
-    if st.session_state.last_predictions:
+    if len(prediction_history):
         st.write("### Latest Predictions")
-        for i, result in enumerate(st.session_state.last_predictions[::-1]):  # Show latest first
-            st.write(f"#### Prediction {i + 1}")
-            st.write(f"- **Location**: {result['location']}, Lahore")
-            st.write(f"- **Rainfall**: {result['rainfall']} mm")
-            st.write(f"- **Temperature**: {result['temperature']} °C")
-            st.write(f"- **Humidity**: {result['humidity']}%")
-            st.write(f"- **Vegetation Index**: {result['vegetation']}")
-            st.write(f"- **Risk Level**: **{result['risk_level']}**")
-            st.write(f"- **Intervention Strategy**: {result['intervention']}")
-            st.write("---")
+        page_count = (len(prediction_history) - 1) // HISTORY_PAGE_SIZE + 1
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1) - 1
+        # One table per page instead of a block of text per prediction
+        st.dataframe(
+            prediction_history.page(page, HISTORY_PAGE_SIZE),
+            use_container_width=True,
+            hide_index=True,
+            column_config={"confidence": st.column_config.NumberColumn(format="%.2f")},
+        )
     else:
-        st.info("No predictions yet. Enter environmental data and click 'Predict Risk' to see results.")
+        st.info(
+            "No predictions yet. Enter environmental data and click 'Predict Risk' to see results."
+        )
+
 
 if __name__ == "__main__":
     main()
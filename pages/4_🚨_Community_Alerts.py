@@ -0,0 +1,52 @@
+import streamlit as st
+import pandas as pd
+
+from utils.alerts import get_alert_engine
+
+st.set_page_config(page_title="Community Alerts", layout="wide")
+
+st.title("🚨 Community Alerts")
+st.write(
+    "Alerts are sent when a neighborhood's mapped risk, a city's reported cases or the predicted "
+    "risk from the latest weather readings cross the thresholds below. The same alert is not repeated "
+    "for an area within the suppression window."
+)
+
+# Seconds between refreshes of the alert list while the page is open
+REFRESH_INTERVAL = 60
+
+# Rules are evaluated by the engine's own thread, whether or not the page is open
+engine = get_alert_engine()
+
+st.subheader("Alert Rules")
+st.dataframe(
+    pd.DataFrame(
+        {
+            "Rule": [rule.name for rule in engine.rules],
+            "Source": [rule.source for rule in engine.rules],
+            "Condition": [rule.describe() for rule in engine.rules],
+        }
+    ),
+    use_container_width=True,
+    hide_index=True,
+)
+st.caption(
+    f"Suppression window: {engine.window / 3600:.0f} hours. "
+    f"Rules are checked every {engine.interval / 60:.0f} minute(s). "
+    f"At most {engine.rate_limit} alerts are sent per minute; the rest follow on later checks."
+)
+
+
+@st.fragment(run_every=REFRESH_INTERVAL)
+def recent_alerts():
+    st.subheader("Recent Alerts")
+    if engine.last_error:
+        st.warning(f"The last alert check had a problem: {engine.last_error}")
+    alerts = engine.recent()
+    if alerts.empty:
+        st.info("No alerts have been sent yet.")
+    else:
+        st.dataframe(alerts, use_container_width=True, hide_index=True)
+
+
+recent_alerts()
@@ -1,166 +1,146 @@
+import json
+
+import numpy as np
 import streamlit as st
-import streamlit.components.v1 as components
-import json  # Import the json module
-
-# Define class labels (ensure this matches the order in Teachable Machine)
-class_labels = {
-    0: "Stagnant Water",  # First class in Teachable Machine
-    1: "Flowing Water",   # Second class in Teachable Machine
-    2: "Dry Land"         # Third class in Teachable Machine
-}
-
-# Teachable Machine TensorFlow.js Integration with File Upload
-def teachable_machine_component(class_labels):
-    # Convert class_labels to JSON string
-    class_labels_json = json.dumps(class_labels)
-    
-    # Use a multi-line string for the HTML/JavaScript code
-    html_code = f"""
-    <div style="font-family: sans-serif; color: var(--text-color);">Teachable Machine Image Model</div>
-    <input type="file" id="file-input" accept="image/*" />
-    <div id="image-container"></div>
-    <div id="label-container" style="margin-top: 20px; font-size: 16px; color: var(--text-color);"></div>
-    <script src="https://cdn.jsdelivr.net/npm/@tensorflow/tfjs@latest/dist/tf.min.js"></script>
-    <script type="text/javascript">
-        // Teachable Machine model URL
-        const modelURL = "https://teachablemachine.withgoogle.com/models/jtmut1SnG/model.json";
-
-        // Class labels
-        const classLabels = {class_labels_json};
-
-        let model;
-
-        // Load the model
-        async function init() {{
-            try {{
-                console.log("Loading model...");
-                console.log("Model URL:", modelURL);
-
-                // Load the model using tf.loadLayersModel
-                model = await tf.loadLayersModel(modelURL);
-                console.log("Model loaded successfully!");
-
-                // Set up file input listener
-                const fileInput = document.getElementById("file-input");
-                fileInput.addEventListener("change", handleFileUpload, false);
-            }} catch (error) {{
-                console.error("Error loading model:", error);
-                const labelContainer = document.getElementById("label-container");
-                labelContainer.innerHTML = `<div style="color: red;">Error loading model: ${{error.message}}</div>`;
-            }}
-        }}
-
-        // Handle file upload
-        async function handleFileUpload(event) {{
-            const file = event.target.files[0];
-            if (!file) return;
-
-            console.log("File uploaded:", file.name);
-
-            // Display the uploaded image
-            const imageContainer = document.getElementById("image-container");
-            imageContainer.innerHTML = "";
-            const img = document.createElement("img");
-            img.src = URL.createObjectURL(file);
-            img.width = 200;
-            img.height = 200;
-            imageContainer.appendChild(img);
-
-            // Wait for the image to load before making predictions
-            img.onload = async () => {{
-                console.log("Image loaded, making predictions...");
-
-                // Preprocess the image
-                const tensor = tf.browser.fromPixels(img)
-                    .resizeNearestNeighbor([224, 224]) // Resize to 224x224
-                    .toFloat() // Convert to float
-                    .div(tf.scalar(255)) // Normalize to [0, 1]
-                    .expandDims(); // Add batch dimension
-
-                // Make predictions
-                await predict(tensor);
-            }};
-        }}
-
-        // Make predictions on the uploaded image
-        async function predict(tensor) {{
-            try {{
-                console.log("Predicting...");
-                const prediction = await model.predict(tensor);
-                console.log("Raw predictions:", prediction);
-
-                // Log the probabilities for each class
-                const probabilities = await prediction.data();
-                console.log("Probabilities:", probabilities);
-
-                // Get the predicted class
-                const predictedClass = tf.argMax(prediction, 1).dataSync()[0];
-                const confidence = tf.max(prediction).dataSync()[0];
-
-                // Get the class label
-                const className = classLabels[predictedClass] || "Unknown Class";
-
-                // Log the results
-                console.log(`Predicted Class: ${{className}}, Confidence: ${{confidence}}`);
-
-                // Determine if stagnant water is detected
-                const hasStagnantWater = predictedClass === 0; // Class 0 is Stagnant Water
-
-                // Display the results
-                const labelContainer = document.getElementById("label-container");
-                labelContainer.innerHTML = `
-                    <div style="margin-bottom: 10px;">
-                        <span style="font-weight: bold; color: var(--text-color);">Predicted Class:</span>
-                        <span style="color: ${{hasStagnantWater ? "red" : "green"}};">${{className}}</span>
-                    </div>
-                    <div style="margin-bottom: 10px;">
-                        <span style="font-weight: bold; color: var(--text-color);">Confidence:</span>
-                        <span style="color: ${{hasStagnantWater ? "red" : "green"}};">${{confidence.toFixed(2)}}</span>
-                    </div>
-                `;
-
-                // Send results back to Streamlit
-                if (typeof Streamlit !== "undefined" && Streamlit.setComponentValue) {{
-                    Streamlit.setComponentValue({{
-                        predicted_class: className,
-                        confidence: confidence,
-                        has_stagnant_water: hasStagnantWater
-                    }});
-                }} else {{
-                    console.error("Streamlit API not available.");
-                }}
-
-                console.log("Predictions completed!");
-            }} catch (error) {{
-                console.error("Error making predictions:", error);
-                const labelContainer = document.getElementById("label-container");
-                labelContainer.innerHTML = `<div style="color: red;">Error making predictions: ${{error.message}}</div>`;
-            }}
-        }}
-
-        // Initialize the model
-        init();
-    </script>
-    <style>
-        :root {{
-            --text-color: black;
-            --background-color: white;
-        }}
-        @media (prefers-color-scheme: dark) {{
-            :root {{
-                --text-color: white;
-                --background-color: #1e1e1e;
-            }}
-        }}
-    </style>
-    """
-
-    # Render the HTML/JavaScript code
-    components.html(html_code, height=500)
+
+from utils.paths import DATA_DIR
+from utils.raster_scan import GeoScene, gdal_available, scan_scene
+from utils.water_model import load_image, load_water_classifier, model_precision
+from utils.water_scan import folder_sources, scan_images, upload_sources
+
+
+# Classify an uploaded image on the server with the bundled Teachable Machine model
+def stagnant_water_classifier(classifier):
+    uploaded_file = st.file_uploader("Upload an image", type=["png", "jpg", "jpeg"])
+    if uploaded_file is None:
+        return None
+
+    image = load_image(uploaded_file)
+    st.image(image, width=200)
+    with st.spinner("Analyzing image..."):
+        return classifier.classify([image])[0]
+
+
+# Server-side folders that may be bulk scanned
+SURVEY_DIR = DATA_DIR / "surveys"
+
+# Probability grids and flagged cells produced from GeoTIFF scenes
+WATER_COVERAGE_DIR = DATA_DIR / "water_coverage"
+
+
+# Bulk scan of many images, a ZIP of tiles, or a folder on the server
+def bulk_scan(classifier):
+    uploaded_files = st.file_uploader(
+        "Upload images or ZIP archives of tiles",
+        type=["png", "jpg", "jpeg", "zip"],
+        accept_multiple_files=True,
+    )
+    folder = st.text_input(
+        "Or scan a survey folder on the server",
+        placeholder="sweep-2025-03",
+        help=f"Folder name relative to {SURVEY_DIR}.",
+    )
+    if not st.button("Run bulk scan"):
+        return
+
+    if uploaded_files:
+        sources = list(upload_sources(uploaded_files))
+    elif folder:
+        folder_path = (SURVEY_DIR / folder).resolve()
+        if not folder_path.is_relative_to(SURVEY_DIR.resolve()):
+            st.error(f"Folder must be inside {SURVEY_DIR}.")
+            return
+        try:
+            sources = list(folder_sources(folder_path))
+        except OSError as e:
+            st.error(f"Could not read folder: {e}")
+            return
+    else:
+        st.warning("Upload files or enter a folder to scan.")
+        return
+    if not sources:
+        st.warning("No images found.")
+        return
+
+    progress_bar = st.progress(0.0, text="Scanning images...")
+    results = scan_images(
+        classifier,
+        sources,
+        progress=lambda done, total: progress_bar.progress(
+            done / total, text=f"Scanned {done} of {total} images"
+        ),
+    )
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Images scanned", len(results))
+    col2.metric(
+        "Stagnant water detected", int(results["has_stagnant_water"].eq(True).sum())
+    )
+    col3.metric("Failed to read", int(results["error"].notna().sum()))
+    st.dataframe(results, use_container_width=True)
+    st.download_button(
+        "Download results",
+        results.to_csv(index=False),
+        file_name="stagnant_water_scan.csv",
+        mime="text/csv",
+    )
+
+
+# Sliding-window scan of a large georeferenced scene
+def scene_scan(classifier):
+    scene_name = st.text_input(
+        "GeoTIFF scene on the server",
+        placeholder="lahore_2025-03.tif",
+        help=f"Path relative to {SURVEY_DIR}. Scenes are read window by window, so any size works.",
+    )
+    threshold = st.slider(
+        "Flag cells with stagnant water probability above", 0.0, 1.0, 0.5, 0.05
+    )
+    if not st.button("Scan scene"):
+        return
+
+    scene_path = (SURVEY_DIR / scene_name).resolve()
+    if (
+        not scene_name
+        or not scene_path.is_relative_to(SURVEY_DIR.resolve())
+        or not scene_path.is_file()
+    ):
+        st.error(f"Enter a GeoTIFF file inside {SURVEY_DIR}.")
+        return
+
+    progress_bar = st.progress(0.0, text="Scanning scene...")
+    grid = scan_scene(
+        classifier,
+        GeoScene.open(scene_path),
+        progress=lambda done, total: progress_bar.progress(
+            done / total, text=f"Scanned {done} of {total} windows"
+        ),
+    )
+
+    # Save outputs next to each other for the risk map's water-coverage layer
+    WATER_COVERAGE_DIR.mkdir(parents=True, exist_ok=True)
+    grid.write_geotiff(WATER_COVERAGE_DIR / f"{scene_path.stem}_probability.tif")
+    grid.to_points().to_csv(
+        WATER_COVERAGE_DIR / f"{scene_path.stem}_points.csv", index=False
+    )
+    flagged = grid.to_geojson(threshold)
+
+    col1, col2 = st.columns(2)
+    col1.metric("Windows scanned", int((~np.isnan(grid.probabilities)).sum()))
+    col2.metric("Cells flagged", len(flagged["features"]))
+    st.download_button(
+        "Download flagged cells (GeoJSON)",
+        json.dumps(flagged),
+        file_name=f"{scene_path.stem}_stagnant_water.geojson",
+        mime="application/geo+json",
+    )
+
 
 # Streamlit App
 def main():
-    st.set_page_config(page_title="Satellite Image Analysis for Dengue Risk", layout="wide")
+    st.set_page_config(
+        page_title="Satellite Image Analysis for Dengue Risk", layout="wide"
+    )
     st.title("Satellite Image Analysis for Dengue Risk")
     st.write("Upload satellite images to detect stagnant water spots.")
 
@@ -169,21 +149,53 @@ def main():
     city = st.selectbox(
         "Choose a city",
         ["Lahore", "Karachi", "Islamabad", "Faisalabad", "Multan"],  # Major cities
-        index=0  # Default to Lahore
+        index=0,  # Default to Lahore
     )
 
-    # Add Teachable Machine Component
+    # Load the model once per process from teachable_model/
+    classifier = load_water_classifier()
+
+    # Add Teachable Machine classifier
     st.subheader("Teachable Machine Model")
-    result = teachable_machine_component(class_labels)
+    result = stagnant_water_classifier(classifier)
 
     # Display predictions dynamically
     if result:
         st.subheader("Prediction Results")
-        st.write(f"🎉 Predicted Class: **{result['predicted_class']}** with {result['confidence']:.2f} confidence!")
+        st.write(
+            f"🎉 Predicted Class: **{result['predicted_class']}** with {result['confidence']:.2f} confidence!"
+        )
         if result["has_stagnant_water"]:
-            st.error("⚠️ Stagnant water detected! This is a potential dengue breeding site. Please take action.")
+            st.error(
+                "⚠️ Stagnant water detected! This is a potential dengue breeding site. Please take action."
+            )
         else:
             st.success("✅ No stagnant water detected. Low dengue risk.")
 
+    # Batch mode for survey sweeps
+    st.subheader("Bulk Scan")
+    bulk_scan(classifier)
+
+    # Large satellite scenes (needs the optional GDAL bindings)
+    if gdal_available():
+        st.subheader("Satellite Scene Scan")
+        scene_scan(classifier)
+
+    precision = model_precision()
+    if precision != "full":
+        st.caption(
+            f"Serving the {precision} model. Its weights are stored quantized to "
+            "shrink the model files but are expanded to float32 on load, so "
+            "predictions run at the same speed as the full-precision model."
+        )
+
+    # Repeated images are answered from the result cache
+    stats = classifier.cache.stats()
+    st.caption(
+        f"Inference cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%} hit rate, {stats['entries']} results in memory)"
+    )
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,122 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.alerts import (
+    AlertEngine,
+    AlertRule,
+    QueueSink,
+    case_changes,
+    versioned_source,
+)
+
+RULE = AlertRule("High risk", "risk", "score", ">=", 0.6, "{area}: {value:.2f}")
+
+
+def _engine(tmp_path, **kwargs):
+    return AlertEngine(
+        rules=[RULE], sink=QueueSink(), path=tmp_path / "alerts.sqlite", **kwargs
+    )
+
+
+def _snapshot(scores):
+    return {
+        "risk": pd.DataFrame(
+            {"score": scores}, index=[f"Area {i}" for i in range(len(scores))]
+        )
+    }
+
+
+def test_rule_fires_on_areas_past_the_threshold():
+    fired = RULE.evaluate(_snapshot([0.2, 0.6, np.nan, 0.9])["risk"])
+    assert fired["area"].tolist() == ["Area 1", "Area 3"]
+
+
+def test_unknown_operator_is_rejected():
+    with pytest.raises(ValueError):
+        AlertRule("Bad", "risk", "score", "==", 1, "")
+
+
+def test_repeats_are_suppressed_within_the_window(tmp_path):
+    engine = _engine(tmp_path, window=3600)
+    assert engine.evaluate(_snapshot([0.9, 0.7]), now=0)["sent"] == 2
+    assert engine.evaluate(_snapshot([0.9, 0.7]), now=60)["suppressed"] == 2
+    assert engine.evaluate(_snapshot([0.9, 0.7]), now=3600)["sent"] == 2
+    # Suppression survives a restart through the alert log
+    assert (
+        _engine(tmp_path, window=3600).evaluate(_snapshot([0.9]), now=3660)["sent"] == 0
+    )
+
+
+def test_rate_limit_sends_the_most_severe_first(tmp_path):
+    engine = _engine(tmp_path, rate_limit=2)
+    counts = engine.evaluate(_snapshot([0.7, 0.95, 0.8]), now=0)
+    assert counts["sent"] == 2 and counts["deferred"] == 1
+    sent = [engine.sink.queue.get_nowait()["area"] for _ in range(2)]
+    assert sent == ["Area 1", "Area 2"]
+
+
+def test_submit_evaluates_in_the_background(tmp_path):
+    engine = _engine(tmp_path)
+    engine.submit("risk", _snapshot([0.9])["risk"])
+    engine.flush()
+    assert engine.recent()["area"].tolist() == ["Area 0"]
+
+
+def test_case_changes():
+    cases = pd.DataFrame(
+        {
+            "City": ["Lahore", "Lahore", "Multan", "Multan"],
+            "Year": 2024,
+            "Month": [5, 6, 5, 6],
+            "Cases": [10, 25, 0, 4],
+        }
+    )
+    changes = case_changes(cases)
+    assert changes.loc["Lahore", "Cases_change"] == pytest.approx(1.5)
+    assert np.isnan(changes.loc["Multan", "Cases_change"])
+    assert case_changes(cases.iloc[:0]).empty
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+def test_sources_are_polled_without_submissions(tmp_path):
+    snapshot = _snapshot([0.9])["risk"]
+    engine = _engine(tmp_path, sources={"risk": lambda: snapshot}, interval=0.05)
+    assert _wait_for(lambda: len(engine.recent()) == 1)
+
+
+def test_deferred_alerts_are_sent_on_later_ticks(tmp_path):
+    # 60 alerts a minute refills one token a second
+    snapshot = _snapshot([0.9] * 61)["risk"]
+    engine = _engine(
+        tmp_path, sources={"risk": lambda: snapshot}, interval=0.05, rate_limit=60
+    )
+    assert _wait_for(lambda: len(engine.recent(limit=100)) == 61)
+
+
+def test_failing_source_does_not_stop_the_others(tmp_path):
+    def offline():
+        raise OSError("network unreachable")
+
+    snapshot = _snapshot([0.9])["risk"]
+    engine = _engine(
+        tmp_path, sources={"cases": offline, "risk": lambda: snapshot}, interval=0.05
+    )
+    assert _wait_for(lambda: len(engine.recent()) == 1)
+    assert "network unreachable" in engine.last_error
+
+
+def test_versioned_source_recomputes_on_new_versions():
+    version, calls = [1], []
+    source = versioned_source(lambda: version[0], lambda: calls.append(1) or len(calls))
+    assert source() == source() == 1
+    version[0] = 2
+    assert source() == 2
@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+
+from utils.case_store import MONTHS, WIDE_COLUMNS, CaseStore, edit_deltas
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CaseStore(tmp_path / "cases.sqlite")
+
+
+def _wide(city, year, counts):
+    return pd.DataFrame([[city, year, *counts]], columns=WIDE_COLUMNS)
+
+
+def test_rollups_follow_upserts_and_deletes(store):
+    store.upsert_wide(_wide("Lahore", 2023, range(12)))
+    store.upsert_wide(_wide("Multan", 2023, [1] * 12))
+    store.set_count("Lahore", 2023, 12, 100)
+    totals = store.yearly_totals().set_index("City")["Cases"]
+    assert totals.to_dict() == {"Lahore": sum(range(11)) + 100, "Multan": 12}
+    assert store.monthly_totals()["Cases"].iloc[0] == 1
+
+    base = store.wide()
+    store.apply_edits(base, {"deleted_rows": [base.index[base["City"] == "Multan"][0]]})
+    assert store.yearly_totals()["City"].tolist() == ["Lahore"]
+    assert store.monthly_totals()["Cases"].iloc[0] == 0
+
+
+def test_line_lists_add_to_stored_counts(store):
+    store.set_count("Karachi", 2024, 3, 5)
+    line_list = pd.DataFrame(
+        {"City": ["Karachi"] * 3, "Date": ["2024-03-02", "2024-03-20", "2024-04-01"]}
+    )
+    assert store.ingest_line_list(line_list) == 2
+    assert store.query("Karachi")["Cases"].tolist() == [7, 1]
+
+
+def test_every_write_bumps_the_version(store):
+    version = store.version()
+    store.set_count("Lahore", 2024, 1, 3)
+    assert store.version() == version + 1
+
+
+def test_edits_are_audited(store):
+    store.upsert_wide(_wide("Lahore", 2023, [0] * 12))
+    base = store.wide()
+    changed = store.apply_edits(base, {"edited_rows": {0: {"March": 40}}})
+    assert changed == 1
+    latest = store.audit_log().iloc[0]
+    assert (latest["city"], latest["month"]) == ("Lahore", 3)
+    assert (latest["old_count"], latest["new_count"]) == (0, 40)
+
+
+def test_renaming_a_row_moves_all_its_months():
+    base = _wide("Lahore", 2023, range(12))
+    records, removed = edit_deltas(base, {"edited_rows": {0: {"City": "Lahor"}}})
+    assert removed == [("Lahore", 2023)]
+    assert len(records) == len(MONTHS)
+    assert {record[0] for record in records} == {"Lahor"}
+
+
+def test_invalid_counts_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.set_count("Lahore", 2024, 13, 1)
+    with pytest.raises(ValueError):
+        store.set_count("Lahore", 2024, 1, -1)
+
+
+def test_seed_only_fills_an_empty_store(store):
+    store.seed(_wide("Lahore", 2023, [1] * 12))
+    store.seed(_wide("Lahore", 2023, [9] * 12))
+    assert store.query()["Cases"].tolist() == [1] * 12
+
+
+def test_rekeying_onto_an_existing_row_is_rejected():
+    base = pd.concat(
+        [_wide("Lahore", 2023, [1] * 12), _wide("Karachi", 2023, [2] * 12)],
+        ignore_index=True,
+    )
+    with pytest.raises(ValueError, match="Karachi 2023 already has a row"):
+        edit_deltas(base, {"edited_rows": {0: {"City": "Karachi"}}})
+    with pytest.raises(ValueError, match="Lahore 2023 already has a row"):
+        edit_deltas(base, {"added_rows": [{"City": "Lahore", "Year": 2023}]})
+    with pytest.raises(ValueError, match="More than one row"):
+        edit_deltas(
+            base,
+            {"added_rows": [{"City": "Multan", "Year": 2023}] * 2},
+        )
+    # Moving onto a row deleted in the same edit replaces it
+    records, removed = edit_deltas(
+        base, {"edited_rows": {0: {"City": "Karachi"}}, "deleted_rows": [1]}
+    )
+    assert removed == [("Lahore", 2023)]
+    assert {record[:2] for record in records} == {("Karachi", 2023)}
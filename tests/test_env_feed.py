@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from utils.env_feed import EnvironmentStore
+
+
+def _stations(path, rainfall):
+    hours = pd.date_range("2024-07-01", periods=48, freq="h")
+    pd.DataFrame(
+        {
+            "Date": hours.repeat(2),
+            "Latitude": np.tile([31.52, 31.45], len(hours)),
+            "Longitude": np.tile([74.35, 74.28], len(hours)),
+            "rainfall": rainfall,
+            "temperature": 31.0,
+            "humidity": 70.0,
+        }
+    ).to_csv(path, index=False)
+
+
+def test_ingest_only_reads_new_and_changed_files(tmp_path):
+    feed = tmp_path / "feed"
+    feed.mkdir()
+    _stations(feed / "stations.csv", rainfall=1.0)
+    (feed / "ndvi_2024-07-01.tif").write_bytes(b"not a raster")
+    store = EnvironmentStore(tmp_path / "environment.sqlite")
+
+    report = store.ingest(feed)
+    assert report["processed"] == 1
+    assert list(report["failed"]) == [str(feed / "ndvi_2024-07-01.tif")]
+    readings = store.readings()
+    assert readings["day"].nunique() == 2
+    np.testing.assert_allclose(readings["rainfall"], 24.0)
+
+    assert store.ingest(feed)["unchanged"] == 1
+    _stations(feed / "stations.csv", rainfall=2.0)
+    assert store.ingest(feed)["processed"] == 1
+    np.testing.assert_allclose(store.latest()["rainfall"], 48.0)
+
+    (feed / "stations.csv").unlink()
+    assert store.ingest(feed)["removed"] == 1
+    assert store.readings().empty
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from utils import env_model
+from utils.env_model import FEATURES, load_model, predict_batch
+
+
+@pytest.fixture
+def model_paths(tmp_path, monkeypatch):
+    shipped = tmp_path / "model" / "environmental_model.npz"
+    monkeypatch.setattr(env_model, "MODEL_PATH", shipped)
+    monkeypatch.setattr(
+        env_model, "TRAINED_MODEL_PATH", tmp_path / "data" / "trained.npz"
+    )
+    monkeypatch.setattr(
+        env_model, "BOOTSTRAP_MODEL_PATH", tmp_path / "data" / "bootstrap.npz"
+    )
+    load_model.clear()
+    yield tmp_path
+    load_model.clear()
+
+
+def test_bootstrap_is_saved_outside_the_model_dir(model_paths):
+    load_model()
+    assert env_model.BOOTSTRAP_MODEL_PATH.exists()
+    assert not (model_paths / "model").exists()
+
+
+def test_trained_model_takes_precedence(model_paths):
+    trained = env_model.train_model(*env_model.synthetic_training_data(300), epochs=5)
+    trained.save(env_model.TRAINED_MODEL_PATH)
+    model = load_model()
+    assert (model.w1 == trained.w1).all()
+    assert not env_model.BOOTSTRAP_MODEL_PATH.exists()
+
+
+def test_predict_batch_rejects_missing_columns(model_paths):
+    data = pd.DataFrame({name: [1.0] for name in FEATURES[1:]})
+    with pytest.raises(ValueError, match=FEATURES[0]):
+        predict_batch(load_model(), data)
+
+
+def test_shipped_model_loads_without_training(tmp_path, monkeypatch):
+    monkeypatch.setattr(env_model, "TRAINED_MODEL_PATH", tmp_path / "trained.npz")
+    monkeypatch.setattr(env_model, "BOOTSTRAP_MODEL_PATH", tmp_path / "bootstrap.npz")
+
+    def train(*args, **kwargs):
+        raise AssertionError("trained on load")
+
+    monkeypatch.setattr(env_model, "train_model", train)
+    load_model.clear()
+    try:
+        model = load_model()
+    finally:
+        load_model.clear()
+    assert model.labels == env_model.RISK_LEVELS
+    assert not env_model.BOOTSTRAP_MODEL_PATH.exists()
@@ -0,0 +1,41 @@
+import sqlite3
+import time
+from datetime import date
+
+from utils.feedback import FeedbackQueue
+
+
+def test_submissions_are_committed_once(tmp_path):
+    feedback = FeedbackQueue(tmp_path / "feedback.sqlite", flush_interval=0.01)
+    assert feedback.submit("Lahore", "Standing water near the park")
+    assert feedback.submit("Lahore", "  standing   WATER near the park ")
+    assert feedback.submit("Multan", "Please spray sector 4")
+    assert not feedback.submit("Multan", "   ")
+    feedback.flush()
+    assert feedback.written == 2 and feedback.duplicates == 1
+    assert feedback.count() == 2
+    assert feedback.count("Lahore", date.today(), date.today()) == 1
+    assert feedback.page(0, 1)["message"].tolist() == ["Please spray sector 4"]
+
+
+def test_failed_writes_are_kept_and_retried(tmp_path):
+    feedback = FeedbackQueue(
+        tmp_path / "feedback.sqlite", flush_interval=0.01, retry_interval=0.05
+    )
+    write = feedback._write
+
+    def locked(batch):
+        raise sqlite3.OperationalError("database is locked")
+
+    feedback._write = locked
+    assert feedback.submit("Lahore", "Standing water near the park")
+    feedback.flush()  # returns even though the commit failed
+    assert feedback.last_error == "OperationalError: database is locked"
+    assert feedback.pending() == 1
+
+    feedback._write = write
+    deadline = time.monotonic() + 5
+    while feedback.count() == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert feedback.count() == 1
+    assert feedback.last_error is None and feedback.pending() == 0
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from utils.forecast import FORECAST_COLUMNS, forecast_cases
+
+
+def _cases(city, start, values):
+    dates = pd.date_range(start, periods=len(values), freq="MS")
+    return pd.DataFrame(
+        {"City": city, "Year": dates.year, "Month": dates.month, "Cases": values}
+    )
+
+
+def test_constant_city_starting_late_has_a_tight_interval():
+    rng = np.random.default_rng(0)
+    cases = pd.concat(
+        [
+            _cases("Lahore", "2020-01-01", rng.integers(50, 500, 48)),
+            _cases("Multan", "2023-01-01", [10] * 12),
+        ]
+    )
+    forecast = forecast_cases(cases, horizon=2)
+    multan = forecast[forecast["City"] == "Multan"]
+    np.testing.assert_allclose(multan["Forecast"], 10.0)
+    np.testing.assert_allclose(multan["Lower"], 10.0)
+    np.testing.assert_allclose(multan["Upper"], 10.0)
+
+
+def test_forecast_covers_every_city_and_month():
+    cases = pd.concat(
+        [
+            _cases("Lahore", "2022-01-01", np.arange(24) * 10),
+            _cases("Karachi", "2022-06-01", np.arange(12) + 5),
+        ]
+    )
+    forecast = forecast_cases(cases, horizon=3)
+    assert list(forecast.columns) == FORECAST_COLUMNS
+    assert len(forecast) == 6
+    assert forecast["Date"].min() == pd.Timestamp("2024-01-01")
+    assert (forecast["Lower"] <= forecast["Forecast"]).all()
+    assert (forecast["Forecast"] <= forecast["Upper"]).all()
+
+
+def test_no_cases_gives_an_empty_forecast():
+    assert forecast_cases(_cases("Lahore", "2024-01-01", [])).empty
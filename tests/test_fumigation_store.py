@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.fumigation_store import FumigationStore, city_summary, progress_curves
+
+PLAN = pd.DataFrame(
+    {
+        "City": ["Lahore", "Multan"],
+        "Latitude": [31.5, 30.2],
+        "Longitude": [74.3, 71.5],
+        "Sectors": [2, 4],
+    }
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FumigationStore(tmp_path / "fumigation.sqlite")
+    store.seed_plan(PLAN)
+    return store
+
+
+def _reports(rows):
+    return pd.DataFrame(rows, columns=["Date", "City", "Sector", "Progress"])
+
+
+def test_sectors_keep_their_best_progress(store):
+    store.report(
+        _reports(
+            [
+                ("2024-07-01", "Lahore", "A", 50),
+                ("2024-07-02", "Lahore", "A", 30),  # a lower re-report
+                ("2024-07-03", "Lahore", "B", 100),
+            ]
+        )
+    )
+    curves = progress_curves(store.sector_days(), store.plan())
+    np.testing.assert_allclose(curves["Lahore"], [25.0, 25.0, 75.0])
+    np.testing.assert_allclose(curves["Multan"], 0.0)
+
+
+def test_summary_estimates_completion(store):
+    store.report(
+        _reports([(f"2024-07-0{day}", "Multan", "A", 25 * day) for day in range(1, 5)])
+    )
+    summary = city_summary(store.sector_days(), store.plan()).set_index("City")
+    assert summary.loc["Multan", "Progress (%)"] == 25.0
+    assert summary.loc["Multan", "Estimated Completion (Days)"] == 12
+    assert np.isnan(summary.loc["Lahore", "Estimated Completion (Days)"])
+
+
+def test_every_report_changes_the_version(store):
+    version = store.version()
+    store.report(_reports([("2024-07-01", "Lahore", "A", 10)]))
+    assert store.version() != version
+    assert len(store) == 1
+
+
+def test_invalid_reports_are_rejected(store):
+    with pytest.raises(ValueError, match="Karachi"):
+        store.report(_reports([("2024-07-01", "Karachi", "A", 10)]))
+    with pytest.raises(ValueError, match="percentage"):
+        store.report(_reports([("2024-07-01", "Lahore", "A", 120)]))
+    assert len(store) == 0
+
+
+def test_plan_keeps_the_order_cities_were_added(tmp_path):
+    store = FumigationStore(tmp_path / "fumigation.sqlite")
+    store.seed_plan(PLAN.iloc[::-1])
+    store.set_plan(PLAN.assign(Sectors=[3, 5]))
+    assert store.plan()["City"].tolist() == ["Multan", "Lahore"]
+
+
+def test_sector_names_are_normalized(store):
+    store.report(
+        _reports(
+            [
+                ("2024-07-01", "Lahore", " a ", 40),
+                ("2024-07-01", "Lahore", "A", 60),
+            ]
+        )
+    )
+    assert store.sector_days()["Sector"].tolist() == ["A"]
+    with pytest.raises(ValueError, match="no Sector"):
+        store.report(_reports([("2024-07-01", "Lahore", "  ", 10)]))
@@ -0,0 +1,39 @@
+import pytest
+
+from utils.history import RingBufferHistory, SqliteHistory
+
+
+def _record(i):
+    return {
+        "time": 1_700_000_000 + i,
+        "location": f"Area {i}",
+        "rainfall": 10.0,
+        "temperature": 30.0,
+        "humidity": 70.0,
+        "vegetation": 0.4,
+        "risk_level": "High",
+        "confidence": 0.9,
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def history(request, tmp_path):
+    if request.param == "memory":
+        return RingBufferHistory(capacity=5)
+    return SqliteHistory(tmp_path / "history.sqlite", capacity=5)
+
+
+def test_history_keeps_the_latest_entries(history):
+    for i in range(8):
+        history.append(_record(i))
+    assert len(history) == 5
+    assert history.page(0, 3)["location"].tolist() == ["Area 7", "Area 6", "Area 5"]
+    assert history.page(1, 3)["location"].tolist() == ["Area 4", "Area 3"]
+    assert history.page(2, 3).empty
+    assert history.page(0, 1)["intervention"].notna().all()
+
+
+def test_clear_empties_the_history(history):
+    history.append(_record(0))
+    history.clear()
+    assert len(history) == 0
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from utils.hotspots import HotspotEngine, HotspotGrid, changed_points
+
+
+def _points(seed=0, n=2000):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(
+        {
+            "Latitude": rng.uniform(31.4, 31.6, n),
+            "Longitude": rng.uniform(74.2, 74.4, n),
+            "Total_Risk_Score": rng.uniform(0.0, 0.3, n),
+        }
+    )
+    # A dense block of high risk in one corner
+    corner = (data["Latitude"] < 31.43) & (data["Longitude"] < 74.23)
+    data.loc[corner, "Total_Risk_Score"] = 1.0
+    return data
+
+
+def test_finds_the_high_risk_corner():
+    hotspots = HotspotGrid.build(_points()).hotspots()
+    top = hotspots.iloc[0]
+    assert top["rank"] == 1
+    assert top["Latitude"] < 31.45 and top["Longitude"] < 74.25
+
+
+def test_missing_weights_are_skipped():
+    data = _points()
+    clean = HotspotGrid.build(data)
+    data.loc[data.index[:50], "Total_Risk_Score"] = np.nan
+    grid = HotspotGrid.build(data)
+    assert np.isfinite(grid.sums).all()
+    assert grid.counts.sum() == clean.counts.sum() - 50
+
+
+def test_changed_points_ignores_unchanged_missing_values():
+    old = _points()
+    old.loc[old.index[:10], "Total_Risk_Score"] = np.nan
+    new = old.copy()
+    new.loc[new.index[20], "Total_Risk_Score"] = 0.9
+    removed, added = changed_points(old, new)
+    assert removed.index.tolist() == added.index.tolist() == [new.index[20]]
+
+
+def test_incremental_refresh_matches_a_rebuild():
+    data = _points()
+    engine = HotspotEngine()
+    engine.refresh(data, 1)
+    changed = data.copy()
+    changed.loc[changed.index[:100], "Total_Risk_Score"] = 0.8
+    changed.loc[changed.index[100], "Total_Risk_Score"] = np.nan
+    patched = engine.refresh(changed, 2)
+    rebuilt = HotspotGrid.build(changed)
+    np.testing.assert_allclose(patched.sums, rebuilt.sums, atol=1e-9)
+    np.testing.assert_array_equal(patched.counts, rebuilt.counts)
@@ -0,0 +1,33 @@
+import sqlite3
+
+import numpy as np
+
+from utils.inference_cache import InferenceCache
+
+
+def _rows(path):
+    with sqlite3.connect(path) as conn:
+        return {key for (key,) in conn.execute("SELECT key FROM predictions")}
+
+
+def test_sqlite_tier_evicts_least_recently_used(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite"
+    clock = iter(range(100))
+    monkeypatch.setattr("utils.inference_cache.time.time", lambda: next(clock))
+    cache = InferenceCache(capacity=1, db_path=path, db_capacity=3)
+    for key in "abc":
+        cache.put_many([key], [[0.5, 0.5]])
+    # Reading "a" back from SQLite makes "b" the oldest row
+    cache.get_many(["a"])
+    cache.put_many(["d"], [[0.1, 0.9]])
+    assert _rows(path) == {"a", "c", "d"}
+
+
+def test_results_survive_a_restart(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    InferenceCache(db_path=path).put_many(["a"], [[0.25, 0.75]])
+    cache = InferenceCache(db_path=path)
+    (found,) = cache.get_many(["a"])
+    np.testing.assert_allclose(found, [0.25, 0.75])
+    assert cache.get_many(["b"]) == [None]
+    assert cache.stats()["hits"] == 1
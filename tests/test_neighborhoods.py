@@ -0,0 +1,46 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from utils.neighborhoods import NeighborhoodIndex, neighborhood_risk
+
+
+def _index():
+    return NeighborhoodIndex(
+        gpd.GeoDataFrame(
+            {"name": ["West", "East", "Empty"]},
+            geometry=[
+                shapely.box(74.0, 31.0, 74.1, 31.1),
+                shapely.box(74.1, 31.0, 74.2, 31.1),
+                shapely.box(75.0, 31.0, 75.1, 31.1),
+            ],
+            crs=4326,
+        )
+    )
+
+
+def test_points_are_located_in_their_neighborhood():
+    index = _index()
+    assert index.assign([74.05, 74.15, 80.0], [31.05, 31.05, 31.05]).tolist() == [
+        0,
+        1,
+        -1,
+    ]
+    assert index.locate(74.15, 31.05) == "East"
+    assert index.locate(80.0, 31.05) is None
+
+
+def test_risk_rollup_per_neighborhood():
+    data = pd.DataFrame(
+        {
+            "Latitude": [31.05, 31.06, 31.05, 40.0],
+            "Longitude": [74.05, 74.06, 74.15, 74.0],
+            "Total_Risk_Score": [0.2, 0.6, 0.9, 1.0],
+        }
+    )
+    rollup = neighborhood_risk(data, _index(), columns=["Total_Risk_Score"])
+    assert rollup["count"].tolist() == [2, 1, 0]
+    assert np.isclose(rollup.loc["West", "Total_Risk_Score_mean"], 0.4)
+    assert rollup.loc["West", "Total_Risk_Score_max"] == 0.6
+    assert np.isnan(rollup.loc["Empty", "Total_Risk_Score_mean"])
@@ -0,0 +1,43 @@
+import numpy as np
+
+from utils.raster_scan import iter_windows, scan_scene
+
+
+class Scene:
+    """In-memory scene with the reader interface of ``GeoScene``."""
+
+    def __init__(self, pixels):
+        self.pixels = pixels
+        self.height, self.width = pixels.shape[:2]
+        self.geotransform = (70.0, 0.001, 0.0, 32.0, 0.0, -0.001)
+        self.projection = ""
+
+    def read(self, xoff, yoff, xsize, ysize):
+        window = self.pixels[yoff : yoff + ysize, xoff : xoff + xsize]
+        return window, (window == 0).all(axis=-1)
+
+
+class Classifier:
+    image_size = 4
+
+    def predict_proba(self, batch):
+        water = (batch.mean(axis=(1, 2, 3)) + 1) / 2
+        return np.column_stack([water, 1 - water])
+
+
+def test_edge_windows_are_clipped():
+    windows = list(iter_windows(10, 5, tile_size=4))
+    assert len(windows) == 6
+    assert windows[-1] == (1, 2, 8, 4, 2, 1)
+
+
+def test_scan_scene_skips_nodata_windows():
+    pixels = np.full((8, 12, 3), 255, dtype=np.uint8)
+    pixels[:4, :4] = 0
+    grid = scan_scene(Classifier(), Scene(pixels), tile_size=4, batch_size=2)
+    assert grid.probabilities.shape == (2, 3)
+    assert np.isnan(grid.probabilities[0, 0])
+    np.testing.assert_allclose(grid.probabilities[~np.isnan(grid.probabilities)], 1.0)
+    points = grid.to_points()
+    assert len(points) == 5
+    assert points["Longitude"].min() > 70.0
@@ -0,0 +1,93 @@
+import io
+import urllib.error
+import urllib.request
+from email.message import Message
+
+import pytest
+
+from utils import risk_data
+from utils.risk_data import fetch_risk_csv
+
+URL = "https://example.org/data/lahore_dengue_data.csv"
+
+
+class Server:
+    """Stands in for ``urlopen``, recording the requests it gets."""
+
+    def __init__(self):
+        self.requests = []
+        self.body = b"Latitude,Longitude\n31.5,74.3\n"
+        self.etag = '"v1"'
+        self.offline = False
+
+    def __call__(self, request, timeout=None):
+        self.requests.append(request)
+        if self.offline:
+            raise urllib.error.URLError("network unreachable")
+        headers = Message()
+        headers["ETag"] = self.etag
+        if request.get_header("If-none-match") == self.etag:
+            raise urllib.error.HTTPError(
+                request.full_url, 304, "Not Modified", headers, None
+            )
+        response = io.BytesIO(self.body)
+        response.headers = headers
+        return response
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = Server()
+    monkeypatch.setattr(urllib.request, "urlopen", server)
+    return server
+
+
+def test_fresh_copy_is_served_without_a_request(server, tmp_path):
+    path, version = fetch_risk_csv(URL, tmp_path)
+    assert path.read_bytes() == server.body and version == "v1"
+    assert fetch_risk_csv(URL, tmp_path) == (path, "v1")
+    assert len(server.requests) == 1
+
+
+def test_expired_copy_is_revalidated_with_its_etag(server, tmp_path):
+    fetch_risk_csv(URL, tmp_path, ttl=0)
+    path, version = fetch_risk_csv(URL, tmp_path, ttl=0)
+    assert server.requests[-1].get_header("If-none-match") == '"v1"'
+    assert version == "v1"
+
+    server.body, server.etag = b"Latitude,Longitude\n31.6,74.4\n", '"v2"'
+    path, version = fetch_risk_csv(URL, tmp_path, ttl=0)
+    assert version == "v2" and path.read_bytes() == server.body
+
+
+def test_offline_serves_the_stale_copy_and_backs_off(server, tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(risk_data.time, "time", lambda: clock[0])
+    fetch_risk_csv(URL, tmp_path, ttl=60)
+    server.offline = True
+    clock[0] += 120
+    assert fetch_risk_csv(URL, tmp_path, ttl=60)[1] == "v1"
+    assert len(server.requests) == 2
+
+    # Reruns within the back-off do not wait on the network again
+    clock[0] += 10
+    fetch_risk_csv(URL, tmp_path, ttl=60)
+    assert len(server.requests) == 2
+
+    clock[0] += risk_data.RETRY_AFTER
+    fetch_risk_csv(URL, tmp_path, ttl=60)
+    assert len(server.requests) == 3
+
+
+def test_offline_without_a_copy_raises(server, tmp_path):
+    server.offline = True
+    with pytest.raises(OSError):
+        fetch_risk_csv(URL, tmp_path)
+
+
+def test_local_files_are_versioned_by_mtime_and_size(tmp_path):
+    path = tmp_path / "risk.csv"
+    path.write_text("Latitude,Longitude\n")
+    _, before = fetch_risk_csv(path)
+    path.write_text("Latitude,Longitude\n31.5,74.3\n")
+    assert fetch_risk_csv(path)[1] != before
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from utils.risk_map import DEFAULT_LAYER, MAP_LEVELS, build_risk_map
+from utils.risk_store import RISK_FACTORS
+from utils.tiles import TilePyramid
+
+
+def _pyramid():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(
+        {
+            "Latitude": rng.uniform(31.45, 31.6, 200),
+            "Longitude": rng.uniform(74.25, 74.45, 200),
+        }
+    )
+    for column in RISK_FACTORS.values():
+        data[column] = rng.random(200)
+    return TilePyramid.build(data)
+
+
+def test_every_factor_is_a_layer_and_only_the_default_is_shown():
+    m = build_risk_map(_pyramid(), [31.52, 74.36], 12)
+    layers = {
+        child.layer_name: child.show
+        for child in m._children.values()
+        if hasattr(child, "show")
+    }
+    assert set(RISK_FACTORS) <= set(layers)
+    assert [name for name in RISK_FACTORS if layers[name]] == [DEFAULT_LAYER]
+
+
+def test_heatmaps_keep_points_outside_the_initial_view_at_every_level():
+    pyramid = _pyramid()
+    m = build_risk_map(pyramid, [0.0, 0.0], 12)
+    html = m.get_root().render()
+    # Every embedded level of every factor, none clipped to the (empty) view
+    assert html.count("L.heatLayer(") == len(RISK_FACTORS) * len(MAP_LEVELS)
+    assert html.count("map.getZoom()") == 1
+    lat = pyramid.cells(MAP_LEVELS[-1])["Latitude"].iloc[0]
+    assert repr(float(lat)) in html
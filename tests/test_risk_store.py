@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.risk_store import (
+    RISK_SCHEMA,
+    ingest_csv,
+    parquet_source_version,
+    read_risk_parquet,
+    validate_risk_frame,
+)
+
+
+def _frame(n=5):
+    data = pd.DataFrame({name: np.linspace(0.1, 0.9, n) for name in RISK_SCHEMA.names})
+    data["Latitude"] += 31.0
+    data["Longitude"] += 74.0
+    data["Area"] = "Gulberg"
+    return data
+
+
+def test_csv_round_trips_with_schema_types(tmp_path):
+    csv_path = tmp_path / "risk.csv"
+    _frame().to_csv(csv_path, index=False)
+    parquet_path = ingest_csv(csv_path, source_version="v1")
+    data = read_risk_parquet(parquet_path)
+    assert list(data.columns) == RISK_SCHEMA.names + ["Area"]
+    assert data["Total_Risk_Score"].dtype == np.float32
+    assert parquet_source_version(parquet_path) == "v1"
+
+
+def test_matching_source_version_skips_conversion(tmp_path):
+    csv_path = tmp_path / "risk.csv"
+    _frame().to_csv(csv_path, index=False)
+    parquet_path = ingest_csv(csv_path, source_version="v1")
+    csv_path.write_text("not,a,risk,file\n")
+    assert ingest_csv(csv_path, source_version="v1") == parquet_path
+
+
+def test_every_problem_is_reported():
+    data = _frame()
+    data.loc[0, "Latitude"] = np.nan
+    data["Weather_Risk_Score"] = data["Weather_Risk_Score"].astype(object)
+    data.loc[1, "Weather_Risk_Score"] = "high"
+    data.loc[2, "Longitude"] = 200.0
+    with pytest.raises(ValueError) as error:
+        validate_risk_frame(data)
+    message = str(error.value)
+    for problem in (
+        "Latitude: 1 missing",
+        "Weather_Risk_Score: 1 non-numeric",
+        "Longitude: values",
+    ):
+        assert problem in message
+
+
+def test_missing_columns_are_rejected():
+    with pytest.raises(ValueError, match="Total_Risk_Score"):
+        validate_risk_frame(_frame().drop(columns="Total_Risk_Score"))
+
+
+def test_unreadable_parquet_has_no_version(tmp_path):
+    assert parquet_source_version(tmp_path / "missing.parquet") is None
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from utils.routes import haversine_matrix, plan_routes, route_summary
+
+
+def _stops(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Latitude": rng.uniform(31.45, 31.55, n),
+            "Longitude": rng.uniform(74.25, 74.35, n),
+            "Total_Risk_Score": rng.uniform(0.5, 1.0, n),
+        }
+    )
+
+
+def test_every_reachable_stop_is_planned():
+    stops = _stops(40)
+    # Team A starts in Karachi and cannot reach any stop within the shift
+    starts = pd.DataFrame(
+        {"Team": ["A", "B"], "Latitude": [24.86, 31.5], "Longitude": [67.0, 74.3]}
+    )
+    plan = plan_routes(stops, starts, budget_minutes=24 * 60, improve_seconds=0)
+    assert len(plan) == len(stops)
+    assert set(plan["Team"]) == {"B"}
+
+
+def test_unbudgeted_plan_visits_each_stop_once():
+    stops = _stops(120, seed=1)
+    starts = pd.DataFrame(
+        {
+            "Team": ["A", "B", "C"],
+            "Latitude": [31.45, 31.5, 31.55],
+            "Longitude": [74.25, 74.3, 74.35],
+        }
+    )
+    plan = plan_routes(stops, starts)
+    visited = plan[["Latitude", "Longitude"]].apply(tuple, axis=1)
+    assert visited.is_unique
+    assert len(plan) == len(stops)
+    assert route_summary(plan)["Stops"].sum() == len(stops)
+
+
+def test_budget_limits_each_team():
+    stops = _stops(200, seed=2)
+    starts = pd.DataFrame({"Team": ["A"], "Latitude": [31.5], "Longitude": [74.3]})
+    plan = plan_routes(stops, starts, budget_minutes=120, service=10)
+    assert 0 < len(plan) < len(stops)
+    assert plan["Arrival (min)"].max() + 10 <= 120
+
+
+def test_haversine_matrix_is_symmetric():
+    distances = haversine_matrix([31.5, 24.86], [74.3, 67.0])
+    assert distances[0, 1] == distances[1, 0]
+    assert 1000 < distances[0, 1] < 1100
+
+
+def test_haversine_matrix_is_float32_whatever_the_chunking():
+    stops = _stops(50, seed=2)
+    whole = haversine_matrix(stops["Latitude"], stops["Longitude"], chunk_rows=64)
+    chunked = haversine_matrix(stops["Latitude"], stops["Longitude"], chunk_rows=7)
+    assert whole.dtype == np.float32
+    np.testing.assert_array_equal(whole, chunked)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from utils.scoring import normalize, score_risk
+
+
+def test_rank_gives_ties_the_same_score():
+    scores = normalize([5.0, 5.0, 5.0], method="rank")
+    np.testing.assert_allclose(scores, [0.5, 0.5, 0.5])
+
+
+def test_rank_averages_tied_positions():
+    scores = normalize([1.0, 3.0, 3.0, 7.0, np.nan], method="rank")
+    np.testing.assert_allclose(scores[:4], [0.0, 0.5, 0.5, 1.0])
+    assert np.isnan(scores[4])
+
+
+def test_minmax_and_fixed_stay_in_unit_range():
+    values = np.array([-10.0, 0.0, 150.0, 400.0])
+    assert normalize(values, "fixed", (0.0, 300.0)).tolist() == pytest.approx(
+        [0.0, 0.0, 0.5, 1.0]
+    )
+    assert normalize(values, "minmax").min() == 0.0
+    assert normalize(values, "minmax").max() == 1.0
+
+
+def test_unknown_normalization_is_rejected():
+    with pytest.raises(ValueError):
+        normalize([1.0], method="zscore")
+
+
+def test_scores_are_bounded():
+    rng = np.random.default_rng(0)
+    n = 1000
+    scores = score_risk(
+        rng.uniform(0, 400, n),
+        rng.uniform(10, 45, n),
+        rng.uniform(0, 100, n),
+        rng.random(n),
+        rng.integers(0, 500, n),
+    )
+    for values in scores.values():
+        assert np.nanmin(values) >= 0.0
+        assert np.nanmax(values) <= 1.0
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from utils.tfjs import LayersModel, dequantize_weight, quantize_weight
+
+
+def _run(layers, weights, batch):
+    topology = {"class_name": "Sequential", "config": {"layers": layers}}
+    return LayersModel(topology, weights).predict(np.asarray(batch, np.float32))
+
+
+def _conv(padding, strides, use_bias=False):
+    return {
+        "class_name": "Conv2D",
+        "config": {
+            "name": "conv",
+            "kernel_size": [2, 2] if padding == "valid" else [3, 3],
+            "strides": strides,
+            "padding": padding,
+            "use_bias": use_bias,
+        },
+    }
+
+
+# 1..9 as a single-channel 3x3 image
+GRID = np.arange(1, 10, dtype=np.float32).reshape(1, 3, 3, 1)
+
+
+def test_conv2d_valid_sums_each_window():
+    weights = {"conv/kernel": np.ones((2, 2, 1, 1), np.float32)}
+    out = _run([_conv("valid", [1, 1])], weights, GRID)
+    np.testing.assert_allclose(out[0, :, :, 0], [[12, 16], [24, 28]])
+
+
+def test_conv2d_same_padding_with_stride_adds_bias():
+    weights = {
+        "conv/kernel": np.ones((3, 3, 1, 1), np.float32),
+        "conv/bias": np.array([1.0], np.float32),
+    }
+    # TensorFlow pads one zero on each side, then samples every other center
+    out = _run([_conv("same", [2, 2], use_bias=True)], weights, GRID)
+    np.testing.assert_allclose(out[0, :, :, 0], [[13, 17], [25, 29]])
+
+
+def test_pointwise_conv2d_mixes_channels():
+    layer = {
+        "class_name": "Conv2D",
+        "config": {
+            "name": "conv",
+            "kernel_size": [1, 1],
+            "strides": [1, 1],
+            "padding": "valid",
+            "use_bias": False,
+        },
+    }
+    kernel = np.array([[1.0, 0.0], [2.0, -1.0]], np.float32).reshape(1, 1, 2, 2)
+    batch = [[[[3.0, 4.0]]]]
+    out = _run([layer], {"conv/kernel": kernel}, batch)
+    np.testing.assert_allclose(out[0, 0, 0], [11.0, -4.0])
+
+
+def test_depthwise_conv2d_filters_each_channel_separately():
+    layer = {
+        "class_name": "DepthwiseConv2D",
+        "config": {
+            "name": "dw",
+            "strides": [1, 1],
+            "padding": "valid",
+            "use_bias": False,
+        },
+    }
+    kernel = np.zeros((2, 2, 2, 1), np.float32)
+    kernel[..., 0, 0] = 1.0
+    kernel[..., 1, 0] = [[1.0, 0.0], [0.0, -1.0]]
+    batch = np.array([[1.0, 10.0], [2.0, 20.0], [3.0, 30.0], [4.0, 40.0]])
+    out = _run([layer], {"dw/depthwise_kernel": kernel}, batch.reshape(1, 2, 2, 2))
+    np.testing.assert_allclose(out[0, 0, 0], [1 + 2 + 3 + 4, 10 - 40])
+
+
+def test_depthwise_conv2d_channel_multiplier():
+    layer = {
+        "class_name": "DepthwiseConv2D",
+        "config": {
+            "name": "dw",
+            "strides": [1, 1],
+            "padding": "valid",
+            "use_bias": False,
+        },
+    }
+    kernel = np.array([2.0, 3.0], np.float32).reshape(1, 1, 1, 2)
+    out = _run([layer], {"dw/depthwise_kernel": kernel}, [[[[5.0]]]])
+    np.testing.assert_allclose(out[0, 0, 0], [10.0, 15.0])
+
+
+def test_global_average_pooling_averages_each_channel():
+    layer = {"class_name": "GlobalAveragePooling2D", "config": {"name": "pool"}}
+    batch = np.array([1.0, -1.0, 2.0, -2.0, 3.0, -3.0, 6.0, -6.0]).reshape(1, 2, 2, 2)
+    np.testing.assert_allclose(_run([layer], {}, batch), [[3.0, -3.0]])
+
+
+def test_batch_norm_is_the_inference_affine_transform():
+    layer = {
+        "class_name": "BatchNormalization",
+        "config": {"name": "bn", "epsilon": 1.0},
+    }
+    weights = {
+        "bn/moving_mean": np.array([1.0], np.float32),
+        "bn/moving_variance": np.array([3.0], np.float32),
+        "bn/gamma": np.array([2.0], np.float32),
+        "bn/beta": np.array([0.5], np.float32),
+    }
+    # (x - 1) * 2 / sqrt(3 + 1) + 0.5 == x - 0.5
+    out = _run([layer], weights, GRID)
+    np.testing.assert_allclose(out, GRID - 0.5)
+
+
+def test_relu6_clips_both_ends():
+    layer = {"class_name": "ReLU", "config": {"name": "relu", "max_value": 6.0}}
+    out = _run([layer], {}, [[[[-1.0, 3.0, 9.0]]]])
+    np.testing.assert_allclose(out[0, 0, 0], [0.0, 3.0, 6.0])
+
+
+def test_unsupported_layers_fail_at_load():
+    layer = {"class_name": "LSTM", "config": {"name": "lstm"}}
+    with pytest.raises(NotImplementedError, match="LSTM"):
+        _run([layer], {}, GRID)
+
+
+def test_uint8_round_trip_is_within_one_step():
+    values = np.linspace(-1.0, 3.0, 1000, dtype=np.float32)
+    stored, quantization = quantize_weight(values, "uint8")
+    restored = dequantize_weight(stored, quantization)
+    assert np.abs(restored - values).max() <= quantization["scale"] / 2 + 1e-6
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.tiles import (
+    TilePyramid,
+    lonlat_to_xy,
+    quadkey_to_string,
+    quadkey_to_xy,
+    viewport_bounds,
+    xy_to_quadkey,
+)
+
+
+def _points(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Latitude": rng.uniform(31.4, 31.6, n),
+            "Longitude": rng.uniform(74.2, 74.4, n),
+            "Total_Risk_Score": rng.uniform(0.0, 1.0, n),
+        }
+    )
+
+
+def test_quadkeys_round_trip():
+    x, y = lonlat_to_xy([74.3, -0.1, 139.7], [31.5, 51.5, 35.7], 21)
+    qx, qy = quadkey_to_xy(xy_to_quadkey(x, y))
+    np.testing.assert_array_equal(qx, x)
+    np.testing.assert_array_equal(qy, y)
+
+
+def test_quadkey_string_matches_bing_tiles():
+    # Tile x=3, y=5 at level 3 is "213" in the Bing Maps tile system
+    assert quadkey_to_string(int(xy_to_quadkey(3, 5)), 3) == "213"
+
+
+def test_every_level_keeps_all_points_and_risk():
+    data = _points()
+    data.loc[0, "Total_Risk_Score"] = np.nan
+    pyramid = TilePyramid.build(
+        data, value_columns=["Total_Risk_Score"], min_zoom=8, max_zoom=14
+    )
+    total = np.nansum(data["Total_Risk_Score"])
+    for level in pyramid.levels.values():
+        assert level["count"].sum() == len(data)
+        assert level["quadkey"].is_unique
+        assert np.isclose(level["Total_Risk_Score_sum"].sum(), total)
+        assert level["Total_Risk_Score_max"].max() == data["Total_Risk_Score"].max()
+    assert len(pyramid.levels[8]) < len(pyramid.levels[14])
+
+
+def test_cells_are_clipped_to_the_viewport():
+    pyramid = TilePyramid.build(_points(), value_columns=["Total_Risk_Score"])
+    everything = pyramid.cells(14)
+    visible = pyramid.cells(
+        14, viewport_bounds((31.5, 74.3), 14, width=400, height=300)
+    )
+    assert 0 < len(visible) < len(everything)
+    assert visible["Latitude"].between(31.45, 31.55).all()
+    # Zoom levels outside the pyramid are clamped
+    assert pyramid.cells(30) is pyramid.levels[pyramid.max_zoom]
+
+
+def test_means_ignore_missing_values():
+    data = pd.DataFrame(
+        {
+            "Latitude": [31.5, 31.5, 31.5],
+            "Longitude": [74.3, 74.3, 74.3],
+            "Total_Risk_Score": [0.2, np.nan, 0.4],
+        }
+    )
+    pyramid = TilePyramid.build(data, value_columns=["Total_Risk_Score"])
+    cell = pyramid.cells(10).iloc[0]
+    assert cell["count"] == 3
+    assert cell["Total_Risk_Score"] == pytest.approx(0.3)
+    assert cell["Total_Risk_Score_max"] == pytest.approx(0.4)
+
+
+def test_cells_without_values_have_no_mean_or_max():
+    data = pd.DataFrame(
+        {"Latitude": [31.5], "Longitude": [74.3], "Total_Risk_Score": [np.nan]}
+    )
+    pyramid = TilePyramid.build(data, value_columns=["Total_Risk_Score"])
+    cell = pyramid.cells(10).iloc[0]
+    assert np.isnan(cell["Total_Risk_Score"])
+    assert np.isnan(cell["Total_Risk_Score_max"])
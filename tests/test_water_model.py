@@ -0,0 +1,123 @@
+import json
+
+import numpy as np
+import pytest
+
+from utils import water_model
+from utils.water_model import (
+    TEACHABLE_MODEL_DIR,
+    WaterClassifier,
+    ensure_precision_model,
+    precision_model_dir,
+    preprocess,
+)
+from utils.water_quantize import compare_precisions
+
+
+def test_converted_models_go_under_the_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(water_model, "MODEL_DIR", tmp_path / "model")
+    monkeypatch.setattr(water_model, "GENERATED_MODEL_DIR", tmp_path / "data")
+    out_dir = ensure_precision_model("fp16")
+    assert out_dir == tmp_path / "data" / f"{TEACHABLE_MODEL_DIR.name}_fp16"
+    assert (out_dir / "model.json").exists()
+    assert not (tmp_path / "model").exists()
+
+
+def test_shipped_copy_is_preferred(tmp_path, monkeypatch):
+    shipped = tmp_path / "model" / f"{TEACHABLE_MODEL_DIR.name}_int8"
+    shipped.mkdir(parents=True)
+    (shipped / "model.json").write_text("{}")
+    monkeypatch.setattr(water_model, "MODEL_DIR", tmp_path / "model")
+    monkeypatch.setattr(water_model, "GENERATED_MODEL_DIR", tmp_path / "data")
+    assert precision_model_dir("int8") == shipped
+    assert precision_model_dir("full") == TEACHABLE_MODEL_DIR
+
+
+def _tiny_model(model_dir):
+    # RGB -> (red, green) -> spatial mean -> identity softmax
+    layers = [
+        {
+            "class_name": "Conv2D",
+            "config": {
+                "name": "conv",
+                "kernel_size": [1, 1],
+                "strides": [1, 1],
+                "padding": "valid",
+                "use_bias": False,
+            },
+        },
+        {"class_name": "GlobalAveragePooling2D", "config": {"name": "pool"}},
+        {
+            "class_name": "Dense",
+            "config": {"name": "dense", "use_bias": False, "activation": "softmax"},
+        },
+    ]
+    kernel = np.eye(3, 2, dtype=np.float32).reshape(1, 1, 3, 2)
+    dense = np.eye(2, dtype=np.float32)
+    model_dir.mkdir(parents=True)
+    (model_dir / "weights.bin").write_bytes(kernel.tobytes() + dense.tobytes())
+    spec = {
+        "modelTopology": {"class_name": "Sequential", "config": {"layers": layers}},
+        "weightsManifest": [
+            {
+                "paths": ["weights.bin"],
+                "weights": [
+                    {"name": "conv/kernel", "shape": [1, 1, 3, 2], "dtype": "float32"},
+                    {"name": "dense/kernel", "shape": [2, 2], "dtype": "float32"},
+                ],
+            }
+        ],
+    }
+    (model_dir / "model.json").write_text(json.dumps(spec))
+    metadata = {"labels": ["Stagnant Water", "Clear"], "imageSize": 4}
+    (model_dir / "metadata.json").write_text(json.dumps(metadata))
+    return model_dir
+
+
+def test_classify_runs_a_tiny_model(tmp_path):
+    classifier = WaterClassifier.load(_tiny_model(tmp_path / "tiny"))
+    red = np.zeros((8, 6, 3), np.uint8)
+    red[..., 0] = 255
+    green = np.zeros((5, 5, 3), np.uint8)
+    green[..., 1] = 255
+    wet, dry = classifier.classify([red, green])
+    # Red scales to (1, -1) before the softmax, green to (-1, 1)
+    assert wet["predicted_class"] == "Stagnant Water"
+    assert wet["has_stagnant_water"]
+    assert wet["confidence"] == pytest.approx(np.e / (np.e + 1 / np.e))
+    assert dry["predicted_class"] == "Clear"
+    assert not dry["has_stagnant_water"]
+    assert sum(dry["probabilities"].values()) == pytest.approx(1.0)
+
+
+def test_preprocess_crops_resizes_and_scales():
+    # A tall image whose top and bottom rows fall outside the center square
+    image = np.zeros((6, 4, 3), np.uint8)
+    image[0] = image[-1] = 255
+    out = preprocess(image, size=2)
+    assert out.shape == (2, 2, 3)
+    assert out.dtype == np.float32
+    np.testing.assert_allclose(out, -1.0)
+    np.testing.assert_allclose(preprocess(np.full((3, 3, 3), 255, np.uint8), 3), 1.0)
+    np.testing.assert_allclose(
+        preprocess(np.full((2, 2, 3), 51, np.uint8), 2), 51 / 127.5 - 1
+    )
+
+
+def test_report_compares_fresh_copies_over_shipped_ones(tmp_path, monkeypatch):
+    model_dir = _tiny_model(tmp_path / "tiny")
+    monkeypatch.setattr(water_model, "MODEL_DIR", tmp_path / "model")
+    monkeypatch.setattr(water_model, "GENERATED_MODEL_DIR", tmp_path / "data")
+    for precision in ("fp16", "int8"):
+        ensure_precision_model(precision, model_dir)
+        # An outdated shipped copy that swaps the two classes
+        shipped = _tiny_model(tmp_path / "model" / f"tiny_{precision}")
+        swapped = np.eye(2, dtype=np.float32)[::-1]
+        weights = shipped / "weights.bin"
+        weights.write_bytes(weights.read_bytes()[:-16] + swapped.tobytes())
+
+    colors = np.zeros((2, 4, 4, 3), np.uint8)
+    colors[0, ..., 0] = colors[1, ..., 1] = 255
+    batch = np.stack([preprocess(image, 4) for image in colors])
+    report = compare_precisions(batch, model_dir=model_dir).set_index("precision")
+    assert (report["top1_agreement"] == 1.0).all()
@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+from utils.water_scan import upload_sources, zip_sources
+
+
+class Upload:
+    """Stand-in for a Streamlit upload that counts buffer copies."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+        self.copies = 0
+
+    def getvalue(self):
+        self.copies += 1
+        return self.data
+
+
+def _archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_zip_upload_is_copied_once():
+    members = {f"tile_{i}.png": bytes([i]) * 10 for i in range(20)}
+    members["notes.txt"] = b"skip me"
+    upload = Upload("tiles.zip", _archive(members))
+    sources = list(upload_sources([upload]))
+    assert [name for name, _ in sources] == [
+        f"tiles.zip/tile_{i}.png" for i in range(20)
+    ]
+    assert all(reader() == members[name.split("/")[1]] for name, reader in sources)
+    assert upload.copies == 1
+
+
+def test_zip_path_sources(tmp_path):
+    path = tmp_path / "tiles.zip"
+    path.write_bytes(_archive({"a/b.jpg": b"jpeg", "a/": b""}))
+    assert [(name, reader()) for name, reader in zip_sources(path)] == [
+        ("a/b.jpg", b"jpeg")
+    ]
@@ -0,0 +1 @@
+"""Shared data access and analytics helpers used by the Streamlit pages."""
@@ -0,0 +1,402 @@
+"""Threshold-based community alerts.
+
+Each ``AlertRule`` compares one metric column of a per-area snapshot (risk
+rollups per neighborhood, month-over-month case changes per city, model
+predictions) with a threshold, as one array comparison over every area.
+``AlertEngine`` runs its own background thread: every ``interval`` seconds
+it polls its sources (callables returning the latest snapshot of the case,
+risk and environment stores), evaluates the rules, drops alerts already
+sent for the same rule and area within the suppression window, sends at
+most ``rate_limit`` alerts a minute (most severe first; the rest are
+retried on the next tick) through a pluggable sink, and logs sent alerts
+to a local SQLite file.  Alerting therefore does not depend on anyone
+having a page open; ``submit`` can still push a snapshot for immediate
+evaluation.  ``get_alert_engine`` starts one engine per server process.
+
+``FileSink`` appends alerts as JSON lines and ``QueueSink`` hands them to
+an in-process queue; an SMS or email gateway only needs a ``send(alerts)``
+method taking a list of alert dicts.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.case_store import CaseStore
+from utils.env_feed import EnvironmentStore
+from utils.env_model import FEATURES, load_model, predict_batch
+from utils.forecast import case_matrix
+from utils.neighborhoods import get_neighborhood_index, neighborhood_risk
+from utils.paths import DATA_DIR
+from utils.risk_data import fetch_risk_csv, load_risk_data, risk_data_source
+
+ALERTS_PATH = DATA_DIR / "alerts.sqlite"
+
+OUTBOX_PATH = DATA_DIR / "alerts_outbox.jsonl"
+
+# An alert for the same rule and area is not repeated within this many seconds
+SUPPRESSION_WINDOW = 6 * 60 * 60
+
+# Alerts sent per minute at most
+RATE_LIMIT = 30
+
+# Seconds between the engine's own rule evaluations
+CHECK_INTERVAL = 60
+
+OPERATORS = {">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal}
+
+ALERT_COLUMNS = ["sent_at", "rule", "area", "value", "message"]
+
+
+class AlertRule:
+    """``metric op threshold`` over every area of a ``source`` snapshot.
+
+    ``message`` is formatted with ``area`` and ``value``.
+    """
+
+    def __init__(self, name, source, metric, op, threshold, message):
+        if op not in OPERATORS:
+            raise ValueError(
+                f"Unknown operator {op!r}; use one of {', '.join(OPERATORS)}"
+            )
+        self.name = name
+        self.source = source
+        self.metric = metric
+        self.op = op
+        self.threshold = threshold
+        self.message = message
+
+    def evaluate(self, metrics):
+        """Areas (the snapshot's index) that meet the rule, with their values
+        and how far past the threshold they are."""
+        values = metrics[self.metric].to_numpy(dtype=float)
+        with np.errstate(invalid="ignore"):
+            fired = OPERATORS[self.op](values, self.threshold)
+        values = values[fired]
+        return pd.DataFrame(
+            {
+                "rule": self.name,
+                "area": metrics.index[fired].astype(str),
+                "value": values,
+                "severity": np.abs(values - self.threshold)
+                / max(abs(self.threshold), 1e-9),
+            }
+        )
+
+    def describe(self):
+        return f"{self.metric} {self.op} {self.threshold}"
+
+
+DEFAULT_RULES = (
+    AlertRule(
+        "High neighborhood risk",
+        "risk",
+        "Total_Risk_Score_mean",
+        ">=",
+        0.6,
+        "Dengue risk in {area} is high (mean risk score {value:.2f}). Remove standing water and use repellent.",
+    ),
+    AlertRule(
+        "Cases rising",
+        "cases",
+        "Cases_change",
+        ">=",
+        0.5,
+        "Reported dengue cases in {area} rose {value:.0%} month over month. Take precautions against mosquito bites.",
+    ),
+    AlertRule(
+        "High predicted risk",
+        "environment",
+        "P(High)",
+        ">=",
+        0.7,
+        "Weather conditions in {area} favour mosquito breeding ({value:.0%} chance of high dengue risk).",
+    ),
+)
+
+
+def case_changes(cases):
+    """Latest month's cases per city and the change from the month before.
+
+    ``Cases_change`` is a fraction (0.5 = up 50%) and NaN when the previous
+    month had no cases.
+    """
+    if cases.empty:
+        return pd.DataFrame(columns=["Cases", "Previous", "Cases_change"], dtype=float)
+    matrix, cities, dates = case_matrix(cases)
+    latest = np.nan_to_num(matrix[:, -1])
+    previous = np.nan_to_num(matrix[:, -2]) if len(dates) > 1 else np.zeros(len(cities))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change = np.where(previous > 0, (latest - previous) / previous, np.nan)
+    return pd.DataFrame(
+        {"Cases": latest, "Previous": previous, "Cases_change": change}, index=cities
+    )
+
+
+class FileSink:
+    """Appends alerts to a JSON-lines outbox (stand-in for an SMS/email gateway)."""
+
+    def __init__(self, path=OUTBOX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def send(self, alerts):
+        with open(self.path, "a") as f:
+            for alert in alerts:
+                f.write(json.dumps(alert) + "\n")
+
+
+class QueueSink:
+    """Puts alerts on an in-process queue for another consumer."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def send(self, alerts):
+        for alert in alerts:
+            self.queue.put(alert)
+
+
+class AlertEngine:
+    """Non-blocking rule evaluation with suppression and rate limiting."""
+
+    def __init__(
+        self,
+        rules=DEFAULT_RULES,
+        sink=None,
+        path=ALERTS_PATH,
+        window=SUPPRESSION_WINDOW,
+        rate_limit=RATE_LIMIT,
+        sources=None,
+        interval=CHECK_INTERVAL,
+    ):
+        self.rules = list(rules)
+        self.sink = sink if sink is not None else FileSink()
+        self.path = str(path)
+        self.window = window
+        self.rate_limit = rate_limit
+        self.sources = dict(sources or {})
+        self.interval = interval
+        self.last_error = None
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS alert_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    sent_at REAL NOT NULL,
+                    rule TEXT NOT NULL,
+                    area TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    message TEXT NOT NULL
+                )
+            """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS alert_log_by_rule ON alert_log (rule, area, sent_at)"
+            )
+            rows = conn.execute(
+                "SELECT rule, area, MAX(sent_at) FROM alert_log GROUP BY rule, area"
+            ).fetchall()
+        # Last send per (rule, area), for suppression without a query per alert
+        self._last_sent = {(rule, area): sent_at for rule, area, sent_at in rows}
+
+        # Token bucket for the rate limit
+        self._tokens = float(rate_limit)
+        self._refilled = time.monotonic()
+
+        # Latest snapshot of every source, re-evaluated on each tick
+        self._latest = {}
+        self._pending = {}
+        self._busy = False
+        self._changed = threading.Condition()
+        self._worker = threading.Thread(
+            target=self._run, name="alert-engine", daemon=True
+        )
+        self._worker.start()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def submit(self, source, metrics):
+        """Queue the latest per-area ``metrics`` of ``source`` for evaluation
+        now rather than on the next tick.
+
+        Returns immediately; a snapshot not yet evaluated is replaced.
+        """
+        with self._changed:
+            self._pending[source] = metrics
+            self._changed.notify_all()
+
+    def flush(self):
+        """Block until every submitted snapshot has been evaluated."""
+        with self._changed:
+            self._changed.wait_for(lambda: not self._pending and not self._busy)
+
+    def poll(self):
+        """Latest snapshot of every source and the errors of those that failed."""
+        snapshots, errors = {}, []
+        for name, source in self.sources.items():
+            try:
+                metrics = source()
+            except Exception as e:  # e.g. offline; the other sources still alert
+                errors.append(f"{name}: {type(e).__name__}: {e}")
+                continue
+            if metrics is not None:
+                snapshots[name] = metrics
+        return snapshots, errors
+
+    def _run(self):
+        while True:
+            with self._changed:
+                submitted, self._pending = self._pending, {}
+                self._busy = True
+            try:
+                polled, errors = self.poll()
+                self._latest.update(polled)
+                self._latest.update(submitted)
+                self.evaluate(self._latest)
+                self.last_error = "; ".join(errors) or None
+            except Exception as e:  # a failing sink must not stop the engine
+                self.last_error = f"{type(e).__name__}: {e}"
+            finally:
+                with self._changed:
+                    self._busy = False
+                    self._changed.notify_all()
+                    self._changed.wait_for(lambda: self._pending, timeout=self.interval)
+
+    def _take_tokens(self, wanted):
+        now = time.monotonic()
+        self._tokens = min(
+            self.rate_limit,
+            self._tokens + (now - self._refilled) * self.rate_limit / 60,
+        )
+        self._refilled = now
+        granted = min(wanted, int(self._tokens))
+        self._tokens -= granted
+        return granted
+
+    def evaluate(self, snapshots, now=None):
+        """Evaluate every rule against ``snapshots`` ({source: metrics}) and send
+        the resulting alerts.  Returns counts of ``fired``, ``suppressed``,
+        ``deferred`` (rate limited) and ``sent`` alerts."""
+        now = time.time() if now is None else now
+        candidates = [
+            rule.evaluate(snapshots[rule.source])
+            for rule in self.rules
+            if rule.source in snapshots
+        ]
+        fired = (
+            pd.concat(candidates, ignore_index=True)
+            if candidates
+            else pd.DataFrame(columns=["rule", "area", "value", "severity"])
+        )
+        last = np.array(
+            [
+                self._last_sent.get(key, -np.inf)
+                for key in zip(fired["rule"], fired["area"])
+            ]
+        )
+        due = fired[now - last >= self.window].sort_values("severity", ascending=False)
+        sent = due.head(self._take_tokens(len(due)))
+
+        if len(sent):
+            templates = {rule.name: rule.message for rule in self.rules}
+            alerts = [
+                {
+                    "sent_at": now,
+                    "rule": rule,
+                    "area": area,
+                    "value": float(value),
+                    "message": templates[rule].format(area=area, value=value),
+                }
+                for rule, area, value in sent[["rule", "area", "value"]].itertuples(
+                    index=False
+                )
+            ]
+            self.sink.send(alerts)
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO alert_log (sent_at, rule, area, value, message) "
+                    "VALUES (:sent_at, :rule, :area, :value, :message)",
+                    alerts,
+                )
+            self._last_sent.update(
+                {(alert["rule"], alert["area"]): now for alert in alerts}
+            )
+        return {
+            "fired": len(fired),
+            "suppressed": len(fired) - len(due),
+            "deferred": len(due) - len(sent),
+            "sent": len(sent),
+        }
+
+    def recent(self, limit=50):
+        """Latest ``limit`` sent alerts (``ALERT_COLUMNS``), newest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(ALERT_COLUMNS)} FROM alert_log ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=ALERT_COLUMNS)
+        frame["sent_at"] = pd.to_datetime(frame["sent_at"], unit="s")
+        return frame
+
+
+def versioned_source(version, compute):
+    """Source calling ``compute()`` only when ``version()`` has changed."""
+    cached = {}
+
+    def poll():
+        current = version()
+        if current not in cached:
+            cached.clear()
+            cached[current] = compute()
+        return cached[current]
+
+    return poll
+
+
+def _predicted_risk(store, model):
+    conditions = store.latest().dropna(subset=FEATURES)
+    return predict_batch(model, conditions) if len(conditions) else None
+
+
+@st.cache_resource
+def get_alert_engine():
+    """The server's alert engine, polling the case, risk and environment stores.
+
+    Started once per process (by the first page that needs it) and then
+    independent of page sessions.
+    """
+    cases = CaseStore()
+    environment = EnvironmentStore()
+    index = get_neighborhood_index()
+    model = load_model()
+    sources = {
+        "cases": versioned_source(cases.version, lambda: case_changes(cases.query())),
+        "risk": versioned_source(
+            lambda: fetch_risk_csv(risk_data_source())[1],
+            lambda: neighborhood_risk(load_risk_data(), index),
+        ),
+        "environment": versioned_source(
+            environment.version, lambda: _predicted_risk(environment, model)
+        ),
+    }
+    # Alerts go to a local outbox file until an SMS/email gateway is configured
+    return AlertEngine(sink=FileSink(OUTBOX_PATH), sources=sources)
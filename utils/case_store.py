@@ -0,0 +1,463 @@
+"""Persistent store of reported dengue cases.
+
+Cases are kept in long format, one row per (city, year, month), in a local
+SQLite file shared by every session.  The primary key doubles as the
+(city, year, month) index, so city/year filters are answered by index range
+scans inside SQLite instead of masking a DataFrame in Python.  WAL mode lets
+readers proceed while another session writes.
+
+Writes go through :meth:`CaseStore.upsert`, a keyed primary-key upsert run
+for a whole batch in one transaction, so importing a season of line-list
+data costs time proportional to the batch rather than to the table.
+
+Every write bumps a data version that callers use as a cache key, and edits
+made in the data editor are applied as row deltas and recorded in an audit
+log with their previous values.  Yearly per-city and national monthly
+totals are kept in rollup tables that triggers adjust by the difference of
+each written row, so totals never require a scan of the case table.
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from utils.paths import DATA_DIR
+
+CASES_PATH = DATA_DIR / "reported_cases.sqlite"
+
+MONTHS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+# Long-format columns returned by CaseStore.query
+CASE_COLUMNS = ["City", "Year", "Month", "Cases"]
+
+# City x Year x month-name columns returned by CaseStore.wide
+WIDE_COLUMNS = ["City", "Year"] + MONTHS
+
+# One row per reported case
+LINE_LIST_COLUMNS = ["City", "Date"]
+
+AUDIT_COLUMNS = ["time", "city", "year", "month", "old_count", "new_count"]
+
+# Rollup tables and the triggers that keep them in step with ``cases``
+ROLLUP_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS case_year_totals (
+        city TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (city, year)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS case_month_totals (
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (year, month)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cases_rollup_insert AFTER INSERT ON cases BEGIN
+        INSERT INTO case_year_totals (city, year, total) VALUES (NEW.city, NEW.year, NEW.count)
+            ON CONFLICT (city, year) DO UPDATE SET total = total + excluded.total;
+        INSERT INTO case_month_totals (year, month, total) VALUES (NEW.year, NEW.month, NEW.count)
+            ON CONFLICT (year, month) DO UPDATE SET total = total + excluded.total;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cases_rollup_update AFTER UPDATE ON cases BEGIN
+        UPDATE case_year_totals SET total = total - OLD.count WHERE city = OLD.city AND year = OLD.year;
+        UPDATE case_month_totals SET total = total - OLD.count WHERE year = OLD.year AND month = OLD.month;
+        INSERT INTO case_year_totals (city, year, total) VALUES (NEW.city, NEW.year, NEW.count)
+            ON CONFLICT (city, year) DO UPDATE SET total = total + excluded.total;
+        INSERT INTO case_month_totals (year, month, total) VALUES (NEW.year, NEW.month, NEW.count)
+            ON CONFLICT (year, month) DO UPDATE SET total = total + excluded.total;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cases_rollup_delete AFTER DELETE ON cases BEGIN
+        UPDATE case_year_totals SET total = total - OLD.count WHERE city = OLD.city AND year = OLD.year;
+        UPDATE case_month_totals SET total = total - OLD.count WHERE year = OLD.year AND month = OLD.month;
+        DELETE FROM case_year_totals WHERE city = OLD.city AND year = OLD.year
+            AND NOT EXISTS (SELECT 1 FROM cases WHERE city = OLD.city AND year = OLD.year);
+        DELETE FROM case_month_totals WHERE year = OLD.year AND month = OLD.month
+            AND NOT EXISTS (SELECT 1 FROM cases WHERE year = OLD.year AND month = OLD.month);
+    END
+    """,
+)
+
+
+def _where(city=None, year=None):
+    clauses, params = [], []
+    if city is not None:
+        clauses.append("city = ?")
+        params.append(city)
+    if year is not None:
+        clauses.append("year = ?")
+        params.append(int(year))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _validated(records):
+    records = [
+        (str(city), int(year), int(month), int(count))
+        for city, year, month, count in records
+    ]
+    for city, year, month, count in records:
+        if not 1 <= month <= 12:
+            raise ValueError(f"Month must be 1-12, got {month} for {city} {year}")
+        if count < 0:
+            raise ValueError(
+                f"Case counts cannot be negative ({city} {year}-{month:02d})"
+            )
+    return records
+
+
+def case_records(frame):
+    """``(city, year, month, count)`` tuples from a long frame (``CASE_COLUMNS``);
+    ``Month`` may be 1-12 or a month name."""
+    missing = [column for column in CASE_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Case data is missing columns: {', '.join(missing)}")
+    months = frame["Month"].map(
+        lambda month: MONTHS.index(month) + 1 if month in MONTHS else month
+    )
+    return _validated(zip(frame["City"], frame["Year"], months, frame["Cases"]))
+
+
+def line_list_records(frame, date_column="Date"):
+    """Aggregate a line list (one row per case, ``LINE_LIST_COLUMNS``) into
+    ``(city, year, month, count)`` tuples."""
+    if "City" not in frame.columns or date_column not in frame.columns:
+        raise ValueError(f"Line list needs City and {date_column} columns")
+    dates = pd.to_datetime(frame[date_column], errors="coerce")
+    if dates.isna().any():
+        raise ValueError(
+            f"{int(dates.isna().sum())} rows have an unreadable {date_column}"
+        )
+    counts = frame.groupby(
+        [frame["City"].astype(str), dates.dt.year, dates.dt.month]
+    ).size()
+    return [
+        (city, int(year), int(month), int(count))
+        for (city, year, month), count in counts.items()
+    ]
+
+
+def _row_records(city, year, values):
+    # Cleared month cells in the editor count as zero cases
+    if city is None or pd.isna(city) or year is None or pd.isna(year):
+        raise ValueError("Every row needs a City and a Year")
+    return [
+        (city, year, month, values.get(name) or 0)
+        for month, name in enumerate(MONTHS, start=1)
+    ]
+
+
+def edit_deltas(base, changes):
+    """Translate ``st.data_editor`` changes made against the wide frame ``base``.
+
+    ``changes`` is the editor's widget state (``edited_rows``, ``added_rows``,
+    ``deleted_rows``, with row positions into ``base``).  Returns the
+    ``(city, year, month, count)`` records to write and the ``(city, year)``
+    keys to delete.  Editing a row's City or Year moves all of its months.
+    Raises ``ValueError`` if an added or re-keyed row would land on a
+    (City, Year) that another row already holds.
+    """
+    records, removed, created = {}, set(), set()
+
+    def create(city, year, values):
+        new_records = _validated(_row_records(city, year, values))
+        key = new_records[0][:2]
+        if key in created:
+            raise ValueError(f"More than one row is {key[0]} {key[1]}")
+        created.add(key)
+        return new_records
+
+    for position in changes.get("deleted_rows", []):
+        row = base.iloc[position]
+        removed.add((row["City"], int(row["Year"])))
+    for position, edits in changes.get("edited_rows", {}).items():
+        row = base.iloc[int(position)]
+        key = (row["City"], int(row["Year"]))
+        values = {**row.to_dict(), **edits}
+        if "City" in edits or "Year" in edits:
+            removed.add(key)
+            new_records = create(values["City"], values["Year"], values)
+        else:
+            new_records = _validated(
+                (key[0], key[1], MONTHS.index(name) + 1, value or 0)
+                for name, value in edits.items()
+                if name in MONTHS
+            )
+        records.update({record[:3]: record for record in new_records})
+    for values in changes.get("added_rows", []):
+        if values.get("City") is None and values.get("Year") is None:
+            continue  # row added but not filled in yet
+        new_records = create(values.get("City"), values.get("Year"), values)
+        records.update({record[:3]: record for record in new_records})
+
+    # Upserting onto a row that stays would silently overwrite its months
+    kept = {(city, int(year)) for city, year in zip(base["City"], base["Year"])}
+    taken = sorted(created & (kept - removed))
+    if taken:
+        keys = ", ".join(f"{city} {year}" for city, year in taken)
+        raise ValueError(f"{keys} already has a row; edit that row instead")
+    # A re-keyed row written back to its own key is an update, not a delete
+    removed -= {record[:2] for record in records.values()}
+    return list(records.values()), sorted(removed)
+
+
+def _wide_records(frame):
+    """``(city, year, month, count)`` tuples for every cell of a wide frame."""
+    missing = [column for column in WIDE_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Case data is missing columns: {', '.join(missing)}")
+    frame = frame.dropna(subset=["City", "Year"])
+    counts = frame[MONTHS].apply(pd.to_numeric, errors="coerce").fillna(0)
+    if (counts < 0).any().any():
+        raise ValueError("Case counts cannot be negative")
+    return [
+        (str(city), int(year), month, int(count))
+        for city, year, row in zip(
+            frame["City"], frame["Year"], counts.itertuples(index=False)
+        )
+        for month, count in enumerate(row, start=1)
+    ]
+
+
+class CaseStore:
+    """Reported cases per city and month in a SQLite file."""
+
+    def __init__(self, path=CASES_PATH):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cases (
+                    city TEXT NOT NULL,
+                    year INTEGER NOT NULL,
+                    month INTEGER NOT NULL CHECK (month BETWEEN 1 AND 12),
+                    count INTEGER NOT NULL CHECK (count >= 0),
+                    PRIMARY KEY (city, year, month)
+                ) WITHOUT ROWID
+            """
+            )
+            # Year-only filters would otherwise scan every city
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cases_by_year ON cases (year, month)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS case_audit (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    time REAL NOT NULL,
+                    city TEXT NOT NULL,
+                    year INTEGER NOT NULL,
+                    month INTEGER NOT NULL,
+                    old_count INTEGER,
+                    new_count INTEGER
+                )
+            """
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS case_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO case_meta (key, value) VALUES ('version', 0)"
+            )
+            for statement in ROLLUP_SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+
+    @staticmethod
+    def _bump_version(conn):
+        conn.execute("UPDATE case_meta SET value = value + 1 WHERE key = 'version'")
+
+    def version(self):
+        """Counter bumped by every write; use it to key caches of store reads."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT value FROM case_meta WHERE key = 'version'"
+            ).fetchone()[0]
+
+    def cities(self):
+        with self._connect() as conn:
+            return [
+                row[0]
+                for row in conn.execute("SELECT DISTINCT city FROM cases ORDER BY city")
+            ]
+
+    def years(self):
+        with self._connect() as conn:
+            return [
+                row[0]
+                for row in conn.execute("SELECT DISTINCT year FROM cases ORDER BY year")
+            ]
+
+    def query(self, city=None, year=None):
+        """Long-format cases (``CASE_COLUMNS``, month as 1-12), optionally filtered."""
+        where, params = _where(city, year)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT city, year, month, count FROM cases{where} ORDER BY city, year, month",
+                params,
+            ).fetchall()
+        return pd.DataFrame(rows, columns=CASE_COLUMNS)
+
+    def wide(self, city=None, year=None):
+        """One row per city and year with a column per month (``WIDE_COLUMNS``)."""
+        where, params = _where(city, year)
+        months = ", ".join(
+            f"SUM(CASE month WHEN {number} THEN count ELSE 0 END) AS {name}"
+            for number, name in enumerate(MONTHS, start=1)
+        )
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT city, year, {months} FROM cases{where} GROUP BY city, year ORDER BY year, city",
+                params,
+            ).fetchall()
+        return pd.DataFrame(rows, columns=WIDE_COLUMNS)
+
+    def yearly_totals(self, city=None, year=None):
+        """Cases per city and year (``City``, ``Year``, ``Cases``) from the rollup."""
+        where, params = _where(city, year)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT city, year, total FROM case_year_totals{where} ORDER BY year, city",
+                params,
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["City", "Year", "Cases"])
+
+    def monthly_totals(self, year=None):
+        """National cases per month (``Year``, ``Month``, ``Cases``) from the rollup."""
+        where, params = _where(year=year)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT year, month, total FROM case_month_totals{where} ORDER BY year, month",
+                params,
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["Year", "Month", "Cases"])
+
+    def upsert(self, records, increment=False):
+        """Set the counts of many ``(city, year, month, count)`` records in one
+        transaction; with ``increment`` the counts are added to what is stored.
+        Returns the number of records written."""
+        records = _validated(records)
+        update = "count + excluded.count" if increment else "excluded.count"
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO cases (city, year, month, count) VALUES (?, ?, ?, ?) "
+                f"ON CONFLICT (city, year, month) DO UPDATE SET count = {update}",
+                records,
+            )
+            self._bump_version(conn)
+        return len(records)
+
+    def set_count(self, city, year, month, count):
+        """Set the cases of one city-month (``month`` is 1-12)."""
+        self.upsert([(city, year, month, count)])
+
+    def upsert_wide(self, frame):
+        """Insert or overwrite the (City, Year) rows of a wide frame."""
+        return self.upsert(_wide_records(frame))
+
+    def ingest_line_list(self, frame, date_column="Date"):
+        """Add the cases of a line list to the stored counts."""
+        return self.upsert(line_list_records(frame, date_column), increment=True)
+
+    def apply_edits(self, base, changes):
+        """Apply data-editor deltas made against ``base`` (see :func:`edit_deltas`)
+        and log every changed city-month.  Only the touched rows are written, so
+        concurrent edits to other rows are kept.  Returns the number of
+        city-months changed."""
+        records, removed = edit_deltas(base, changes)
+        now = time.time()
+        audit = []
+        with self._connect() as conn:
+            for city, year in removed:
+                for month, count in conn.execute(
+                    "SELECT month, count FROM cases WHERE city = ? AND year = ?",
+                    (city, year),
+                ).fetchall():
+                    audit.append((now, city, year, month, count, None))
+                conn.execute(
+                    "DELETE FROM cases WHERE city = ? AND year = ?", (city, year)
+                )
+            for city, year, month, count in records:
+                old = conn.execute(
+                    "SELECT count FROM cases WHERE city = ? AND year = ? AND month = ?",
+                    (city, year, month),
+                ).fetchone()
+                if old is None or old[0] != count:
+                    audit.append(
+                        (now, city, year, month, old[0] if old else None, count)
+                    )
+            conn.executemany(
+                "INSERT INTO cases (city, year, month, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (city, year, month) DO UPDATE SET count = excluded.count",
+                records,
+            )
+            conn.executemany(
+                f"INSERT INTO case_audit ({', '.join(AUDIT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                audit,
+            )
+            if audit:
+                self._bump_version(conn)
+        return len(audit)
+
+    def audit_log(self, limit=100):
+        """Latest ``limit`` audited changes, newest first (``AUDIT_COLUMNS``)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(AUDIT_COLUMNS)} FROM case_audit ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=AUDIT_COLUMNS)
+        frame["time"] = pd.to_datetime(frame["time"], unit="s")
+        # NULL marks a city-month that was added or deleted
+        frame[["old_count", "new_count"]] = frame[["old_count", "new_count"]].astype(
+            "Int64"
+        )
+        return frame
+
+    def seed(self, frame):
+        """Load a wide frame into an empty store; no-op once data exists."""
+        records = _wide_records(frame)
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM cases LIMIT 1").fetchone() is None:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO cases (city, year, month, count) VALUES (?, ?, ?, ?)",
+                    records,
+                )
+                self._bump_version(conn)
@@ -0,0 +1,519 @@
+"""Offline ingestion of environmental data drops into a time-indexed store.
+
+Weather station CSVs, gridded NetCDF weather files and NDVI GeoTIFFs are
+dropped into a local directory (``ENV_FEED_DIR``).  ``EnvironmentStore.ingest``
+compares every file with a manifest of sizes, modification times and
+content hashes and only reads files that are new or changed; rows from a
+changed or deleted file are replaced or removed, so an hourly refresh costs
+as much as the new data, not the archive.
+
+Every file is resampled to daily values per Lahore neighborhood:
+
+* station readings are interpolated to each neighborhood by inverse
+  distance weighting, for all days at once as one matrix product;
+* raster cells (NetCDF time steps or an NDVI scene) are averaged per
+  neighborhood with one ``bincount`` over the pixels inside the
+  neighborhoods' bounding box.  Raster files need GDAL (``osgeo``); without
+  it they are reported as failed and the other files are still ingested.
+
+Readings are kept in a local SQLite file keyed by (area, day, feature,
+source file) and read back as one row per neighborhood and day with the
+environmental model's ``FEATURES`` columns.  Run an ingest from cron with::
+
+    python -m utils.env_feed [FEED_DIR]
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.env_model import FEATURES
+from utils.neighborhoods import NeighborhoodIndex, load_neighborhoods
+from utils.paths import DATA_DIR
+
+# Drop directory; override with DENGUE_ENV_FEED_DIR
+ENV_FEED_DIR = Path(os.environ.get("DENGUE_ENV_FEED_DIR", DATA_DIR / "env_feed"))
+
+ENV_STORE_PATH = DATA_DIR / "environment.sqlite"
+
+STATION_SUFFIXES = (".csv",)
+NETCDF_SUFFIXES = (".nc", ".nc4")
+NDVI_SUFFIXES = (".tif", ".tiff")
+
+# Daily aggregation of sub-daily readings
+DAILY_AGGREGATION = {
+    "rainfall": "sum",
+    "temperature": "mean",
+    "humidity": "mean",
+    "vegetation": "mean",
+}
+
+# NetCDF variable names accepted for each feature
+NETCDF_VARIABLES = {
+    "rainfall": ("rainfall", "precip", "precipitation", "pr", "tp"),
+    "temperature": ("temperature", "t2m", "tas", "temp"),
+    "humidity": ("humidity", "rh", "hurs", "relative_humidity"),
+    "vegetation": ("vegetation", "ndvi"),
+}
+
+# Inverse distance weighting power for station interpolation
+IDW_POWER = 2
+
+# Date in an NDVI file name, e.g. ndvi_2024-07-15.tif or MOD13Q1_20240715.tif
+FILE_DATE = re.compile(r"(\d{4})-?(\d{2})-?(\d{2})")
+
+READING_COLUMNS = ["day", "area", "feature", "value"]
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS env_manifest (
+        path TEXT PRIMARY KEY,
+        digest TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        readings INTEGER NOT NULL,
+        ingested_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS env_readings (
+        area TEXT NOT NULL,
+        day TEXT NOT NULL,
+        feature TEXT NOT NULL,
+        source TEXT NOT NULL,
+        value REAL NOT NULL,
+        PRIMARY KEY (area, day, feature, source)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS env_readings_by_day ON env_readings (day)",
+    "CREATE INDEX IF NOT EXISTS env_readings_by_source ON env_readings (source)",
+    "CREATE TABLE IF NOT EXISTS env_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+)
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def area_points(index):
+    """Representative (longitude, latitude) of every neighborhood."""
+    points = index.polygons.geometry.representative_point()
+    return points.x.to_numpy(), points.y.to_numpy()
+
+
+def _daily(frame):
+    """Long ``READING_COLUMNS`` frame from a wide (day, area) frame of features."""
+    long = frame.melt(
+        id_vars=["day", "area"], var_name="feature", value_name="value"
+    ).dropna(subset=["value"])
+    long["day"] = long["day"].dt.strftime("%Y-%m-%d")
+    return long[READING_COLUMNS]
+
+
+def read_stations(path, index):
+    """Station CSV (Date, Latitude, Longitude and any ``FEATURES`` columns)
+    interpolated to daily neighborhood values."""
+    frame = pd.read_csv(path)
+    missing = [
+        column
+        for column in ("Date", "Latitude", "Longitude")
+        if column not in frame.columns
+    ]
+    if missing:
+        raise ValueError(f"Station file is missing columns: {', '.join(missing)}")
+    features = [name for name in FEATURES if name in frame.columns]
+    if not features:
+        raise ValueError(f"Station file has none of the columns {', '.join(FEATURES)}")
+    frame["day"] = pd.to_datetime(frame["Date"], errors="coerce").dt.normalize()
+    if frame["day"].isna().any():
+        raise ValueError(
+            f"{int(frame['day'].isna().sum())} station readings have an unreadable Date"
+        )
+
+    daily = frame.groupby(["Latitude", "Longitude", "day"])[features].agg(
+        {name: DAILY_AGGREGATION[name] for name in features}
+    )
+    stations = daily.index.droplevel("day").unique()
+    lon, lat = area_points(index)
+    # Distances from every neighborhood to every station (equirectangular, km)
+    dx = (
+        lon[:, None] - stations.get_level_values("Longitude").to_numpy()[None, :]
+    ) * np.cos(np.radians(lat))[:, None]
+    dy = lat[:, None] - stations.get_level_values("Latitude").to_numpy()[None, :]
+    weights = 1.0 / np.maximum(np.hypot(dx, dy) * 111.32, 1e-3) ** IDW_POWER
+
+    result = []
+    for name in features:
+        # stations x days, NaN where a station did not report
+        values = daily[name].unstack("day").reindex(stations)
+        present = values.notna().to_numpy()
+        filled = np.where(present, values.to_numpy(), 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            interpolated = (weights @ filled) / (weights @ present)
+        result.append(
+            pd.DataFrame(interpolated, index=index.names, columns=values.columns)
+            .stack()
+            .rename(name)
+        )
+    wide = pd.concat(result, axis=1).rename_axis(["area", "day"]).reset_index()
+    return _daily(wide)
+
+
+def zonal_means(geotransform, values, index):
+    """Mean of each raster band per neighborhood: ``(bands, areas)``.
+
+    ``values`` is ``(bands, rows, cols)`` with NaN for missing pixels and
+    ``geotransform`` its (north-up) GDAL geotransform.  Neighborhoods too
+    small to hold a pixel centre take the pixel under their representative
+    point.
+    """
+    bands, rows, cols = values.shape
+    x0, dx, _, y0, _, dy = geotransform
+    lon = x0 + (np.arange(cols) + 0.5) * dx
+    lat = y0 + (np.arange(rows) + 0.5) * dy
+    grid_lon, grid_lat = np.meshgrid(lon, lat)
+    codes = index.assign(grid_lon.ravel(), grid_lat.ravel())
+    areas = len(index.names)
+    flat = values.reshape(bands, -1)
+    valid = (codes >= 0)[None, :] & ~np.isnan(flat)
+    slots = (np.arange(bands)[:, None] * areas + codes[None, :])[valid]
+    sums = np.bincount(slots, weights=flat[valid], minlength=bands * areas).reshape(
+        bands, areas
+    )
+    counts = np.bincount(slots, minlength=bands * areas).reshape(bands, areas)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+
+    # Sub-pixel neighborhoods: sample the pixel under the representative point
+    empty = np.flatnonzero((np.bincount(codes[codes >= 0], minlength=areas) == 0))
+    if len(empty):
+        lon, lat = area_points(index)
+        col = np.clip(((lon[empty] - x0) / dx).astype(int), 0, cols - 1)
+        row = np.clip(((lat[empty] - y0) / dy).astype(int), 0, rows - 1)
+        means[:, empty] = values[:, row, col]
+    return means
+
+
+def _gdal():
+    """GDAL, which is only needed for NetCDF and GeoTIFF files."""
+    try:
+        from osgeo import gdal
+    except ImportError as e:
+        raise RuntimeError(
+            "Reading NetCDF and GeoTIFF files needs GDAL (the osgeo package)"
+        ) from e
+    gdal.UseExceptions()
+    return gdal
+
+
+def _bounds_window(dataset, index):
+    """Pixel window (xoff, yoff, xsize, ysize) covering the neighborhoods, and
+    the geotransform of that window."""
+    x0, dx, rx, y0, ry, dy = dataset.GetGeoTransform()
+    if rx or ry:
+        raise ValueError("Rotated rasters are not supported")
+    west, south, east, north = index.polygons.total_bounds
+    cols = sorted(((west - x0) / dx, (east - x0) / dx))
+    rows = sorted(((north - y0) / dy, (south - y0) / dy))
+    xoff = int(np.clip(np.floor(cols[0]), 0, dataset.RasterXSize - 1))
+    yoff = int(np.clip(np.floor(rows[0]), 0, dataset.RasterYSize - 1))
+    xend = int(np.clip(np.ceil(cols[1]), xoff + 1, dataset.RasterXSize))
+    yend = int(np.clip(np.ceil(rows[1]), yoff + 1, dataset.RasterYSize))
+    window = (xoff, yoff, xend - xoff, yend - yoff)
+    return window, (x0 + xoff * dx, dx, 0.0, y0 + yoff * dy, 0.0, dy)
+
+
+def _read_bands(dataset, window):
+    """``(bands, rows, cols)`` float array with nodata as NaN and band scale applied."""
+    planes = []
+    for i in range(dataset.RasterCount):
+        band = dataset.GetRasterBand(i + 1)
+        plane = band.ReadAsArray(*window).astype(np.float64)
+        nodata = band.GetNoDataValue()
+        if nodata is not None and not np.isnan(nodata):
+            plane[plane == nodata] = np.nan
+        plane = plane * (band.GetScale() or 1.0) + (band.GetOffset() or 0.0)
+        if band.GetUnitType() == "K":
+            plane -= 273.15
+        planes.append(plane)
+    return np.stack(planes)
+
+
+def _band_days(dataset):
+    """Day of each band of a NetCDF variable, from its time dimension metadata."""
+    metadata = dataset.GetMetadata()
+    units = metadata.get("time#units", "")
+    match = re.match(r"(\w+) since (.+)", units)
+    if not match:
+        raise ValueError("NetCDF time dimension has no 'UNITS since DATE' units")
+    unit, origin = match.groups()
+    offsets = [
+        float(dataset.GetRasterBand(i + 1).GetMetadataItem("NETCDF_DIM_time"))
+        for i in range(dataset.RasterCount)
+    ]
+    unit = {"days": "D", "hours": "h", "minutes": "min", "seconds": "s"}.get(
+        unit.lower(), unit
+    )
+    return pd.Timestamp(origin.strip()).tz_localize(None) + pd.to_timedelta(
+        offsets, unit=unit
+    )
+
+
+def read_netcdf(path, index):
+    """Gridded NetCDF weather (variables named as in ``NETCDF_VARIABLES``)
+    averaged per neighborhood and day."""
+    gdal = _gdal()
+    dataset = gdal.Open(str(path))
+    variables = {name.split(":")[-1]: name for name, _ in dataset.GetSubDatasets()} or {
+        dataset.GetRasterBand(1).GetMetadataItem("NETCDF_VARNAME"): str(path)
+    }
+    frames = []
+    for feature, aliases in NETCDF_VARIABLES.items():
+        variable = next(
+            (variables[alias] for alias in aliases if alias in variables), None
+        )
+        if variable is None:
+            continue
+        grid = gdal.Open(variable)
+        window, geotransform = _bounds_window(grid, index)
+        means = zonal_means(geotransform, _read_bands(grid, window), index)
+        frame = pd.DataFrame(means, columns=index.names)
+        frame["day"] = _band_days(grid).normalize()
+        frame = frame.groupby("day").agg(DAILY_AGGREGATION[feature])
+        frames.append(frame.stack().rename(feature))
+    if not frames:
+        raise ValueError(
+            f"No variables in {Path(path).name} match {', '.join(NETCDF_VARIABLES)}"
+        )
+    wide = pd.concat(frames, axis=1).rename_axis(["day", "area"]).reset_index()
+    return _daily(wide)
+
+
+def read_ndvi(path, index):
+    """NDVI scene averaged per neighborhood, dated by its file name."""
+    match = FILE_DATE.search(Path(path).name)
+    if not match:
+        raise ValueError(
+            f"No date (YYYY-MM-DD or YYYYMMDD) in NDVI file name {Path(path).name}"
+        )
+    dataset = _gdal().Open(str(path))
+    window, geotransform = _bounds_window(dataset, index)
+    band = _read_bands(dataset, window)[:1]
+    if np.nanmax(np.abs(band), initial=0.0) > 1.5:
+        band = band / 10000.0  # unscaled integer NDVI (e.g. MODIS)
+    means = zonal_means(geotransform, band, index)[0]
+    return _daily(
+        pd.DataFrame(
+            {
+                "day": pd.Timestamp("-".join(match.groups())),
+                "area": index.names,
+                "vegetation": means,
+            }
+        )
+    )
+
+
+def read_feed_file(path, index):
+    """Long ``READING_COLUMNS`` readings from one feed file."""
+    suffix = Path(path).suffix.lower()
+    if suffix in STATION_SUFFIXES:
+        return read_stations(path, index)
+    if suffix in NETCDF_SUFFIXES:
+        return read_netcdf(path, index)
+    if suffix in NDVI_SUFFIXES:
+        return read_ndvi(path, index)
+    raise ValueError(f"Unsupported feed file {Path(path).name}")
+
+
+def feed_files(directory):
+    suffixes = STATION_SUFFIXES + NETCDF_SUFFIXES + NDVI_SUFFIXES
+    return sorted(
+        path
+        for path in Path(directory).rglob("*")
+        if path.suffix.lower() in suffixes and path.is_file()
+    )
+
+
+class EnvironmentStore:
+    """Daily environmental readings per neighborhood, fed from a drop directory."""
+
+    def __init__(self, path=ENV_STORE_PATH, index=None):
+        self.path = str(path)
+        self.index = (
+            index if index is not None else NeighborhoodIndex(load_neighborhoods())
+        )
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT OR IGNORE INTO env_meta (key, value) VALUES ('version', 0)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def version(self):
+        """Bumped by every ingest that changes readings."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT value FROM env_meta WHERE key = 'version'"
+            ).fetchone()[0]
+
+    def manifest(self):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT path, digest, size, mtime, readings, ingested_at FROM env_manifest"
+            ).fetchall()
+        return pd.DataFrame(
+            rows, columns=["path", "digest", "size", "mtime", "readings", "ingested_at"]
+        )
+
+    def ingest(self, directory=ENV_FEED_DIR):
+        """Read new and changed files under ``directory`` and drop readings of
+        deleted ones.
+
+        Returns counts of ``processed``, ``unchanged`` and ``removed`` files
+        and the ``failed`` files with their errors; failed files are retried
+        on the next ingest.
+        """
+        directory = Path(directory).resolve()
+        known = self.manifest().set_index("path")
+        files = feed_files(directory)
+        report = {"processed": 0, "unchanged": 0, "removed": 0, "failed": {}}
+        for path in files:
+            key = str(path)
+            stat = path.stat()
+            if (
+                key in known.index
+                and known.at[key, "size"] == stat.st_size
+                and known.at[key, "mtime"] == stat.st_mtime
+            ):
+                report["unchanged"] += 1
+                continue
+            digest = file_digest(path)
+            if key in known.index and known.at[key, "digest"] == digest:
+                # Touched but not changed
+                with self._connect() as conn:
+                    conn.execute(
+                        "UPDATE env_manifest SET mtime = ? WHERE path = ?",
+                        (stat.st_mtime, key),
+                    )
+                report["unchanged"] += 1
+                continue
+            try:
+                readings = read_feed_file(path, self.index)
+            except (ValueError, RuntimeError, OSError, pd.errors.ParserError) as e:
+                report["failed"][key] = str(e)
+                continue
+            self._replace(key, readings, (digest, stat.st_size, stat.st_mtime))
+            report["processed"] += 1
+
+        # Files of this directory that have disappeared since the last ingest
+        present = {str(path) for path in files}
+        gone = [
+            key
+            for key in known.index
+            if key not in present and Path(key).is_relative_to(directory)
+        ]
+        for key in gone:
+            self._replace(key, None)
+            report["removed"] += 1
+        return report
+
+    def _replace(self, source, readings, manifest=None):
+        # One transaction: a file's readings are swapped atomically
+        with self._connect() as conn:
+            conn.execute("DELETE FROM env_readings WHERE source = ?", (source,))
+            if readings is None:
+                conn.execute("DELETE FROM env_manifest WHERE path = ?", (source,))
+            else:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO env_readings (area, day, feature, source, value) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (area, day, feature, source, float(value))
+                        for day, area, feature, value in readings[
+                            READING_COLUMNS
+                        ].itertuples(index=False)
+                    ],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO env_manifest (path, digest, size, mtime, readings, ingested_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (source, *manifest, len(readings), time.time()),
+                )
+            conn.execute("UPDATE env_meta SET value = value + 1 WHERE key = 'version'")
+
+    def readings(self, area=None, start=None, end=None):
+        """Daily readings (``day``, ``area`` and ``FEATURES`` columns), averaged
+        over source files; ``start``/``end`` are inclusive dates."""
+        clauses, params = [], []
+        if area is not None:
+            clauses.append("area = ?")
+            params.append(area)
+        if start is not None:
+            clauses.append("day >= ?")
+            params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+        if end is not None:
+            clauses.append("day <= ?")
+            params.append(pd.Timestamp(end).strftime("%Y-%m-%d"))
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT day, area, feature, AVG(value) FROM env_readings{where} GROUP BY area, day, feature",
+                params,
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=READING_COLUMNS)
+        wide = frame.pivot_table(
+            index=["day", "area"], columns="feature", values="value"
+        )
+        wide = wide.reindex(columns=FEATURES).reset_index()
+        wide["day"] = pd.to_datetime(wide["day"])
+        wide.columns.name = None
+        return wide.sort_values(["day", "area"], ignore_index=True)
+
+    def latest(self):
+        """Most recent reading of every feature per neighborhood, indexed by area."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT r.area, r.feature, AVG(r.value), r.day FROM env_readings r
+                JOIN (SELECT area, feature, MAX(day) AS day FROM env_readings GROUP BY area, feature) m
+                    ON r.area = m.area AND r.feature = m.feature AND r.day = m.day
+                GROUP BY r.area, r.feature
+            """
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=["area", "feature", "value", "day"])
+        latest = frame.pivot(index="area", columns="feature", values="value").reindex(
+            columns=FEATURES
+        )
+        latest["day"] = pd.to_datetime(frame.groupby("area")["day"].max())
+        latest.columns.name = None
+        return latest
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        sys.exit("usage: python -m utils.env_feed [FEED_DIR]")
+    print(
+        EnvironmentStore().ingest(sys.argv[1] if len(sys.argv) == 2 else ENV_FEED_DIR)
+    )
@@ -0,0 +1,282 @@
+"""Environmental dengue risk model (rainfall, temperature, humidity, NDVI).
+
+A small multilayer perceptron classifies conditions as Low / Medium / High
+risk.  Training and inference are both plain NumPy, so pages can predict
+without importing TensorFlow; the fitted weights and input scaling are
+stored together in one ``.npz`` file.  A model shipped under ``model/`` is
+never written to; models trained at runtime are saved under
+``GENERATED_MODEL_DIR``.
+
+Until labelled outbreak data is available the model is bootstrapped from
+``synthetic_training_data``, which labels samples with the composite weather
+score from ``utils.scoring``.  The shipped ``model/environmental_model.npz``
+is that bootstrap, trained offline with::
+
+    python -m utils.env_model --synthetic model/environmental_model.npz
+
+so pages never train on a request; a checkout without it trains the same
+model once on first use.  Retrain on real data (saved to
+``TRAINED_MODEL_PATH``, which then takes precedence) with::
+
+    python -m utils.env_model training.csv
+
+where the CSV has the ``FEATURES`` columns plus a ``risk_level`` column
+(0/1/2 or Low/Medium/High).
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.paths import GENERATED_MODEL_DIR, MODEL_DIR
+from utils.scoring import DEFAULT_RANGES, normalize, score_risk
+
+FEATURES = ["rainfall", "temperature", "humidity", "vegetation"]
+RISK_LEVELS = ["Low", "Medium", "High"]
+
+# Shipped model
+MODEL_PATH = MODEL_DIR / "environmental_model.npz"
+
+# Retrained on labelled data with the CLI below
+TRAINED_MODEL_PATH = GENERATED_MODEL_DIR / "environmental_model.npz"
+
+# Bootstrapped from synthetic data when no other model exists
+BOOTSTRAP_MODEL_PATH = GENERATED_MODEL_DIR / "environmental_model_bootstrap.npz"
+
+# Suggested intervention strategy for each risk level
+INTERVENTIONS = {
+    "Low": "No immediate action required. Monitor conditions regularly.",
+    "Medium": "Increase surveillance and public awareness. Remove stagnant water sources.",
+    "High": "Implement emergency measures. Conduct fogging and distribute mosquito nets.",
+}
+
+# Composite score cut-offs between Low/Medium and Medium/High for bootstrap labels
+SYNTHETIC_THRESHOLDS = (0.45, 0.6)
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits
+
+
+class EnvironmentalModel:
+    """Standardize inputs, then a ReLU hidden layer and a softmax output."""
+
+    def __init__(self, mean, scale, w1, b1, w2, b2, labels=RISK_LEVELS):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.w1 = np.asarray(w1, dtype=np.float32)
+        self.b1 = np.asarray(b1, dtype=np.float32)
+        self.w2 = np.asarray(w2, dtype=np.float32)
+        self.b2 = np.asarray(b2, dtype=np.float32)
+        self.labels = list(labels)
+
+    def predict_proba(self, features):
+        """Class probabilities, shape ``(n_rows, len(labels))``."""
+        x = (
+            np.asarray(features, dtype=np.float32).reshape(-1, len(FEATURES))
+            - self.mean
+        ) / self.scale
+        hidden = np.maximum(x @ self.w1 + self.b1, 0.0)
+        return _softmax(hidden @ self.w2 + self.b2)
+
+    def predict(self, features):
+        """Index of the most likely class for each row."""
+        return self.predict_proba(features).argmax(axis=1)
+
+    def save(self, path=TRAINED_MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            mean=self.mean,
+            scale=self.scale,
+            w1=self.w1,
+            b1=self.b1,
+            w2=self.w2,
+            b2=self.b2,
+            labels=np.array(self.labels),
+        )
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with np.load(path) as f:
+            return cls(
+                f["mean"],
+                f["scale"],
+                f["w1"],
+                f["b1"],
+                f["w2"],
+                f["b2"],
+                f["labels"].tolist(),
+            )
+
+
+def synthetic_training_data(n_samples=6000, seed=0):
+    """Bootstrap samples over typical Lahore conditions, labelled by the
+    composite weather score plus vegetation cover, cut at ``SYNTHETIC_THRESHOLDS``."""
+    rng = np.random.default_rng(seed)
+    features = np.column_stack(
+        [
+            rng.gamma(1.5, 40.0, n_samples).clip(0, DEFAULT_RANGES["rainfall"][1]),
+            rng.uniform(5.0, 45.0, n_samples),
+            rng.uniform(10.0, 100.0, n_samples),
+            rng.uniform(-0.2, 0.9, n_samples),
+        ]
+    ).astype(np.float32)
+
+    weather = score_risk(
+        features[:, 0],
+        features[:, 1],
+        features[:, 2],
+        water_coverage=0.0,
+        past_cases=0.0,
+    )["Weather_Risk_Score"]
+    risk = 0.75 * weather + 0.25 * normalize(features[:, 3], "fixed", (-1.0, 1.0))
+    risk += rng.normal(0.0, 0.03, n_samples).astype(np.float32)
+    labels = np.digitize(risk, SYNTHETIC_THRESHOLDS)
+    return features, labels
+
+
+def train_model(
+    features, labels, hidden_units=16, epochs=800, learning_rate=0.01, seed=0
+):
+    """Fit an :class:`EnvironmentalModel` with full-batch Adam on cross-entropy."""
+    features = np.asarray(features, dtype=np.float32)
+    labels = np.asarray(labels, dtype=np.int64)
+    n_classes = len(RISK_LEVELS)
+    rng = np.random.default_rng(seed)
+
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    x = (features - mean) / scale
+    targets = np.eye(n_classes, dtype=np.float32)[labels]
+
+    params = [
+        rng.normal(0.0, np.sqrt(2.0 / x.shape[1]), (x.shape[1], hidden_units)).astype(
+            np.float32
+        ),
+        np.zeros(hidden_units, dtype=np.float32),
+        rng.normal(0.0, np.sqrt(1.0 / hidden_units), (hidden_units, n_classes)).astype(
+            np.float32
+        ),
+        np.zeros(n_classes, dtype=np.float32),
+    ]
+    moments = [np.zeros_like(p) for p in params]
+    velocities = [np.zeros_like(p) for p in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    for step in range(1, epochs + 1):
+        w1, b1, w2, b2 = params
+        pre = x @ w1 + b1
+        hidden = np.maximum(pre, 0.0)
+        probs = _softmax(hidden @ w2 + b2)
+
+        d_logits = (probs - targets) / len(x)
+        d_hidden = (d_logits @ w2.T) * (pre > 0)
+        grads = [
+            x.T @ d_hidden,
+            d_hidden.sum(axis=0),
+            hidden.T @ d_logits,
+            d_logits.sum(axis=0),
+        ]
+
+        for i, grad in enumerate(grads):
+            moments[i] = beta1 * moments[i] + (1 - beta1) * grad
+            velocities[i] = beta2 * velocities[i] + (1 - beta2) * grad * grad
+            m_hat = moments[i] / (1 - beta1**step)
+            v_hat = velocities[i] / (1 - beta2**step)
+            params[i] -= learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+
+    return EnvironmentalModel(mean, scale, *params)
+
+
+def train_from_csv(csv_path, model_path=TRAINED_MODEL_PATH):
+    """Train on a labelled CSV (see module docstring) and save the model."""
+    data = pd.read_csv(csv_path)
+    labels = data["risk_level"]
+    if not pd.api.types.is_numeric_dtype(labels):
+        labels = labels.map({name: i for i, name in enumerate(RISK_LEVELS)})
+    model = train_model(data[FEATURES].to_numpy(), labels.to_numpy())
+    model.save(model_path)
+    return model
+
+
+def bootstrap_model():
+    """The model trained on ``synthetic_training_data``."""
+    return train_model(*synthetic_training_data())
+
+
+@st.cache_resource(show_spinner="Loading model...")
+def load_model(model_path=None):
+    """The environmental model, loaded once per process.
+
+    Loads ``model_path`` if given, else the first that exists of
+    ``TRAINED_MODEL_PATH`` and ``MODEL_PATH``.  Without either, a model is
+    bootstrapped from synthetic data and saved to ``BOOTSTRAP_MODEL_PATH``.
+    """
+    if model_path is not None:
+        return EnvironmentalModel.load(model_path)
+    for path in (TRAINED_MODEL_PATH, MODEL_PATH, BOOTSTRAP_MODEL_PATH):
+        if Path(path).exists():
+            return EnvironmentalModel.load(path)
+    model = bootstrap_model()
+    model.save(BOOTSTRAP_MODEL_PATH)
+    return model
+
+
+def predict_risk(model, input_data):
+    """Return ``(risk_index, probabilities)`` for a single row of features."""
+    probabilities = model.predict_proba(input_data)[0]
+    return int(probabilities.argmax()), probabilities
+
+
+def predict_batch(model, data):
+    """Score every row of ``data`` in one vectorized forward pass.
+
+    ``data`` is a DataFrame with the ``FEATURES`` columns (other columns,
+    e.g. ``location``, are passed through).  Returns a copy with
+    ``risk_level``, ``confidence``, one ``P(<level>)`` column per class and
+    ``intervention`` appended.  Raises ``ValueError`` if feature columns are
+    missing or non-numeric.
+    """
+    missing = [name for name in FEATURES if name not in data.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    features = data[FEATURES].apply(pd.to_numeric, errors="coerce")
+    invalid = features.isna().any(axis=1)
+    if invalid.any():
+        rows = ", ".join(str(i) for i in data.index[invalid][:5])
+        raise ValueError(
+            f"{int(invalid.sum())} rows have missing or non-numeric values (e.g. rows {rows})"
+        )
+
+    probabilities = model.predict_proba(features.to_numpy(dtype=np.float32))
+    levels = np.array(model.labels)[probabilities.argmax(axis=1)]
+    results = data.copy()
+    results["risk_level"] = levels
+    results["confidence"] = probabilities.max(axis=1)
+    for i, label in enumerate(model.labels):
+        results[f"P({label})"] = probabilities[:, i]
+    results["intervention"] = pd.Series(levels, index=data.index).map(INTERVENTIONS)
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--synthetic":
+        bootstrap_model().save(sys.argv[2])
+        print(sys.argv[2])
+    elif len(sys.argv) == 2:
+        train_from_csv(sys.argv[1])
+        print(TRAINED_MODEL_PATH)
+    else:
+        sys.exit(
+            "usage: python -m utils.env_model TRAINING.csv\n"
+            "       python -m utils.env_model --synthetic OUT.npz"
+        )
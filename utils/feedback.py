@@ -0,0 +1,219 @@
+"""Citizen feedback intake for the fumigation campaign.
+
+``FeedbackQueue.submit`` only puts the submission on an in-memory queue and
+returns, so the page never waits on disk.  A background thread drains the
+queue and commits submissions to a local SQLite file in batches.  Repeated
+submissions (same city and message on the same day, ignoring case and
+spacing) are dropped by a unique digest, and the review view reads pages of
+feedback through a (city, time) index.  A batch that fails to commit (e.g.
+the database stays locked) is kept and retried, and the error is reported
+in ``last_error``.
+"""
+
+import atexit
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from utils.paths import DATA_DIR
+
+FEEDBACK_PATH = DATA_DIR / "feedback.sqlite"
+
+FEEDBACK_COLUMNS = ["submitted_at", "city", "message"]
+
+DEFAULT_BATCH_SIZE = 200
+
+# Seconds the writer waits for more submissions before committing a batch
+FLUSH_INTERVAL = 0.5
+
+# Submissions held in memory before submit() starts refusing them
+MAX_PENDING = 10000
+
+# Seconds before a batch that failed to commit is retried
+RETRY_INTERVAL = 5.0
+
+
+def feedback_digest(city, message, submitted_at):
+    """Identity of a submission for de-duplication."""
+    normalized = " ".join(message.lower().split())
+    day = datetime.fromtimestamp(submitted_at).strftime("%Y-%m-%d")
+    return hashlib.blake2b(
+        f"{city}\n{day}\n{normalized}".encode(), digest_size=16
+    ).hexdigest()
+
+
+class FeedbackQueue:
+    """Asynchronous, batch-committing feedback store."""
+
+    def __init__(
+        self,
+        path=FEEDBACK_PATH,
+        batch_size=DEFAULT_BATCH_SIZE,
+        flush_interval=FLUSH_INTERVAL,
+        max_pending=MAX_PENDING,
+        retry_interval=RETRY_INTERVAL,
+    ):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retry_interval = retry_interval
+        self.written = 0
+        self.duplicates = 0
+        self.last_error = None
+        # Submissions whose commit failed, retried before newer ones
+        self._failed = []
+        self._queue = queue.Queue(maxsize=max_pending)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS feedback (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    submitted_at REAL NOT NULL,
+                    city TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    digest TEXT NOT NULL UNIQUE
+                )
+            """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS feedback_by_city ON feedback (city, submitted_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS feedback_by_time ON feedback (submitted_at)"
+            )
+
+        self._writer = threading.Thread(
+            target=self._run, name="feedback-writer", daemon=True
+        )
+        self._writer.start()
+        # Commit whatever is still queued when the server shuts down
+        atexit.register(self.flush)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def submit(self, city, message):
+        """Queue a submission; returns False if it is empty or the queue is full."""
+        message = message.strip()
+        if not message:
+            return False
+        submitted_at = time.time()
+        try:
+            self._queue.put_nowait(
+                (
+                    submitted_at,
+                    city,
+                    message,
+                    feedback_digest(city, message, submitted_at),
+                )
+            )
+        except queue.Full:
+            return False
+        return True
+
+    def pending(self):
+        return self._queue.qsize() + len(self._failed)
+
+    def flush(self):
+        """Block until every queued submission has been written or has failed
+        to (see ``last_error``; failed ones are retried later)."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            try:
+                # Wake up to retry failed submissions even if nothing new arrives
+                first = self._queue.get(
+                    timeout=self.retry_interval if self._failed else None
+                )
+            except queue.Empty:
+                first = None
+            batch = [] if first is None else [first]
+            deadline = time.monotonic() + self.flush_interval
+            while batch and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            rows = self._failed + batch
+            try:
+                self._write(rows)
+            except Exception as e:  # a failing write must not stop the writer
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._failed = rows[: self.max_pending]
+            else:
+                self.last_error = None
+                self._failed = []
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO feedback (submitted_at, city, message, digest) VALUES (?, ?, ?, ?)",
+                batch,
+            )
+            inserted = conn.total_changes - before
+        self.written += inserted
+        self.duplicates += len(batch) - inserted
+
+    @staticmethod
+    def _where(city=None, start=None, end=None):
+        clauses, params = [], []
+        if city is not None:
+            clauses.append("city = ?")
+            params.append(city)
+        if start is not None:
+            clauses.append("submitted_at >= ?")
+            params.append(datetime.combine(start, datetime.min.time()).timestamp())
+        if end is not None:
+            # ``end`` is inclusive of the whole day
+            clauses.append("submitted_at < ?")
+            params.append(
+                datetime.combine(
+                    end + timedelta(days=1), datetime.min.time()
+                ).timestamp()
+            )
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, city=None, start=None, end=None):
+        where, params = self._where(city, start, end)
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM feedback{where}", params
+            ).fetchone()[0]
+
+    def page(self, page=0, page_size=20, city=None, start=None, end=None):
+        """One page of committed feedback, newest first (``FEEDBACK_COLUMNS``);
+        ``start``/``end`` are inclusive dates."""
+        where, params = self._where(city, start, end)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(FEEDBACK_COLUMNS)} FROM feedback{where} "
+                "ORDER BY submitted_at DESC LIMIT ? OFFSET ?",
+                params + [page_size, page * page_size],
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=FEEDBACK_COLUMNS)
+        frame["submitted_at"] = pd.to_datetime(frame["submitted_at"], unit="s")
+        return frame
@@ -0,0 +1,302 @@
+"""Fumigation progress reported by field teams.
+
+Teams report how far through each sector they are (cumulative percent) for
+a given day.  Reports are appended to a log in a local SQLite file that
+refuses updates and deletes, and an insert trigger keeps the best progress
+per (city, sector, day) in a rollup table, so reads never scan the raw log.
+City progress curves, rolling daily rates and completion ETAs are computed
+from that rollup for every city at once with vectorized pandas operations.
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.paths import DATA_DIR
+
+FUMIGATION_PATH = DATA_DIR / "fumigation.sqlite"
+
+# Cities under a fumigation campaign and how many sectors each is split into
+PLAN_COLUMNS = ["City", "Latitude", "Longitude", "Sectors"]
+
+REPORT_COLUMNS = ["Date", "City", "Sector", "Team", "Progress"]
+
+# Days of progress averaged into the current daily rate
+RATE_WINDOW = 7
+
+SUMMARY_COLUMNS = [
+    "City",
+    "Latitude",
+    "Longitude",
+    "Progress (%)",
+    "Daily Rate (%)",
+    "Estimated Completion (Days)",
+    "Last Report",
+]
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS fumigation_plan (
+        city TEXT PRIMARY KEY,
+        latitude REAL NOT NULL,
+        longitude REAL NOT NULL,
+        sectors INTEGER NOT NULL CHECK (sectors > 0)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fumigation_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        reported_at REAL NOT NULL,
+        day TEXT NOT NULL,
+        city TEXT NOT NULL,
+        sector TEXT NOT NULL,
+        team TEXT,
+        progress REAL NOT NULL CHECK (progress BETWEEN 0 AND 100)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS fumigation_events_by_city ON fumigation_events (city, day)",
+    """
+    CREATE TABLE IF NOT EXISTS fumigation_sector_days (
+        city TEXT NOT NULL,
+        sector TEXT NOT NULL,
+        day TEXT NOT NULL,
+        progress REAL NOT NULL,
+        PRIMARY KEY (city, day, sector)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS fumigation_events_rollup AFTER INSERT ON fumigation_events BEGIN
+        INSERT INTO fumigation_sector_days (city, sector, day, progress)
+            VALUES (NEW.city, NEW.sector, NEW.day, NEW.progress)
+            ON CONFLICT (city, day, sector) DO UPDATE SET progress = MAX(progress, excluded.progress);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS fumigation_events_no_update BEFORE UPDATE ON fumigation_events BEGIN
+        SELECT RAISE(ABORT, 'fumigation_events is append-only');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS fumigation_events_no_delete BEFORE DELETE ON fumigation_events BEGIN
+        SELECT RAISE(ABORT, 'fumigation_events is append-only');
+    END
+    """,
+)
+
+
+def sector_name(sector):
+    """Canonical sector name, so " a " and "A" are the same sector."""
+    if sector is None or pd.isna(sector):
+        return ""
+    return " ".join(str(sector).split()).upper()
+
+
+class FumigationStore:
+    """Append-only log of fumigation reports plus the campaign plan."""
+
+    def __init__(self, path=FUMIGATION_PATH):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM fumigation_events").fetchone()[0]
+
+    def version(self):
+        """Changes whenever a report is appended or the plan changes."""
+        with self._connect() as conn:
+            last_event = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM fumigation_events"
+            ).fetchone()[0]
+            plan = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(sectors), 0) FROM fumigation_plan"
+            ).fetchone()
+        return f"{last_event}-{plan[0]}-{plan[1]}"
+
+    def plan(self):
+        """Planned cities in the order they were added."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT city, latitude, longitude, sectors FROM fumigation_plan ORDER BY rowid"
+            ).fetchall()
+        return pd.DataFrame(rows, columns=PLAN_COLUMNS)
+
+    def set_plan(self, frame):
+        """Add or update cities in the plan (``PLAN_COLUMNS``)."""
+        missing = [column for column in PLAN_COLUMNS if column not in frame.columns]
+        if missing:
+            raise ValueError(f"Plan is missing columns: {', '.join(missing)}")
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO fumigation_plan (city, latitude, longitude, sectors) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (city) DO UPDATE SET latitude = excluded.latitude, "
+                "longitude = excluded.longitude, sectors = excluded.sectors",
+                [
+                    (str(c), float(lat), float(lon), int(n))
+                    for c, lat, lon, n in frame[PLAN_COLUMNS].itertuples(index=False)
+                ],
+            )
+
+    def seed_plan(self, frame):
+        """Load ``frame`` as the plan if no plan exists yet."""
+        with self._connect() as conn:
+            empty = (
+                conn.execute("SELECT 1 FROM fumigation_plan LIMIT 1").fetchone() is None
+            )
+        if empty:
+            self.set_plan(frame)
+
+    def report(self, frame):
+        """Append team reports (``REPORT_COLUMNS``; ``Team`` is optional).
+
+        ``Progress`` is the cumulative percent of the sector fumigated by the
+        end of ``Date``.  Sector names are normalized with
+        :func:`sector_name`.  Returns the number of reports appended.
+        """
+        missing = [
+            column
+            for column in REPORT_COLUMNS
+            if column not in frame.columns and column != "Team"
+        ]
+        if missing:
+            raise ValueError(f"Reports are missing columns: {', '.join(missing)}")
+        days = pd.to_datetime(frame["Date"], errors="coerce")
+        if days.isna().any():
+            raise ValueError(
+                f"{int(days.isna().sum())} reports have an unreadable Date"
+            )
+        progress = pd.to_numeric(frame["Progress"], errors="coerce")
+        if progress.isna().any() or not progress.between(0, 100).all():
+            raise ValueError("Progress must be a percentage between 0 and 100")
+        sectors = frame["Sector"].map(sector_name)
+        if (sectors == "").any():
+            raise ValueError(f"{int((sectors == '').sum())} reports have no Sector")
+        unknown = set(frame["City"]) - set(self.plan()["City"])
+        if unknown:
+            raise ValueError(
+                f"Cities not in the fumigation plan: {', '.join(sorted(map(str, unknown)))}"
+            )
+
+        teams = frame["Team"] if "Team" in frame.columns else [None] * len(frame)
+        now = time.time()
+        records = [
+            (
+                now,
+                day,
+                str(city),
+                sector,
+                None if team is None or pd.isna(team) else str(team),
+                float(value),
+            )
+            for day, city, sector, team, value in zip(
+                days.dt.strftime("%Y-%m-%d"),
+                frame["City"],
+                sectors,
+                teams,
+                progress,
+            )
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO fumigation_events (reported_at, day, city, sector, team, progress) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                records,
+            )
+        return len(records)
+
+    def sector_days(self, city=None):
+        """Best reported progress per city, sector and day (from the rollup)."""
+        where, params = (" WHERE city = ?", [city]) if city is not None else ("", [])
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT city, sector, day, progress FROM fumigation_sector_days{where}",
+                params,
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=["City", "Sector", "Date", "Progress"])
+        frame["Date"] = pd.to_datetime(frame["Date"])
+        return frame
+
+    def recent_reports(self, city=None, limit=50):
+        """Latest ``limit`` raw reports, newest first."""
+        where, params = (" WHERE city = ?", [city]) if city is not None else ("", [])
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT day, city, sector, team, progress FROM fumigation_events{where} ORDER BY id DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+
+def progress_curves(sector_days, plan):
+    """City progress (percent of planned sectors) per calendar day.
+
+    Returns a DataFrame indexed by date with one column per city; sectors
+    keep their best progress until a higher report arrives.
+    """
+    if sector_days.empty:
+        return pd.DataFrame(columns=plan["City"], dtype=float)
+    days = pd.date_range(sector_days["Date"].min(), sector_days["Date"].max(), freq="D")
+    by_sector = (
+        sector_days.pivot_table(
+            index="Date", columns=["City", "Sector"], values="Progress", aggfunc="max"
+        )
+        .reindex(days)
+        .cummax()
+        .ffill()
+        .fillna(0.0)
+    )
+    sectors = plan.set_index("City")["Sectors"]
+    totals = by_sector.T.groupby(level="City").sum().T
+    curves = totals / sectors.reindex(totals.columns).to_numpy()
+    return curves.clip(upper=100.0).reindex(columns=plan["City"], fill_value=0.0)
+
+
+def city_summary(sector_days, plan, window=RATE_WINDOW):
+    """Current progress, rolling daily rate and ETA for every planned city."""
+    curves = progress_curves(sector_days, plan)
+    summary = plan[["City", "Latitude", "Longitude"]].copy()
+    if curves.empty:
+        summary["Progress (%)"] = 0.0
+        summary["Daily Rate (%)"] = 0.0
+        summary["Estimated Completion (Days)"] = np.nan
+        summary["Last Report"] = pd.NaT
+        return summary[SUMMARY_COLUMNS]
+
+    # Mean daily gain over the last ``window`` days, for all cities at once
+    rates = (
+        curves.diff()
+        .fillna(curves.iloc[:1])
+        .rolling(window, min_periods=1)
+        .mean()
+        .iloc[-1]
+    )
+    progress = curves.iloc[-1]
+    remaining = 100.0 - progress
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eta = np.where(
+            remaining <= 0, 0.0, np.where(rates > 0, np.ceil(remaining / rates), np.nan)
+        )
+    last_report = sector_days.groupby("City")["Date"].max()
+
+    summary["Progress (%)"] = progress.to_numpy()
+    summary["Daily Rate (%)"] = rates.to_numpy()
+    summary["Estimated Completion (Days)"] = eta
+    summary["Last Report"] = summary["City"].map(last_report)
+    return summary[SUMMARY_COLUMNS]
@@ -0,0 +1,161 @@
+"""Bounded prediction history for the Environmental Factors dashboard.
+
+``RingBufferHistory`` keeps the latest ``capacity`` predictions of one
+session in a fixed-size NumPy structured array, so memory and render cost
+stay flat however many predictions are made.  ``SqliteHistory`` offers the
+same interface backed by a local SQLite file shared by every session.
+Both return pages of history as a single DataFrame, latest first.
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.env_model import INTERVENTIONS, RISK_LEVELS
+
+DEFAULT_CAPACITY = 1000
+
+HISTORY_COLUMNS = [
+    "time",
+    "location",
+    "rainfall",
+    "temperature",
+    "humidity",
+    "vegetation",
+    "risk_level",
+    "confidence",
+]
+
+HISTORY_DTYPE = np.dtype(
+    [
+        ("time", "f8"),
+        ("location", "U40"),
+        ("rainfall", "f4"),
+        ("temperature", "f4"),
+        ("humidity", "f4"),
+        ("vegetation", "f4"),
+        ("risk_level", "i1"),
+        ("confidence", "f4"),
+    ]
+)
+
+
+def _to_frame(rows):
+    # ``rows`` has HISTORY_COLUMNS with risk_level as an index into RISK_LEVELS
+    frame = pd.DataFrame(rows, columns=HISTORY_COLUMNS)
+    frame["time"] = pd.to_datetime(frame["time"], unit="s")
+    frame["risk_level"] = np.array(RISK_LEVELS)[frame["risk_level"].to_numpy(dtype=int)]
+    frame["intervention"] = frame["risk_level"].map(INTERVENTIONS)
+    return frame
+
+
+def _record_values(record):
+    return (
+        record.get("time", time.time()),
+        record["location"],
+        record["rainfall"],
+        record["temperature"],
+        record["humidity"],
+        record["vegetation"],
+        RISK_LEVELS.index(record["risk_level"]),
+        record.get("confidence", np.nan),
+    )
+
+
+class RingBufferHistory:
+    """Fixed-capacity in-memory history; the oldest entry is overwritten."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._rows = np.zeros(capacity, dtype=HISTORY_DTYPE)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, record):
+        self._rows[self._next] = _record_values(record)
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def page(self, page=0, page_size=20):
+        """Rows ``page * page_size`` .. ``+page_size`` counting from the latest."""
+        start = page * page_size
+        stop = min(start + page_size, self._size)
+        if start >= stop:
+            return _to_frame([])
+        # Offsets back from the most recent entry, mapped into the ring
+        positions = (self._next - 1 - np.arange(start, stop)) % self.capacity
+        return _to_frame(self._rows[positions].tolist())
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
+
+
+class SqliteHistory:
+    """History shared across sessions in a SQLite file, capped at ``capacity`` rows."""
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path = str(path)
+        self.capacity = capacity
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS predictions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    time REAL NOT NULL,
+                    location TEXT NOT NULL,
+                    rainfall REAL,
+                    temperature REAL,
+                    humidity REAL,
+                    vegetation REAL,
+                    risk_level INTEGER NOT NULL,
+                    confidence REAL
+                )
+            """
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def append(self, record):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO predictions ({', '.join(HISTORY_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                _record_values(record),
+            )
+            # Primary-key range delete keeps the table bounded
+            conn.execute(
+                "DELETE FROM predictions WHERE id <= ?",
+                (cursor.lastrowid - self.capacity,),
+            )
+
+    def page(self, page=0, page_size=20):
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(HISTORY_COLUMNS)} FROM predictions ORDER BY id DESC LIMIT ? OFFSET ?",
+                (page_size, page * page_size),
+            ).fetchall()
+        return _to_frame(rows)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM predictions")
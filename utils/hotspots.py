@@ -0,0 +1,270 @@
+"""Risk hotspot detection with the Getis-Ord Gi* statistic on a grid.
+
+Risk-map points are binned into square cells (``CELL_SIZE`` metres) holding
+the sum of their ``Total_Risk_Score``.  Gi* compares each cell's
+neighbourhood (a square window of ``NEIGHBOR_CELLS`` cells around it) with
+the whole grid; window sums come from summed-area tables, so the statistic
+for every cell costs a few array passes.  Cells that are significant hot
+spots are merged into connected polygons and ranked by the risk they hold.
+
+``HotspotGrid`` keeps the binned sums, so when only some points change the
+grid is patched with the removed and added points and Gi* is recomputed
+without re-binning the dataset.  ``HotspotEngine`` does this automatically
+between dataset versions.
+"""
+
+import threading
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+import streamlit as st
+
+# Cell edge in metres
+CELL_SIZE = 250
+
+# Gi* neighbourhood: cells within this many rows/columns of the cell
+NEIGHBOR_CELLS = 2
+
+# Gi* z-score for a 95% significant hot spot
+Z_THRESHOLD = 1.96
+
+WEIGHT_COLUMN = "Total_Risk_Score"
+
+# Above this share of changed points a refresh rebuilds the grid instead
+INCREMENTAL_LIMIT = 0.5
+
+HOTSPOT_COLUMNS = [
+    "rank",
+    "cells",
+    "points",
+    "total_risk",
+    "mean_risk",
+    "max_z",
+    "mean_z",
+    "Latitude",
+    "Longitude",
+    "geometry",
+]
+
+METRES_PER_DEGREE_LAT = 110574.0
+
+
+def _window_sum(values, radius):
+    """Sum over the ``(2r+1) x (2r+1)`` window around every cell (clipped at edges)."""
+    table = np.zeros((values.shape[0] + 1, values.shape[1] + 1))
+    table[1:, 1:] = values.cumsum(axis=0).cumsum(axis=1)
+    rows, cols = values.shape
+    top = np.clip(np.arange(rows) - radius, 0, rows)
+    bottom = np.clip(np.arange(rows) + radius + 1, 0, rows)
+    left = np.clip(np.arange(cols) - radius, 0, cols)
+    right = np.clip(np.arange(cols) + radius + 1, 0, cols)
+    return (
+        table[bottom][:, right]
+        - table[top][:, right]
+        - table[bottom][:, left]
+        + table[top][:, left]
+    )
+
+
+class HotspotGrid:
+    """Per-cell risk sums and point counts over a fixed lat/lon grid."""
+
+    def __init__(
+        self, south, west, cell_lat, cell_lon, shape, weight_column=WEIGHT_COLUMN
+    ):
+        self.south = south
+        self.west = west
+        self.cell_lat = cell_lat
+        self.cell_lon = cell_lon
+        self.weight_column = weight_column
+        self.sums = np.zeros(shape)
+        self.counts = np.zeros(shape, dtype=np.int64)
+
+    @classmethod
+    def build(cls, data, weight_column=WEIGHT_COLUMN, cell_size=CELL_SIZE):
+        """Grid covering ``data`` with every point binned."""
+        latitude = data["Latitude"].to_numpy(dtype=float)
+        longitude = data["Longitude"].to_numpy(dtype=float)
+        south, north = np.nanmin(latitude), np.nanmax(latitude)
+        west, east = np.nanmin(longitude), np.nanmax(longitude)
+        cell_lat = cell_size / METRES_PER_DEGREE_LAT
+        cell_lon = cell_lat / np.cos(np.radians((south + north) / 2))
+        shape = (int((north - south) / cell_lat) + 1, int((east - west) / cell_lon) + 1)
+        grid = cls(south, west, cell_lat, cell_lon, shape, weight_column)
+        grid.add(data)
+        return grid
+
+    def _cells(self, data):
+        rows = np.floor(
+            (data["Latitude"].to_numpy(dtype=float) - self.south) / self.cell_lat
+        ).astype(np.int64)
+        cols = np.floor(
+            (data["Longitude"].to_numpy(dtype=float) - self.west) / self.cell_lon
+        ).astype(np.int64)
+        inside = (
+            (rows >= 0)
+            & (rows < self.sums.shape[0])
+            & (cols >= 0)
+            & (cols < self.sums.shape[1])
+        )
+        return rows, cols, inside
+
+    def add(self, data, sign=1):
+        """Bin points into the grid (``sign=-1`` removes them).  Returns False,
+        changing nothing, if any point falls outside the grid.
+
+        Points without coordinates or a weight are skipped.
+        """
+        data = data.dropna(subset=["Latitude", "Longitude", self.weight_column])
+        rows, cols, inside = self._cells(data)
+        if not inside.all():
+            return False
+        np.add.at(
+            self.sums,
+            (rows, cols),
+            sign * data[self.weight_column].to_numpy(dtype=float),
+        )
+        np.add.at(self.counts, (rows, cols), sign)
+        return True
+
+    def update(self, removed, added):
+        """Patch the grid with changed points; False if a rebuild is needed."""
+        if not self.add(added):
+            return False
+        self.add(removed, sign=-1)
+        # Removing points leaves float residue in emptied cells
+        self.sums[self.counts == 0] = 0.0
+        return True
+
+    def gi_star(self, radius=NEIGHBOR_CELLS):
+        """Getis-Ord Gi* z-score of every cell (binary weights, self included)."""
+        x = self.sums
+        n = x.size
+        mean = x.mean()
+        std = np.sqrt(max((x**2).mean() - mean**2, 0.0))
+        weight = _window_sum(np.ones_like(x), radius)
+        numerator = _window_sum(x, radius) - mean * weight
+        denominator = std * np.sqrt((n * weight - weight**2) / max(n - 1, 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(denominator > 0, numerator / denominator, 0.0)
+        return z
+
+    def cell_boxes(self, rows, cols):
+        return shapely.box(
+            self.west + cols * self.cell_lon,
+            self.south + rows * self.cell_lat,
+            self.west + (cols + 1) * self.cell_lon,
+            self.south + (rows + 1) * self.cell_lat,
+        )
+
+    def hotspots(self, radius=NEIGHBOR_CELLS, threshold=Z_THRESHOLD):
+        """Ranked hot-spot polygons (``HOTSPOT_COLUMNS``) as a GeoDataFrame.
+
+        Significant cells that hold risk are merged with their edge
+        neighbours; polygons are ranked by the total risk inside them.
+        """
+        z = self.gi_star(radius)
+        rows, cols = np.nonzero((z >= threshold) & (self.counts > 0))
+        if not len(rows):
+            return gpd.GeoDataFrame(
+                columns=HOTSPOT_COLUMNS, geometry="geometry", crs=4326
+            )
+
+        boxes = self.cell_boxes(rows, cols)
+        merged = shapely.union_all(boxes)
+        polygons = np.array(getattr(merged, "geoms", [merged]))
+        # Which polygon each flagged cell belongs to
+        centers = shapely.centroid(boxes)
+        cell_index, polygon_index = shapely.STRtree(polygons).query(
+            centers, predicate="within"
+        )
+        owner = np.empty(len(rows), dtype=np.int64)
+        owner[cell_index] = polygon_index
+
+        cells = pd.DataFrame(
+            {
+                "polygon": owner,
+                "points": self.counts[rows, cols],
+                "risk": self.sums[rows, cols],
+                "z": z[rows, cols],
+            }
+        )
+        stats = cells.groupby("polygon").agg(
+            cells=("z", "size"),
+            points=("points", "sum"),
+            total_risk=("risk", "sum"),
+            max_z=("z", "max"),
+            mean_z=("z", "mean"),
+        )
+        stats["mean_risk"] = stats["total_risk"] / stats["points"]
+        centroids = shapely.centroid(polygons[stats.index])
+        stats["Latitude"] = shapely.get_y(centroids)
+        stats["Longitude"] = shapely.get_x(centroids)
+        stats = stats.sort_values("total_risk", ascending=False).reset_index()
+        stats["rank"] = np.arange(1, len(stats) + 1)
+        stats["geometry"] = polygons[stats["polygon"]]
+        return gpd.GeoDataFrame(stats[HOTSPOT_COLUMNS], geometry="geometry", crs=4326)
+
+
+def changed_points(old, new):
+    """Points ``(removed, added)`` between two versions of a dataset, matched by
+    row label: dropped and edited rows are removed, new and edited rows added.
+    A value missing in both versions is not an edit."""
+    if old.index.equals(new.index):
+        shared, before, after = old.index, old, new[old.columns]
+    else:
+        shared = old.index.intersection(new.index)
+        before, after = old.loc[shared], new.loc[shared, old.columns]
+    before_values, after_values = before.to_numpy(), after.to_numpy()
+    # Missing values on both sides are unchanged
+    same = (before_values == after_values) | (
+        pd.isna(before_values) & pd.isna(after_values)
+    )
+    edited = ~same.all(axis=1)
+    removed = pd.concat([old.loc[old.index.difference(shared)], before[edited]])
+    added = pd.concat([new.loc[new.index.difference(shared)], after[edited]])
+    return removed, added
+
+
+class HotspotEngine:
+    """Keeps one grid across dataset versions and patches it incrementally."""
+
+    def __init__(self, weight_column=WEIGHT_COLUMN, cell_size=CELL_SIZE):
+        self.weight_column = weight_column
+        self.cell_size = cell_size
+        self.version = None
+        self.grid = None
+        self._points = None
+        self._lock = threading.Lock()
+
+    def refresh(self, data, version):
+        """The grid for ``data``, patched from the previous version when few
+        points changed and rebuilt otherwise."""
+        with self._lock:
+            if version == self.version:
+                return self.grid
+            points = data[["Latitude", "Longitude", self.weight_column]]
+            patched = False
+            if self.grid is not None:
+                removed, added = changed_points(self._points, points)
+                if len(removed) + len(added) <= INCREMENTAL_LIMIT * len(points):
+                    patched = self.grid.update(removed, added)
+            if not patched:
+                self.grid = HotspotGrid.build(
+                    points, self.weight_column, self.cell_size
+                )
+            self._points, self.version = points, version
+            return self.grid
+
+
+@st.cache_resource
+def get_hotspot_engine():
+    return HotspotEngine()
+
+
+@st.cache_data(max_entries=4, show_spinner="Finding hotspots...")
+def get_hotspots(_data, version, threshold=Z_THRESHOLD):
+    """Ranked hot-spot polygons for the risk dataset, once per ``version``."""
+    return get_hotspot_engine().refresh(_data, version).hotspots(threshold=threshold)
@@ -0,0 +1,151 @@
+"""Content-hash cache for image classification results.
+
+Results are keyed on a BLAKE2 digest of the preprocessed 224x224 input
+tensor (plus a model identifier), so re-uploads of the same photo and
+unchanged survey tiles skip the forward pass.  An in-memory LRU sits in
+front of an optional SQLite tier that survives restarts and is shared by
+every process pointing at the same file.  The SQLite tier holds at most
+``db_capacity`` rows; each write evicts the rows least recently read from
+or written to the file.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_CAPACITY = 4096
+
+# Rows kept in the SQLite tier (about 100 bytes each)
+DEFAULT_DB_CAPACITY = 100_000
+
+
+def tensor_key(tensor, model_id=""):
+    """Hex digest identifying ``tensor`` as input to model ``model_id``."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_id.encode())
+    digest.update(np.ascontiguousarray(tensor, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class InferenceCache:
+    """LRU of ``key -> probabilities`` with an optional SQLite second tier."""
+
+    def __init__(
+        self, capacity=DEFAULT_CAPACITY, db_path=None, db_capacity=DEFAULT_DB_CAPACITY
+    ):
+        self.capacity = capacity
+        self.db_capacity = db_capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path is not None:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(
+                str(db_path), timeout=30, check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions "
+                "(key TEXT PRIMARY KEY, probabilities BLOB NOT NULL, accessed_at REAL NOT NULL DEFAULT 0)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS predictions_by_access ON predictions (accessed_at)"
+            )
+            self._db.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key, probabilities):
+        self._entries[key] = probabilities
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get_many(self, keys):
+        """Cached probabilities for each key (None where missing); counts hits/misses."""
+        found = [None] * len(keys)
+        with self._lock:
+            missing = []
+            for i, key in enumerate(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[i] = self._entries[key]
+                else:
+                    missing.append(i)
+
+            if missing and self._db is not None:
+                wanted = list({keys[i] for i in missing})
+                rows = self._db.execute(
+                    f"SELECT key, probabilities FROM predictions WHERE key IN ({', '.join('?' * len(wanted))})",
+                    wanted,
+                ).fetchall()
+                stored = {
+                    key: np.frombuffer(blob, dtype=np.float32) for key, blob in rows
+                }
+                if stored:
+                    self._db.executemany(
+                        "UPDATE predictions SET accessed_at = ? WHERE key = ?",
+                        [(time.time(), key) for key in stored],
+                    )
+                    self._db.commit()
+                for i in missing:
+                    if keys[i] in stored:
+                        found[i] = stored[keys[i]]
+                        self._remember(keys[i], found[i])
+
+            hits = sum(value is not None for value in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, keys, probabilities):
+        probabilities = [np.asarray(row, dtype=np.float32) for row in probabilities]
+        with self._lock:
+            for key, row in zip(keys, probabilities):
+                self._remember(key, row)
+            if self._db is not None:
+                now = time.time()
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO predictions (key, probabilities, accessed_at) VALUES (?, ?, ?)",
+                    [
+                        (key, row.tobytes(), now)
+                        for key, row in zip(keys, probabilities)
+                    ],
+                )
+                self._evict()
+                self._db.commit()
+
+    def _evict(self):
+        """Delete the least recently used rows above ``db_capacity``."""
+        (count,) = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()
+        if count > self.db_capacity:
+            self._db.execute(
+                "DELETE FROM predictions WHERE key IN "
+                "(SELECT key FROM predictions ORDER BY accessed_at LIMIT ?)",
+                (count - self.db_capacity,),
+            )
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
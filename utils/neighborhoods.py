@@ -0,0 +1,94 @@
+"""Lahore neighborhoods and per-neighborhood risk rollups.
+
+Neighborhood polygons are read with geopandas and indexed with the
+GeoDataFrame's STRtree spatial index.  Risk-map points are assigned to
+neighborhoods in one vectorized ``within`` query against that index, and
+the mean/max of every risk score per neighborhood is computed once per
+dataset version, so a lookup such as "risk for Johar Town" is a label
+lookup in a small table instead of a scan over the points.
+"""
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+import streamlit as st
+
+from utils.paths import ROOT_DIR
+from utils.risk_store import RISK_SCORE_COLUMNS
+
+NEIGHBORHOODS_PATH = ROOT_DIR / "geodata" / "lahore_neighborhoods.geojson"
+
+
+def load_neighborhoods(path=NEIGHBORHOODS_PATH):
+    """Neighborhood polygons (``name``, ``geometry``) in WGS84."""
+    polygons = gpd.read_file(path)
+    if "name" not in polygons.columns:
+        raise ValueError(f"{path} has no 'name' property")
+    if polygons.crs is not None:
+        polygons = polygons.to_crs(4326)
+    return polygons[["name", "geometry"]].reset_index(drop=True)
+
+
+class NeighborhoodIndex:
+    """Point-in-neighborhood lookups through an STRtree."""
+
+    def __init__(self, polygons):
+        self.polygons = polygons.reset_index(drop=True)
+        self.names = self.polygons["name"].tolist()
+        # Built once here; geopandas' sindex is a shapely STRtree
+        self.tree = self.polygons.sindex
+
+    def assign(self, longitude, latitude):
+        """Index into ``names`` of the neighborhood holding each point (-1 if none)."""
+        points = shapely.points(
+            np.asarray(longitude, dtype=float), np.asarray(latitude, dtype=float)
+        )
+        point_index, polygon_index = self.tree.query(points, predicate="within")
+        codes = np.full(len(points), -1, dtype=np.int64)
+        codes[point_index] = polygon_index
+        return codes
+
+    def locate(self, longitude, latitude):
+        """Name of the neighborhood holding one point, or None."""
+        code = self.assign([longitude], [latitude])[0]
+        return self.names[code] if code >= 0 else None
+
+
+def neighborhood_risk(data, index, columns=RISK_SCORE_COLUMNS):
+    """Per-neighborhood point count and mean/max of each risk column.
+
+    Indexed by neighborhood name; neighborhoods without points have a
+    count of 0 and NaN scores.
+    """
+    codes = index.assign(data["Longitude"].to_numpy(), data["Latitude"].to_numpy())
+    inside = codes >= 0
+    scores = pd.DataFrame(
+        data.loc[inside, list(columns)].to_numpy(dtype=np.float64),
+        columns=list(columns),
+    )
+    grouped = scores.groupby(codes[inside])
+    rollup = pd.concat(
+        [grouped.mean().add_suffix("_mean"), grouped.max().add_suffix("_max")], axis=1
+    )
+    rollup.insert(0, "count", grouped.size())
+    rollup = rollup.reindex(range(len(index.names)))
+    rollup["count"] = rollup["count"].fillna(0).astype(np.int64)
+    rollup.index = pd.Index(index.names, name="name")
+    # Interleave as <col>_mean, <col>_max per column
+    order = ["count"] + [
+        f"{column}_{stat}" for column in columns for stat in ("mean", "max")
+    ]
+    return rollup[order]
+
+
+@st.cache_resource
+def get_neighborhood_index(path=NEIGHBORHOODS_PATH):
+    """Neighborhood polygons and their spatial index, loaded once per process."""
+    return NeighborhoodIndex(load_neighborhoods(path))
+
+
+@st.cache_data(max_entries=4, show_spinner="Summarising risk by neighborhood...")
+def get_neighborhood_risk(_data, version):
+    """:func:`neighborhood_risk` for the risk dataset, once per dataset ``version``."""
+    return neighborhood_risk(_data, get_neighborhood_index())
@@ -0,0 +1,19 @@
+"""Filesystem locations shared by the app's data and model helpers."""
+
+import os
+from pathlib import Path
+
+# Repository root (the directory that holds Home.py)
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Local data directory; override with DENGUE_DATA_DIR to keep state elsewhere
+DATA_DIR = Path(os.environ.get("DENGUE_DATA_DIR", ROOT_DIR / "data"))
+
+# Downloaded copies of remote datasets
+CACHE_DIR = DATA_DIR / "cache"
+
+# Trained / converted models shipped with the app (read-only at runtime)
+MODEL_DIR = ROOT_DIR / "model"
+
+# Models the app trains or converts itself at runtime
+GENERATED_MODEL_DIR = DATA_DIR / "models"
@@ -0,0 +1,263 @@
+"""Sliding-window stagnant-water mapping over large GeoTIFF scenes.
+
+A scene is opened with GDAL and read one 224x224 window at a time, so even
+multi-gigabyte rasters are processed in memory bounded by a single batch of
+tiles.  Windows are classified in batches by the stagnant-water model and
+the per-window probabilities form a georeferenced grid, which can be written
+as a GeoTIFF, exported as GeoJSON polygons of flagged cells, or turned into
+Latitude/Longitude points for the risk map's water-coverage layer.
+
+GDAL (``osgeo``) is an optional dependency imported only when a scene is
+opened or written; check ``gdal_available()`` before offering scene scans.
+"""
+
+import importlib.util
+import json
+
+import numpy as np
+import pandas as pd
+
+from utils.water_model import STAGNANT_WATER_CLASS, preprocess
+
+TILE_SIZE = 224
+
+DEFAULT_BATCH_SIZE = 32
+
+# Probability above which a cell is reported as stagnant water
+DEFAULT_THRESHOLD = 0.5
+
+
+def gdal_available():
+    """Whether the GDAL Python bindings can be imported."""
+    return importlib.util.find_spec("osgeo") is not None
+
+
+def _osgeo():
+    """The ``gdal`` and ``osr`` modules, raising errors as exceptions."""
+    from osgeo import gdal, osr
+
+    gdal.UseExceptions()
+    return gdal, osr
+
+
+class GeoScene:
+    """Windowed reader over an RGB (or single-band) GDAL raster."""
+
+    def __init__(self, dataset):
+        gdal, _ = _osgeo()
+        self.dataset = dataset
+        self.width = dataset.RasterXSize
+        self.height = dataset.RasterYSize
+        self.geotransform = dataset.GetGeoTransform()
+        self.projection = dataset.GetProjection()
+        band_count = min(dataset.RasterCount, 3)
+        self.bands = [dataset.GetRasterBand(i + 1) for i in range(band_count)]
+        self.nodata = self.bands[0].GetNoDataValue()
+
+        # Non-8-bit imagery (e.g. 16-bit reflectance) is stretched to 0..255
+        self._stretch = None
+        if self.bands[0].DataType != gdal.GDT_Byte:
+            ranges = [band.ComputeRasterMinMax(True) for band in self.bands]
+            self._stretch = (min(r[0] for r in ranges), max(r[1] for r in ranges))
+
+    @classmethod
+    def open(cls, path):
+        gdal, _ = _osgeo()
+        return cls(gdal.Open(str(path), gdal.GA_ReadOnly))
+
+    def read(self, xoff, yoff, xsize, ysize):
+        """``(ysize, xsize, 3)`` uint8 window and a mask of nodata pixels."""
+        planes = [band.ReadAsArray(xoff, yoff, xsize, ysize) for band in self.bands]
+        if self.nodata is None:
+            nodata = np.zeros(planes[0].shape, dtype=bool)
+        elif np.isnan(self.nodata):
+            nodata = np.isnan(planes[0])
+        else:
+            nodata = planes[0] == self.nodata
+        if len(planes) < 3:
+            planes = [planes[0]] * 3
+        window = np.stack(planes, axis=-1).astype(np.float32)
+        if self._stretch is not None:
+            low, high = self._stretch
+            window = (window - low) * (255.0 / max(high - low, 1e-6))
+        return np.clip(window, 0, 255).astype(np.uint8), nodata
+
+
+def iter_windows(width, height, tile_size=TILE_SIZE, stride=None):
+    """``(row, col, xoff, yoff, xsize, ysize)`` of every window; edge windows
+    are clipped to the raster."""
+    stride = stride or tile_size
+    for row, yoff in enumerate(range(0, height, stride)):
+        for col, xoff in enumerate(range(0, width, stride)):
+            yield row, col, xoff, yoff, min(tile_size, width - xoff), min(
+                tile_size, height - yoff
+            )
+
+
+class ProbabilityGrid:
+    """Stagnant-water probability per window, with its own geotransform.
+
+    ``probabilities`` is ``(rows, cols)`` float32; windows that were entirely
+    nodata are NaN.
+    """
+
+    def __init__(self, probabilities, geotransform, projection):
+        self.probabilities = probabilities
+        self.geotransform = geotransform
+        self.projection = projection
+
+    def cell_centers(self):
+        """Cell center coordinates ``(x, y)`` in the scene CRS, shape ``(rows, cols)``."""
+        x0, dx, rx, y0, ry, dy = self.geotransform
+        rows, cols = self.probabilities.shape
+        col, row = np.meshgrid(np.arange(cols) + 0.5, np.arange(rows) + 0.5)
+        return x0 + col * dx + row * rx, y0 + col * ry + row * dy
+
+    def _to_lonlat(self, x, y):
+        if not self.projection:
+            return x, y
+        _, osr = _osgeo()
+        source = osr.SpatialReference(wkt=self.projection)
+        target = osr.SpatialReference()
+        target.ImportFromEPSG(4326)
+        for srs in (source, target):
+            srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        transform = osr.CoordinateTransformation(source, target)
+        points = np.array(
+            transform.TransformPoints(np.column_stack([x.ravel(), y.ravel()]))
+        )
+        return points[:, 0].reshape(x.shape), points[:, 1].reshape(x.shape)
+
+    def to_points(self):
+        """DataFrame of cell centers (``Latitude``, ``Longitude``) and
+        ``stagnant_water_probability``, skipping nodata cells."""
+        lon, lat = self._to_lonlat(*self.cell_centers())
+        valid = ~np.isnan(self.probabilities)
+        return pd.DataFrame(
+            {
+                "Latitude": lat[valid],
+                "Longitude": lon[valid],
+                "stagnant_water_probability": self.probabilities[valid],
+            }
+        )
+
+    def to_geojson(self, threshold=DEFAULT_THRESHOLD):
+        """GeoJSON FeatureCollection (WGS84) of cells at or above ``threshold``."""
+        x0, dx, rx, y0, ry, dy = self.geotransform
+        rows, cols = np.nonzero(self.probabilities >= threshold)
+        # Four corners of every flagged cell, transformed in one call
+        corner_cols = cols[:, None] + np.array([0, 1, 1, 0])
+        corner_rows = rows[:, None] + np.array([0, 0, 1, 1])
+        lon, lat = self._to_lonlat(
+            x0 + corner_cols * dx + corner_rows * rx,
+            y0 + corner_cols * ry + corner_rows * dy,
+        )
+        features = []
+        for i, (row, col) in enumerate(zip(rows.tolist(), cols.tolist())):
+            ring = [[float(lon[i, k]), float(lat[i, k])] for k in (0, 1, 2, 3, 0)]
+            features.append(
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Polygon", "coordinates": [ring]},
+                    "properties": {
+                        "row": row,
+                        "col": col,
+                        "stagnant_water_probability": float(
+                            self.probabilities[row, col]
+                        ),
+                    },
+                }
+            )
+        return {"type": "FeatureCollection", "features": features}
+
+    def write_geojson(self, path, threshold=DEFAULT_THRESHOLD):
+        with open(path, "w") as f:
+            json.dump(self.to_geojson(threshold), f)
+
+    def write_geotiff(self, path):
+        """Write the probability grid as a single-band Float32 GeoTIFF."""
+        gdal, _ = _osgeo()
+        rows, cols = self.probabilities.shape
+        dataset = gdal.GetDriverByName("GTiff").Create(
+            str(path), cols, rows, 1, gdal.GDT_Float32, options=["COMPRESS=DEFLATE"]
+        )
+        dataset.SetGeoTransform(self.geotransform)
+        if self.projection:
+            dataset.SetProjection(self.projection)
+        band = dataset.GetRasterBand(1)
+        band.SetNoDataValue(float("nan"))
+        band.WriteArray(self.probabilities)
+        dataset.FlushCache()
+
+
+def scan_scene(
+    classifier,
+    scene,
+    tile_size=TILE_SIZE,
+    stride=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    progress=None,
+):
+    """Classify every window of ``scene`` and return a :class:`ProbabilityGrid`.
+
+    ``stride`` defaults to ``tile_size`` (non-overlapping windows).  Edge
+    windows are padded by repeating their border pixels.  ``progress(done,
+    total)`` is called after each batch.
+    """
+    stride = stride or tile_size
+    n_rows = -(-scene.height // stride)
+    n_cols = -(-scene.width // stride)
+    probabilities = np.full((n_rows, n_cols), np.nan, dtype=np.float32)
+    total = n_rows * n_cols
+
+    batch = np.empty(
+        (batch_size, classifier.image_size, classifier.image_size, 3), dtype=np.float32
+    )
+    cells = []
+    done = 0
+
+    def flush():
+        if cells:
+            scores = classifier.predict_proba(batch[: len(cells)])[
+                :, STAGNANT_WATER_CLASS
+            ]
+            rows, cols = np.array(cells).T
+            probabilities[rows, cols] = scores
+            cells.clear()
+        if progress is not None:
+            progress(done, total)
+
+    for row, col, xoff, yoff, xsize, ysize in iter_windows(
+        scene.width, scene.height, tile_size, stride
+    ):
+        done += 1
+        window, nodata = scene.read(xoff, yoff, xsize, ysize)
+        if nodata.all():
+            continue
+        if window.shape[:2] != (tile_size, tile_size):
+            window = np.pad(
+                window,
+                ((0, tile_size - ysize), (0, tile_size - xsize), (0, 0)),
+                mode="edge",
+            )
+        if tile_size == classifier.image_size:
+            batch[len(cells)] = window.astype(np.float32) / 127.5 - 1.0
+        else:
+            batch[len(cells)] = preprocess(window, classifier.image_size)
+        cells.append((row, col))
+        if len(cells) == batch_size:
+            flush()
+    flush()
+
+    # Grid cells are ``stride`` pixels wide, centered on their windows
+    x0, dx, rx, y0, ry, dy = scene.geotransform
+    shift = (tile_size - stride) / 2
+    geotransform = (
+        x0 + shift * (dx + rx),
+        dx * stride,
+        rx * stride,
+        y0 + shift * (ry + dy),
+        ry * stride,
+        dy * stride,
+    )
+    return ProbabilityGrid(probabilities, geotransform, scene.projection)
@@ -0,0 +1,170 @@
+"""Cached, versioned access to the Lahore dengue risk dataset.
+
+The risk map used to download the CSV from GitHub on every Streamlit rerun.
+This module keeps a local copy under ``data/cache``, revalidates it against
+the remote ETag / Last-Modified headers once the TTL expires, and parses it
+once per process.  Each new copy is validated and converted to a typed
+Parquet file (see ``utils.risk_store``) that is memory-mapped on read.
+Set ``DENGUE_RISK_DATA`` to a local CSV path (or pass ``source=``) to run
+fully offline or against a fixture.
+"""
+
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import streamlit as st
+
+from utils.paths import CACHE_DIR
+from utils.risk_store import (
+    RISK_FACTORS,
+    RISK_SCHEMA,
+    ingest_csv,
+    read_risk_parquet,
+)
+
+RISK_DATA_URL = "https://raw.githubusercontent.com/QamarAyesha/test-data/refs/heads/main/lahore_dengue_data.csv"
+
+# How long a downloaded copy is trusted before asking the server again (seconds)
+DEFAULT_TTL = 6 * 60 * 60
+
+# Network timeout for the conditional GET (seconds)
+FETCH_TIMEOUT = 15
+
+# After a failed check the stale copy is served this long before trying again (seconds)
+RETRY_AFTER = 5 * 60
+
+
+def _is_url(source):
+    return str(source).startswith(("http://", "https://"))
+
+
+def _cache_paths(url, cache_dir):
+    name = url.rstrip("/").rsplit("/", 1)[-1] or "dataset.csv"
+    cache_dir = Path(cache_dir)
+    return cache_dir / name, cache_dir / f"{name}.meta.json"
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = meta_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def _file_version(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def _serve_stale(data_path, meta_path, meta):
+    # Remember the failed check so reruns do not wait on the network again
+    meta["failed_at"] = time.time()
+    _write_meta(meta_path, meta)
+    return data_path, meta["version"]
+
+
+def fetch_risk_csv(source=RISK_DATA_URL, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL):
+    """Return ``(path, version)`` of a local copy of ``source``.
+
+    Local paths are returned as-is and versioned by mtime and size.  URLs
+    are downloaded into ``cache_dir`` and only re-requested after ``ttl``
+    seconds, using a conditional GET so an unchanged file costs one 304.
+    If the network is unavailable a stale copy is served instead, and the
+    server is not asked again for ``RETRY_AFTER`` seconds (or ``ttl``, if
+    shorter).
+    """
+    if not _is_url(source):
+        path = Path(source)
+        return path, _file_version(path)
+
+    data_path, meta_path = _cache_paths(source, cache_dir)
+    meta = _read_meta(meta_path) if data_path.exists() else {}
+
+    now = time.time()
+    if meta and (
+        now - meta.get("fetched_at", 0) < ttl
+        or now - meta.get("failed_at", 0) < min(ttl, RETRY_AFTER)
+    ):
+        return data_path, meta["version"]
+
+    request = urllib.request.Request(source)
+    if meta.get("etag"):
+        request.add_header("If-None-Match", meta["etag"])
+    if meta.get("last_modified"):
+        request.add_header("If-Modified-Since", meta["last_modified"])
+
+    try:
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            body = response.read()
+            headers = response.headers
+    except urllib.error.HTTPError as error:
+        if error.code == 304 and meta:
+            meta["fetched_at"] = time.time()
+            meta.pop("failed_at", None)
+            _write_meta(meta_path, meta)
+            return data_path, meta["version"]
+        if meta:
+            return _serve_stale(data_path, meta_path, meta)
+        raise
+    except (urllib.error.URLError, OSError):
+        # Offline: fall back to whatever copy we already have
+        if meta:
+            return _serve_stale(data_path, meta_path, meta)
+        raise
+
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = data_path.with_name(data_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, data_path)
+
+    etag = headers.get("ETag")
+    meta = {
+        "etag": etag,
+        "last_modified": headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+        "version": etag.strip('"') if etag else _file_version(data_path),
+    }
+    _write_meta(meta_path, meta)
+    return data_path, meta["version"]
+
+
+@st.cache_resource(max_entries=8, show_spinner="Loading risk data...")
+def _read_risk_table(path, version, columns):
+    # ``version`` is part of the cache key: a new download gets a new entry
+    parquet_path = ingest_csv(
+        path, CACHE_DIR / f"{Path(path).stem}.parquet", source_version=version
+    )
+    data = read_risk_parquet(parquet_path, columns=list(columns) if columns else None)
+    data.attrs["version"] = version
+    return data
+
+
+def risk_data_source():
+    """The configured dataset location: ``DENGUE_RISK_DATA`` or the GitHub URL."""
+    return os.environ.get("DENGUE_RISK_DATA", RISK_DATA_URL)
+
+
+def load_risk_data(source=None, ttl=DEFAULT_TTL, columns=tuple(RISK_SCHEMA.names)):
+    """Load ``columns`` of the risk dataset, parsed once per process and shared
+    by all sessions.  Pass ``columns=None`` to read every column.
+
+    The returned DataFrame is shared between sessions and must not be modified
+    in place.  Its dataset version is stored in ``data.attrs["version"]`` so
+    downstream caches can key on it.
+    """
+    path, version = fetch_risk_csv(source or risk_data_source(), ttl=ttl)
+    columns = tuple(columns) if columns else None
+    return _read_risk_table(str(path), version, columns)
@@ -0,0 +1,165 @@
+"""Layered risk heatmap with all factor layers built into one map.
+
+Every factor in ``RISK_FACTORS`` becomes its own heatmap layer on a single
+map, with a layer control to switch between them in the browser; the
+page has no other factor switcher, so changing factors never reruns it.  An
+optional choropleth layer shades neighborhoods by their mean overall risk,
+and another outlines ranked Gi* hotspots.
+Each heatmap embeds a few pyramid levels and shows the one matching the
+current zoom, so panning and zooming in the browser keep their data.
+The rendered HTML is memoized per dataset version and view only.
+"""
+
+import folium
+import leafmap.foliumap as leafmap
+import streamlit as st
+from branca.colormap import LinearColormap
+from branca.element import MacroElement
+from folium.plugins import HeatMap
+from jinja2 import Template
+
+from utils.risk_store import RISK_FACTORS
+
+HEATMAP_RADIUS = 20
+
+# Pyramid levels embedded per factor; each map zoom shows the finest level
+# not deeper than it (zooms below the first show the first)
+MAP_LEVELS = (10, 12, 14, 16)
+
+# Same blue-to-red ramp as the heatmap legend
+RISK_COLORS = ["#0000FF", "#00FF00", "#FFFF00", "#FFA500", "#FF0000"]
+
+# Heatmap layer visible when the map loads
+DEFAULT_LAYER = "Overall Risk"
+
+NEIGHBORHOOD_LAYER = "Neighborhoods"
+
+HOTSPOT_LAYER = "Hotspots"
+
+
+def _neighborhood_layer(neighborhoods, column="Total_Risk_Score"):
+    # ``neighborhoods`` holds polygons joined with their neighborhood_risk rollup
+    colormap = LinearColormap(RISK_COLORS, vmin=0, vmax=1)
+
+    def style(feature):
+        value = feature["properties"].get(f"{column}_mean")
+        return {
+            "fillColor": "#999999" if value is None else colormap(value),
+            "color": "#333333",
+            "weight": 1,
+            "fillOpacity": 0.5,
+        }
+
+    fields = ["name", "count", f"{column}_mean", f"{column}_max"]
+    return folium.GeoJson(
+        neighborhoods[fields + ["geometry"]].round(3).to_json(),
+        name=NEIGHBORHOOD_LAYER,
+        style_function=style,
+        tooltip=folium.GeoJsonTooltip(
+            fields, aliases=["Neighborhood", "Points", "Mean risk", "Max risk"]
+        ),
+        show=False,
+    )
+
+
+def _hotspot_layer(hotspots):
+    fields = ["rank", "points", "total_risk", "max_z"]
+    return folium.GeoJson(
+        hotspots[fields + ["geometry"]].round(3).to_json(),
+        name=HOTSPOT_LAYER,
+        style_function=lambda feature: {
+            "color": "#8B0000",
+            "weight": 2,
+            "fillColor": "#FF0000",
+            "fillOpacity": 0.2,
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields, aliases=["Rank", "Points", "Total risk", "Gi* z"]
+        ),
+    )
+
+
+class _ZoomLevels(MacroElement):
+    """Swaps each factor layer's heatmap for the level matching the map zoom."""
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        (function () {
+            var map = {{ this._parent.get_name() }};
+            var groups = [
+            {%- for group, levels in this.groups %}
+                {layer: {{ group }}, levels: [
+                {%- for zoom, heat in levels -%}
+                    {zoom: {{ zoom }}, heat: {{ heat }}},
+                {%- endfor -%}
+                ]},
+            {%- endfor %}
+            ];
+            function update() {
+                var zoom = map.getZoom();
+                groups.forEach(function (group) {
+                    var shown = group.levels[0];
+                    group.levels.forEach(function (level) {
+                        if (level.zoom <= zoom) shown = level;
+                    });
+                    group.levels.forEach(function (level) {
+                        if (level === shown) group.layer.addLayer(level.heat);
+                        else group.layer.removeLayer(level.heat);
+                    });
+                });
+            }
+            map.on("zoomend", update);
+            update();
+        })();
+        {% endmacro %}
+    """
+    )
+
+    def __init__(self, groups):
+        super().__init__()
+        self._name = "ZoomLevels"
+        # [(feature group name, [(zoom, heatmap name), ...]), ...]
+        self.groups = groups
+
+
+def build_risk_map(pyramid, center, zoom, neighborhoods=None, hotspots=None):
+    """Map with one heatmap layer per risk factor; only ``DEFAULT_LAYER`` starts visible.
+
+    ``neighborhoods`` (polygons joined with their risk rollup) adds a
+    choropleth layer that can be toggled on; ``hotspots`` (from
+    ``utils.hotspots``) adds their outlines.
+    """
+    m = leafmap.Map(center=center, zoom=zoom)
+    levels = sorted(
+        {min(max(level, pyramid.min_zoom), pyramid.max_zoom) for level in MAP_LEVELS}
+    )
+    groups = []
+    for label, column in RISK_FACTORS.items():
+        group = folium.FeatureGroup(name=label, show=label == DEFAULT_LAYER).add_to(m)
+        heatmaps = []
+        for level in levels:
+            cells = pyramid.cells(level)
+            points = cells[["Latitude", "Longitude", f"{column}_sum"]]
+            heatmap = HeatMap(points.to_numpy().tolist(), radius=HEATMAP_RADIUS)
+            heatmaps.append((level, heatmap.add_to(group).get_name()))
+        groups.append((group.get_name(), heatmaps))
+    _ZoomLevels(groups).add_to(m)
+    if neighborhoods is not None:
+        _neighborhood_layer(neighborhoods).add_to(m)
+    if hotspots is not None and len(hotspots):
+        _hotspot_layer(hotspots).add_to(m)
+    folium.LayerControl(collapsed=False).add_to(m)
+    return m
+
+
+@st.cache_data(max_entries=16, show_spinner="Rendering map...")
+def render_risk_map(
+    _pyramid, version, center, zoom, _neighborhoods=None, _hotspots=None
+):
+    """Map HTML, rendered once per (dataset ``version``, view)."""
+    return (
+        build_risk_map(_pyramid, center, zoom, _neighborhoods, _hotspots)
+        .get_root()
+        .render()
+    )
@@ -0,0 +1,124 @@
+"""Typed Parquet store for risk datasets.
+
+CSV drops are validated against ``RISK_SCHEMA`` and converted once into a
+zstd-compressed Parquet file (float64 coordinates, float32 scores).  Readers
+memory-map that file and pull only the columns they ask for.
+
+Convert a new drop from the command line with::
+
+    python -m utils.risk_store lahore_dengue_data.csv [output.parquet]
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Score columns carried by the dataset, keyed by the label shown on the risk map
+RISK_FACTORS = {
+    "Overall Risk": "Total_Risk_Score",
+    "Weather": "Weather_Risk_Score",
+    "Stagnant water": "Water_Coverage_Risk_Score",
+    "Past Cases": "Past_Cases_Risk_Score",
+}
+RISK_SCORE_COLUMNS = list(RISK_FACTORS.values())
+
+COORDINATE_COLUMNS = ["Latitude", "Longitude"]
+
+RISK_SCHEMA = pa.schema(
+    [pa.field(name, pa.float64(), nullable=False) for name in COORDINATE_COLUMNS]
+    + [pa.field(name, pa.float32()) for name in RISK_SCORE_COLUMNS]
+)
+
+# Key in the Parquet footer recording which source file version was converted
+SOURCE_VERSION_KEY = b"source_version"
+
+
+def validate_risk_frame(data):
+    """Check ``data`` against ``RISK_SCHEMA`` and return it with schema dtypes.
+
+    Raises ``ValueError`` describing every problem found.
+    """
+    problems = []
+    missing = [name for name in RISK_SCHEMA.names if name not in data.columns]
+    if missing:
+        raise ValueError(f"Risk data is missing required columns: {', '.join(missing)}")
+
+    data = data.copy()
+    for field in RISK_SCHEMA:
+        values = pd.to_numeric(data[field.name], errors="coerce")
+        bad = values.isna() & data[field.name].notna()
+        if bad.any():
+            problems.append(f"{field.name}: {int(bad.sum())} non-numeric values")
+        if not field.nullable and values.isna().any():
+            problems.append(f"{field.name}: {int(values.isna().sum())} missing values")
+        data[field.name] = values.astype(field.type.to_pandas_dtype())
+
+    if (data["Latitude"].abs() > 90).any():
+        problems.append("Latitude: values outside [-90, 90]")
+    if (data["Longitude"].abs() > 180).any():
+        problems.append("Longitude: values outside [-180, 180]")
+
+    if problems:
+        raise ValueError("Invalid risk data: " + "; ".join(problems))
+    return data
+
+
+def ingest_csv(csv_path, parquet_path=None, source_version=None):
+    """Validate ``csv_path`` and write it as Parquet; returns the Parquet path.
+
+    Columns beyond the schema are kept with inferred types.  When
+    ``source_version`` matches the one stored in an existing output file the
+    conversion is skipped.
+    """
+    csv_path = Path(csv_path)
+    parquet_path = Path(parquet_path or csv_path.with_suffix(".parquet"))
+
+    if (
+        source_version is not None
+        and parquet_source_version(parquet_path) == source_version
+    ):
+        return parquet_path
+
+    data = validate_risk_frame(pd.read_csv(csv_path))
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    # Put the schema columns first and pin their types
+    extra = [name for name in table.column_names if name not in RISK_SCHEMA.names]
+    table = table.select(RISK_SCHEMA.names + extra).cast(
+        pa.schema(list(RISK_SCHEMA) + [table.schema.field(name) for name in extra])
+    )
+    if source_version is not None:
+        metadata = dict(table.schema.metadata or {})
+        metadata[SOURCE_VERSION_KEY] = str(source_version).encode()
+        table = table.replace_schema_metadata(metadata)
+
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = parquet_path.with_name(parquet_path.name + ".tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+def parquet_source_version(parquet_path):
+    """Source version recorded in ``parquet_path``, or None if absent/unreadable."""
+    try:
+        metadata = pq.read_schema(parquet_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    version = metadata.get(SOURCE_VERSION_KEY)
+    return version.decode() if version else None
+
+
+def read_risk_parquet(parquet_path, columns=None):
+    """Memory-mapped read of ``columns`` (all columns when None) as a DataFrame."""
+    table = pq.read_table(parquet_path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        sys.exit("usage: python -m utils.risk_store INPUT.csv [OUTPUT.parquet]")
+    print(ingest_csv(*sys.argv[1:]))
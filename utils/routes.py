@@ -0,0 +1,193 @@
+"""Fumigation route planning over the highest-risk points.
+
+The top-risk points of the risk-map dataset become stops.  Teams leave
+their start points and, in turn, the team that is free earliest moves to
+its nearest unvisited stop until its time budget (travel plus spraying
+time) runs out.  Each team's route is then shortened with 2-opt, which
+reverses stretches of the route whenever that removes distance.  All
+distances come from one float32 haversine matrix computed up front in row
+chunks, and the 2-opt gains for a stop are evaluated against the whole
+route in a single array operation, so a few thousand stops plan in seconds
+without the matrix build dominating memory.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0
+
+DEFAULT_STOPS = 200
+
+# Average team speed between stops and time spent fumigating each stop
+SPEED_KMH = 20.0
+SERVICE_MINUTES = 10.0
+
+# Seconds 2-opt may spend improving all routes together
+IMPROVE_SECONDS = 5.0
+
+# Distance-matrix rows computed per step
+CHUNK_ROWS = 256
+
+# Smallest 2-opt saving (km) worth a reversal; float32 distances round
+# at about this scale, so smaller "gains" are noise
+MIN_GAIN_KM = 1e-4
+
+ROUTE_COLUMNS = [
+    "Team",
+    "Order",
+    "Latitude",
+    "Longitude",
+    "Total_Risk_Score",
+    "Leg (km)",
+    "Arrival (min)",
+]
+
+
+def haversine_matrix(latitude, longitude, chunk_rows=CHUNK_ROWS):
+    """Great-circle distances in km between every pair of points.
+
+    The float32 matrix is filled ``chunk_rows`` rows at a time, so the
+    float64 intermediates stay a few rows wide instead of ``n`` x ``n``.
+    """
+    lat = np.radians(np.asarray(latitude, dtype=float))
+    lon = np.radians(np.asarray(longitude, dtype=float))
+    cos_lat = np.cos(lat)
+    distances = np.empty((len(lat), len(lat)), dtype=np.float32)
+    for start in range(0, len(lat), chunk_rows):
+        rows = slice(start, start + chunk_rows)
+        a = (
+            np.sin((lat[rows, None] - lat[None, :]) / 2) ** 2
+            + cos_lat[rows, None]
+            * cos_lat[None, :]
+            * np.sin((lon[rows, None] - lon[None, :]) / 2) ** 2
+        )
+        distances[rows] = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return distances
+
+
+def top_risk_stops(data, count=DEFAULT_STOPS, column="Total_Risk_Score"):
+    """The ``count`` highest-risk points, highest first."""
+    return data.nlargest(count, column)[["Latitude", "Longitude", column]].reset_index(
+        drop=True
+    )
+
+
+def _construct(distances, starts, stops, budget, speed, service):
+    """Nearest-neighbour routes built for all teams at once.
+
+    ``distances`` covers start nodes ``0..starts-1`` followed by the stops.
+    The team with the least elapsed time extends its route next; a team
+    whose nearest stop no longer fits its budget is finished.
+    """
+    routes = [[team] for team in range(starts)]
+    elapsed = np.zeros(starts)
+    active = np.ones(starts, dtype=bool)
+    visited = np.zeros(starts + stops, dtype=bool)
+    visited[:starts] = True
+    while active.any() and not visited.all():
+        team = np.flatnonzero(active)[np.argmin(elapsed[active])]
+        here = routes[team][-1]
+        row = np.where(visited, np.inf, distances[here])
+        nearest = int(np.argmin(row))
+        cost = row[nearest] / speed * 60 + service
+        if budget is not None and elapsed[team] + cost > budget:
+            active[team] = False
+            continue
+        routes[team].append(nearest)
+        elapsed[team] += cost
+        visited[nearest] = True
+    return routes
+
+
+def two_opt(route, distances, deadline=None):
+    """Shorten an open route (fixed first node) by segment reversals."""
+    route = np.asarray(route)
+    if len(route) < 4:
+        return route
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(route) - 1):
+            if deadline is not None and time.monotonic() > deadline:
+                return route
+            # Reverse route[i..j] for every j > i at once
+            j = np.arange(i + 1, len(route))
+            before, first = route[i - 1], route[i]
+            last = route[j]
+            after = np.append(route[j[:-1] + 1], -1)
+            removed = distances[before, first] + np.where(
+                after >= 0, distances[last, after], 0.0
+            )
+            added = distances[before, last] + np.where(
+                after >= 0, distances[first, after], 0.0
+            )
+            gain = added - removed
+            best = int(np.argmin(gain))
+            if gain[best] < -MIN_GAIN_KM:
+                route[i : j[best] + 1] = route[i : j[best] + 1][::-1].copy()
+                improved = True
+    return route
+
+
+def plan_routes(
+    stops,
+    starts,
+    budget_minutes=None,
+    speed=SPEED_KMH,
+    service=SERVICE_MINUTES,
+    improve_seconds=IMPROVE_SECONDS,
+):
+    """Visit order for every team (``ROUTE_COLUMNS``).
+
+    ``stops`` has Latitude, Longitude and Total_Risk_Score; ``starts`` has
+    a Team name plus Latitude and Longitude per team.  Routes are open (teams
+    do not return), and with ``budget_minutes`` each team only takes the
+    stops it can reach and fumigate in time.  Stops no team reaches are
+    left out of the plan.
+    """
+    if starts.empty:
+        raise ValueError("At least one team start point is needed")
+    if speed <= 0:
+        raise ValueError("Team speed must be positive")
+    nodes = pd.concat(
+        [starts[["Latitude", "Longitude"]], stops[["Latitude", "Longitude"]]],
+        ignore_index=True,
+    )
+    distances = haversine_matrix(nodes["Latitude"], nodes["Longitude"])
+    routes = _construct(
+        distances, len(starts), len(stops), budget_minutes, speed, service
+    )
+
+    deadline = time.monotonic() + improve_seconds
+    plans = []
+    for team, route in zip(starts["Team"], routes):
+        route = two_opt(route, distances, deadline)
+        legs = distances[route[:-1], route[1:]]
+        arrival = np.cumsum(legs / speed * 60 + service) - service
+        visits = stops.iloc[route[1:] - len(starts)]
+        plans.append(
+            pd.DataFrame(
+                {
+                    "Team": team,
+                    "Order": np.arange(1, len(visits) + 1),
+                    "Latitude": visits["Latitude"].to_numpy(),
+                    "Longitude": visits["Longitude"].to_numpy(),
+                    "Total_Risk_Score": visits["Total_Risk_Score"].to_numpy(),
+                    "Leg (km)": legs,
+                    "Arrival (min)": arrival,
+                }
+            )
+        )
+    return pd.concat(plans, ignore_index=True)[ROUTE_COLUMNS]
+
+
+def route_summary(plan):
+    """Stops, distance and finishing time per team."""
+    return plan.groupby("Team", sort=False).agg(
+        Stops=("Order", "size"),
+        Distance_km=("Leg (km)", "sum"),
+        Risk=("Total_Risk_Score", "sum"),
+        Minutes=("Arrival (min)", "max"),
+    )
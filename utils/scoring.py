@@ -0,0 +1,159 @@
+"""Vectorized composite dengue risk scoring.
+
+Turns per-location inputs (rainfall, temperature, humidity, stagnant-water
+coverage and past case counts) into the four score columns the risk map
+displays.  Every step is a whole-array NumPy operation on float32, so a
+city-wide grid of a million cells is re-scored in a fraction of a second.
+
+Each factor score and the total lie in ``[0, 1]``.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Contribution of each factor to Total_Risk_Score (normalized to sum to 1)
+DEFAULT_WEIGHTS = {
+    "Weather_Risk_Score": 0.4,
+    "Water_Coverage_Risk_Score": 0.35,
+    "Past_Cases_Risk_Score": 0.25,
+}
+
+# Contribution of each weather input to Weather_Risk_Score
+DEFAULT_WEATHER_WEIGHTS = {
+    "rainfall": 0.4,
+    "temperature": 0.35,
+    "humidity": 0.25,
+}
+
+# Fixed ranges used by "fixed" normalization, so scores stay comparable
+# between feed updates.  Past cases are compared on a log1p scale.
+DEFAULT_RANGES = {
+    "rainfall": (0.0, 300.0),  # mm
+    "humidity": (0.0, 100.0),  # %
+    "water_coverage": (0.0, 1.0),  # fraction of the cell
+    "past_cases": (0.0, 200.0),  # cases
+}
+
+# Aedes breeding peaks around this temperature and falls off either side (°C)
+OPTIMAL_TEMPERATURE = 28.0
+TEMPERATURE_SPREAD = 6.0
+
+NORMALIZATIONS = ("fixed", "minmax", "rank")
+
+SCORING_INPUTS = ("rainfall", "temperature", "humidity", "water_coverage", "past_cases")
+
+
+def normalize(values, method="fixed", value_range=(0.0, 1.0)):
+    """Scale ``values`` to ``[0, 1]``.
+
+    ``"fixed"`` clips to ``value_range``; ``"minmax"`` uses the batch min and
+    max; ``"rank"`` uses each value's percentile within the batch (tied
+    values share their average rank).  NaNs stay NaN.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    if method == "fixed":
+        low, high = value_range
+    elif method == "minmax":
+        if values.size == 0 or np.isnan(values).all():
+            return values.copy()
+        low, high = np.nanmin(values), np.nanmax(values)
+    elif method == "rank":
+        ranks = np.empty(values.shape, dtype=np.float32)
+        valid = ~np.isnan(values)
+        count = int(valid.sum())
+        ranks[~valid] = np.nan
+        if count:
+            # Average rank of each distinct value, so ties score the same
+            _, inverse, counts = np.unique(
+                values[valid], return_inverse=True, return_counts=True
+            )
+            average = np.cumsum(counts) - counts + (counts - 1) / 2.0
+            ranks[valid] = average[inverse] / max(count - 1, 1)
+        return ranks
+    else:
+        raise ValueError(
+            f"Unknown normalization {method!r}; expected one of {NORMALIZATIONS}"
+        )
+
+    span = np.float32(high - low) or np.float32(1.0)
+    out = (values - np.float32(low)) / span
+    return np.clip(out, 0.0, 1.0)
+
+
+def temperature_suitability(temperature):
+    """Gaussian suitability in ``[0, 1]``, 1 at ``OPTIMAL_TEMPERATURE``."""
+    z = np.asarray(temperature, dtype=np.float32) - np.float32(OPTIMAL_TEMPERATURE)
+    z /= np.float32(TEMPERATURE_SPREAD)
+    return np.exp(-z * z)
+
+
+def _unit_weights(weights):
+    total = float(sum(weights.values()))
+    if total <= 0:
+        raise ValueError("Risk weights must sum to a positive number")
+    return {name: np.float32(weight / total) for name, weight in weights.items()}
+
+
+def score_risk(
+    rainfall,
+    temperature,
+    humidity,
+    water_coverage,
+    past_cases,
+    weights=None,
+    weather_weights=None,
+    normalization="fixed",
+    ranges=None,
+):
+    """Compute the four risk score arrays from per-location inputs.
+
+    All inputs are broadcastable arrays.  Returns a dict with
+    ``Weather_Risk_Score``, ``Water_Coverage_Risk_Score``,
+    ``Past_Cases_Risk_Score`` and ``Total_Risk_Score`` as float32 arrays.
+    """
+    weights = _unit_weights(weights or DEFAULT_WEIGHTS)
+    weather_weights = _unit_weights(weather_weights or DEFAULT_WEATHER_WEIGHTS)
+    ranges = {**DEFAULT_RANGES, **(ranges or {})}
+
+    cases_range = tuple(np.log1p(ranges["past_cases"]))
+    past_cases = np.log1p(np.asarray(past_cases, dtype=np.float32))
+
+    weather = weather_weights["rainfall"] * normalize(
+        rainfall, normalization, ranges["rainfall"]
+    )
+    weather += weather_weights["temperature"] * temperature_suitability(temperature)
+    weather += weather_weights["humidity"] * normalize(
+        humidity, normalization, ranges["humidity"]
+    )
+
+    scores = {
+        "Weather_Risk_Score": weather,
+        "Water_Coverage_Risk_Score": normalize(
+            water_coverage, normalization, ranges["water_coverage"]
+        ),
+        "Past_Cases_Risk_Score": normalize(past_cases, normalization, cases_range),
+    }
+
+    total = np.zeros(np.broadcast(*scores.values()).shape, dtype=np.float32)
+    for name, weight in weights.items():
+        total += weight * scores[name]
+    scores["Total_Risk_Score"] = total
+    return scores
+
+
+def score_frame(data, columns=None, **kwargs):
+    """Return a copy of ``data`` with the four score columns (re)computed.
+
+    ``columns`` maps the input names used by :func:`score_risk` (``rainfall``,
+    ``temperature``, ``humidity``, ``water_coverage``, ``past_cases``) to the
+    DataFrame's column names; by default they are the same.
+    """
+    columns = {name: name for name in SCORING_INPUTS} | (columns or {})
+    inputs = {
+        name: data[column].to_numpy(dtype=np.float32)
+        for name, column in columns.items()
+    }
+    scores = score_risk(**inputs, **kwargs)
+    return data.assign(
+        **{name: pd.Series(values, index=data.index) for name, values in scores.items()}
+    )
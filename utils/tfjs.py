@@ -0,0 +1,352 @@
+"""Minimal NumPy runtime for TensorFlow.js layers models.
+
+Reads a ``model.json`` + ``weights.bin`` export (as produced by Teachable
+Machine) and runs the forward pass with NumPy, so image models can be served
+from Python without TensorFlow.  Only the layer types used by MobileNet-style
+image classifiers are supported; anything else raises ``NotImplementedError``
+at load time.  Weights quantized to uint8 or float16 (the tfjs converter's
+``quantization`` manifest format) are dequantized to float32 on load, and
+``quantize_model`` writes such copies.
+"""
+
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Storage types a weight can be quantized to
+QUANTIZATION_DTYPES = ("float16", "uint8")
+
+
+def load_weights(model_dir, manifest):
+    """Read every weight listed in a tfjs ``weightsManifest`` into a dict of
+    float32 arrays, dequantizing quantized entries."""
+    model_dir = Path(model_dir)
+    weights = {}
+    for group in manifest:
+        buffer = b"".join((model_dir / path).read_bytes() for path in group["paths"])
+        offset = 0
+        for spec in group["weights"]:
+            size = math.prod(spec["shape"])
+            quantization = spec.get("quantization")
+            dtype = np.dtype(quantization["dtype"] if quantization else spec["dtype"])
+            values = np.frombuffer(buffer, dtype=dtype, count=size, offset=offset)
+            offset += size * dtype.itemsize
+            weights[spec["name"]] = dequantize_weight(
+                values.reshape(spec["shape"]), quantization
+            )
+    return weights
+
+
+def dequantize_weight(values, quantization=None):
+    """Float32 values of a stored weight given its manifest ``quantization``."""
+    values = values.astype(np.float32)
+    if quantization and "scale" in quantization:
+        # Affine integer quantization: value = q * scale + min
+        values = values * np.float32(quantization["scale"]) + np.float32(
+            quantization["min"]
+        )
+    return values
+
+
+def quantize_weight(values, dtype):
+    """Quantize a float32 array; returns ``(stored array, quantization spec)``."""
+    if dtype == "float16":
+        return values.astype(np.float16), {"dtype": "float16"}
+    if dtype == "uint8":
+        low, high = float(values.min()), float(values.max())
+        scale = (high - low) / 255 or 1.0
+        stored = np.round((values - low) / scale).clip(0, 255).astype(np.uint8)
+        return stored, {"dtype": "uint8", "scale": scale, "min": low}
+    raise ValueError(
+        f"Unsupported quantization dtype {dtype!r}; expected one of {QUANTIZATION_DTYPES}"
+    )
+
+
+def quantize_model(model_dir, out_dir, dtype, keep_float=(), min_size=256):
+    """Write a copy of the tfjs model in ``model_dir`` to ``out_dir`` with its
+    weights quantized to ``dtype``.
+
+    Weights named in ``keep_float`` and those with fewer than ``min_size``
+    values (biases, batch-norm statistics) stay float32; they are a tiny
+    share of the file but disproportionately sensitive to rounding.
+    Returns the list of quantized weight names.
+    """
+    model_dir, out_dir = Path(model_dir), Path(out_dir)
+    with open(model_dir / "model.json") as f:
+        spec = json.load(f)
+    weights = load_weights(model_dir, spec["weightsManifest"])
+
+    entries, chunks, quantized = [], [], []
+    for group in spec["weightsManifest"]:
+        for entry in group["weights"]:
+            name = entry["name"]
+            values = weights[name]
+            entry = {"name": name, "shape": entry["shape"], "dtype": "float32"}
+            if name not in keep_float and values.size >= min_size:
+                values, entry["quantization"] = quantize_weight(values, dtype)
+                quantized.append(name)
+            entries.append(entry)
+            chunks.append(np.ascontiguousarray(values).tobytes())
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "weights.bin").write_bytes(b"".join(chunks))
+    spec["weightsManifest"] = [{"paths": ["weights.bin"], "weights": entries}]
+    with open(out_dir / "model.json", "w") as f:
+        json.dump(spec, f)
+    return quantized
+
+
+def _same_padding(size, kernel, stride):
+    # TensorFlow "same" padding: output is ceil(size / stride)
+    out = -(-size // stride)
+    total = max((out - 1) * stride + kernel - size, 0)
+    return total // 2, total - total // 2
+
+
+def _pad_input(x, kernel_size, strides, padding):
+    if padding != "same":
+        return x
+    pad_h = _same_padding(x.shape[1], kernel_size[0], strides[0])
+    pad_w = _same_padding(x.shape[2], kernel_size[1], strides[1])
+    if pad_h == (0, 0) and pad_w == (0, 0):
+        return x
+    return np.pad(x, ((0, 0), pad_h, pad_w, (0, 0)))
+
+
+def _softmax(x):
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0, out=x),
+    "relu6": lambda x: np.clip(x, 0.0, 6.0, out=x),
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "softmax": _softmax,
+}
+
+
+def _activation(config):
+    name = config.get("activation") or "linear"
+    if name not in ACTIVATIONS:
+        raise NotImplementedError(f"Unsupported activation {name!r}")
+    return ACTIVATIONS[name]
+
+
+def _conv2d(config, weights, name):
+    kernel = weights[f"{name}/kernel"]
+    bias = weights.get(f"{name}/bias") if config.get("use_bias", True) else None
+    kh, kw = config["kernel_size"]
+    sh, sw = config["strides"]
+    padding = config["padding"]
+    activation = _activation(config)
+    pointwise = kh == kw == sh == sw == 1
+
+    def run(x):
+        if pointwise:
+            out = x @ kernel[0, 0]
+        else:
+            x = _pad_input(x, (kh, kw), (sh, sw), padding)
+            # (n, h, w, c, kh, kw) windows contracted against (kh, kw, c, filters)
+            windows = sliding_window_view(x, (kh, kw), axis=(1, 2))[:, ::sh, ::sw]
+            out = np.einsum("nhwcij,ijco->nhwo", windows, kernel, optimize=True)
+        if bias is not None:
+            out += bias
+        return activation(out)
+
+    return run
+
+
+def _depthwise_conv2d(config, weights, name):
+    kernel = weights[f"{name}/depthwise_kernel"]
+    kh, kw, channels, multiplier = kernel.shape
+    kernel = kernel.reshape(kh, kw, channels * multiplier)
+    bias = weights.get(f"{name}/bias") if config.get("use_bias", True) else None
+    sh, sw = config["strides"]
+    padding = config["padding"]
+    activation = _activation(config)
+
+    def run(x):
+        if multiplier > 1:
+            x = np.repeat(x, multiplier, axis=-1)
+        x = _pad_input(x, (kh, kw), (sh, sw), padding)
+        out_h = (x.shape[1] - kh) // sh + 1
+        out_w = (x.shape[2] - kw) // sw + 1
+        # Sum of shifted, strided views scaled per channel
+        out = np.zeros((x.shape[0], out_h, out_w, x.shape[3]), dtype=np.float32)
+        for i in range(kh):
+            for j in range(kw):
+                out += (
+                    x[:, i : i + sh * out_h : sh, j : j + sw * out_w : sw]
+                    * kernel[i, j]
+                )
+        if bias is not None:
+            out += bias
+        return activation(out)
+
+    return run
+
+
+def _batch_norm(config, weights, name):
+    mean = weights[f"{name}/moving_mean"]
+    variance = weights[f"{name}/moving_variance"]
+    gamma = (
+        weights.get(f"{name}/gamma", np.ones_like(mean))
+        if config.get("scale", True)
+        else np.ones_like(mean)
+    )
+    beta = (
+        weights.get(f"{name}/beta", np.zeros_like(mean))
+        if config.get("center", True)
+        else np.zeros_like(mean)
+    )
+    # Inference-time batch norm is a per-channel affine transform
+    scale = (gamma / np.sqrt(variance + config.get("epsilon", 1e-3))).astype(np.float32)
+    shift = (beta - mean * scale).astype(np.float32)
+
+    def run(x):
+        x = x * scale
+        x += shift
+        return x
+
+    return run
+
+
+def _relu(config, weights, name):
+    max_value = config.get("max_value")
+    if max_value is None:
+        return lambda x: np.maximum(x, 0.0)
+    return lambda x: np.clip(x, 0.0, max_value)
+
+
+def _zero_padding(config, weights, name):
+    padding = config["padding"]
+    if isinstance(padding, int):
+        padding = [[padding, padding], [padding, padding]]
+    pad_h, pad_w = (
+        tuple(p) if isinstance(p, (list, tuple)) else (p, p) for p in padding
+    )
+    return lambda x: np.pad(x, ((0, 0), pad_h, pad_w, (0, 0)))
+
+
+def _dense(config, weights, name):
+    kernel = weights[f"{name}/kernel"]
+    bias = weights.get(f"{name}/bias") if config.get("use_bias", True) else None
+    activation = _activation(config)
+
+    def run(x):
+        out = x @ kernel
+        if bias is not None:
+            out += bias
+        return activation(out)
+
+    return run
+
+
+LAYER_BUILDERS = {
+    "Conv2D": _conv2d,
+    "DepthwiseConv2D": _depthwise_conv2d,
+    "BatchNormalization": _batch_norm,
+    "ReLU": _relu,
+    "ZeroPadding2D": _zero_padding,
+    "Dense": _dense,
+    "Activation": lambda config, weights, name: lambda x: _activation(config)(x.copy()),
+    "GlobalAveragePooling2D": lambda config, weights, name: lambda x: x.mean(
+        axis=(1, 2)
+    ),
+    "Flatten": lambda config, weights, name: lambda x: x.reshape(len(x), -1),
+    "Dropout": lambda config, weights, name: lambda x: x,
+    "Add": None,  # merges its inputs, handled by the executor
+}
+
+
+def _flatten_topology(spec, input_name, ops):
+    """Append ``(name, class_name, config, input_names)`` for every layer in
+    ``spec`` to ``ops``; nested Sequential/Model containers are inlined.
+    Returns the name of the tensor ``spec`` outputs."""
+    class_name, config = spec["class_name"], spec["config"]
+
+    if class_name == "Sequential":
+        name = input_name
+        for layer in config["layers"] if isinstance(config, dict) else config:
+            name = _flatten_topology(layer, name, ops)
+        return name
+
+    if class_name in ("Model", "Functional"):
+        aliases = {}
+        for layer in config["layers"]:
+            if layer["class_name"] == "InputLayer":
+                aliases[layer["name"]] = input_name
+                continue
+            if layer["class_name"] in ("Sequential", "Model", "Functional"):
+                raise NotImplementedError(
+                    "Nested containers inside a functional model are not supported"
+                )
+            inbound = [
+                aliases.get(node[0], node[0]) for node in layer["inbound_nodes"][0]
+            ]
+            ops.append((layer["name"], layer["class_name"], layer["config"], inbound))
+        output = config["output_layers"][0][0]
+        return aliases.get(output, output)
+
+    if class_name == "InputLayer":
+        return input_name
+
+    ops.append((config["name"], class_name, config, [input_name]))
+    return config["name"]
+
+
+class LayersModel:
+    """A tfjs layers model executed with NumPy on NHWC float32 batches."""
+
+    def __init__(self, topology, weights):
+        ops = []
+        self.output_name = _flatten_topology(topology, "input", ops)
+        self.weights = weights
+        self.layers = []
+        for name, class_name, config, inputs in ops:
+            if class_name not in LAYER_BUILDERS:
+                raise NotImplementedError(
+                    f"Unsupported layer type {class_name!r} ({name})"
+                )
+            builder = LAYER_BUILDERS[class_name]
+            run = builder(config, weights, name) if builder else None
+            self.layers.append((name, class_name, run, inputs))
+
+        # Index of the last layer reading each tensor, so intermediates can be freed
+        self._last_use = {}
+        for index, (_, _, _, inputs) in enumerate(self.layers):
+            for tensor in inputs:
+                self._last_use[tensor] = index
+
+    @classmethod
+    def load(cls, model_dir):
+        model_dir = Path(model_dir)
+        with open(model_dir / "model.json") as f:
+            spec = json.load(f)
+        topology = spec["modelTopology"]
+        topology = topology.get("model_config", topology)
+        return cls(topology, load_weights(model_dir, spec["weightsManifest"]))
+
+    def predict(self, batch):
+        """Run the model on an ``(n, height, width, channels)`` float32 batch."""
+        tensors = {"input": np.asarray(batch, dtype=np.float32)}
+        for index, (name, class_name, run, inputs) in enumerate(self.layers):
+            if class_name == "Add":
+                out = tensors[inputs[0]] + tensors[inputs[1]]
+                for tensor in inputs[2:]:
+                    out += tensors[tensor]
+            else:
+                out = run(tensors[inputs[0]])
+            tensors[name] = out
+            for tensor in inputs:
+                if self._last_use.get(tensor) == index and tensor != self.output_name:
+                    del tensors[tensor]
+        return tensors[self.output_name]
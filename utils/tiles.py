@@ -0,0 +1,204 @@
+"""Multi-resolution grid aggregation of risk points for the heatmap.
+
+Points are binned into Web Mercator cells addressed by quadkey (the x/y tile
+indices bit-interleaved into one integer, so a cell's parent is ``key >> 2``).
+The finest level is binned from the raw points once; every coarser level is
+rolled up from the level below it, so building the whole pyramid costs one
+pass over the data.  The map then ships only the cells for its zoom and
+viewport instead of every raw row.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.risk_store import RISK_SCORE_COLUMNS
+
+# Cells per map tile edge is 2 ** CELL_LEVEL_OFFSET (8 x 8 cells of 32 px each)
+CELL_LEVEL_OFFSET = 3
+
+MIN_ZOOM = 5
+MAX_ZOOM = 18
+
+# Web Mercator is undefined at the poles
+MAX_LATITUDE = 85.05112878
+
+TILE_SIZE = 256
+
+
+def _spread_bits(v):
+    # Insert a zero bit between each of the low 32 bits of ``v``
+    v = v & 0x00000000FFFFFFFF
+    v = (v | (v << 16)) & 0x0000FFFF0000FFFF
+    v = (v | (v << 8)) & 0x00FF00FF00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F0F0F0F0F
+    v = (v | (v << 2)) & 0x3333333333333333
+    v = (v | (v << 1)) & 0x5555555555555555
+    return v
+
+
+def _compact_bits(v):
+    v = v & 0x5555555555555555
+    v = (v | (v >> 1)) & 0x3333333333333333
+    v = (v | (v >> 2)) & 0x0F0F0F0F0F0F0F0F
+    v = (v | (v >> 4)) & 0x00FF00FF00FF00FF
+    v = (v | (v >> 8)) & 0x0000FFFF0000FFFF
+    v = (v | (v >> 16)) & 0x00000000FFFFFFFF
+    return v
+
+
+def lonlat_to_xy(longitude, latitude, level):
+    """Integer Web Mercator cell indices of each point at grid ``level``."""
+    n = 1 << level
+    longitude = np.asarray(longitude, dtype=np.float64)
+    latitude = np.clip(
+        np.asarray(latitude, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE
+    )
+    x = (longitude + 180.0) / 360.0 * n
+    sin_lat = np.sin(np.radians(latitude))
+    y = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)) * n
+    x = np.clip(x.astype(np.int64), 0, n - 1)
+    y = np.clip(y.astype(np.int64), 0, n - 1)
+    return x, y
+
+
+def xy_to_quadkey(x, y):
+    """Bit-interleave cell indices into integer quadkeys."""
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+    return _spread_bits(x) | (_spread_bits(y) << 1)
+
+
+def quadkey_to_xy(quadkey):
+    quadkey = np.asarray(quadkey, dtype=np.int64)
+    return _compact_bits(quadkey), _compact_bits(quadkey >> 1)
+
+
+def quadkey_to_string(quadkey, level):
+    """Bing-style base-4 quadkey string (e.g. ``"1230"``) for one cell."""
+    return np.base_repr(int(quadkey), 4).zfill(level) if level else ""
+
+
+def viewport_bounds(center, zoom, width=1200, height=700, padding=0.25):
+    """Approximate ``(south, west, north, east)`` visible around ``center``.
+
+    ``padding`` widens the box by that fraction on each side so a little
+    panning does not reveal empty space.
+    """
+    world = TILE_SIZE * 2**zoom
+    lat, lon = center
+    cx = (lon + 180.0) / 360.0 * world
+    sin_lat = math.sin(math.radians(max(min(lat, MAX_LATITUDE), -MAX_LATITUDE)))
+    cy = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * world
+    half_w = width * (0.5 + padding)
+    half_h = height * (0.5 + padding)
+
+    def to_lonlat(px, py):
+        lon_ = px / world * 360.0 - 180.0
+        lat_ = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * py / world))))
+        return lon_, lat_
+
+    west, north = to_lonlat(cx - half_w, max(cy - half_h, 0))
+    east, south = to_lonlat(cx + half_w, min(cy + half_h, world))
+    return south, west, north, east
+
+
+def _reduce(keys, counts, sums, maxes):
+    # Group rows sharing a key; sums add up and maxima take the max
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    out_counts = np.add.reduceat(counts[order], starts)
+    out_sums = {
+        name: np.add.reduceat(values[order], starts) for name, values in sums.items()
+    }
+    out_maxes = {
+        name: np.maximum.reduceat(values[order], starts)
+        for name, values in maxes.items()
+    }
+    return keys[starts], out_counts, out_sums, out_maxes
+
+
+class TilePyramid:
+    """Per-zoom cell aggregates of point values.
+
+    Each level is a DataFrame with one row per occupied cell: ``quadkey``,
+    ``count``, the point centroid as ``Latitude``/``Longitude``, and for every
+    value column its mean (same name), ``<column>_sum`` and ``<column>_max``.
+    """
+
+    def __init__(self, levels, min_zoom, max_zoom):
+        self.levels = levels
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+
+    @classmethod
+    def build(
+        cls,
+        data,
+        value_columns=RISK_SCORE_COLUMNS,
+        latitude="Latitude",
+        longitude="Longitude",
+        min_zoom=MIN_ZOOM,
+        max_zoom=MAX_ZOOM,
+    ):
+        data = data.dropna(subset=[latitude, longitude])
+        lat = data[latitude].to_numpy(dtype=np.float64)
+        lon = data[longitude].to_numpy(dtype=np.float64)
+
+        keys = xy_to_quadkey(*lonlat_to_xy(lon, lat, max_zoom + CELL_LEVEL_OFFSET))
+        counts = np.ones(len(keys), dtype=np.int64)
+        sums = {latitude: lat, longitude: lon}
+        maxes = {}
+        for column in value_columns:
+            values = data[column].to_numpy(dtype=np.float64)
+            # Means divide by the non-null count, not the point count
+            sums[(column, "count")] = (~np.isnan(values)).astype(np.float64)
+            sums[column] = np.nan_to_num(values)
+            maxes[column] = np.nan_to_num(values, nan=-np.inf)
+
+        levels = {}
+        for zoom in range(max_zoom, min_zoom - 1, -1):
+            if zoom < max_zoom:
+                keys = keys >> 2
+            keys, counts, sums, maxes = _reduce(keys, counts, sums, maxes)
+
+            level = {"quadkey": keys, "count": counts}
+            level[latitude] = sums[latitude] / counts
+            level[longitude] = sums[longitude] / counts
+            for column in value_columns:
+                present = sums[(column, "count")] > 0
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    level[column] = np.where(
+                        present, sums[column] / sums[(column, "count")], np.nan
+                    )
+                level[f"{column}_sum"] = sums[column]
+                level[f"{column}_max"] = np.where(present, maxes[column], np.nan)
+            levels[zoom] = pd.DataFrame(level)
+
+        return cls(levels, min_zoom, max_zoom)
+
+    def cells(self, zoom, bounds=None):
+        """Cells for ``zoom`` (clamped to the pyramid), optionally clipped to
+        ``(south, west, north, east)`` bounds."""
+        zoom = int(min(max(zoom, self.min_zoom), self.max_zoom))
+        level = self.levels[zoom]
+        if bounds is None:
+            return level
+
+        # Clip on integer cell indices rather than per-point coordinates
+        south, west, north, east = bounds
+        grid_level = zoom + CELL_LEVEL_OFFSET
+        x0, y0 = lonlat_to_xy(west, north, grid_level)
+        x1, y1 = lonlat_to_xy(east, south, grid_level)
+        x, y = quadkey_to_xy(level["quadkey"].to_numpy())
+        visible = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+        return level[visible]
+
+
+@st.cache_resource(max_entries=4, show_spinner="Aggregating risk grid...")
+def get_tile_pyramid(_data, version):
+    """Tile pyramid for the risk dataset, built once per dataset ``version``."""
+    return TilePyramid.build(_data)
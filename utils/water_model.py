@@ -0,0 +1,196 @@
+"""Server-side stagnant-water image classification.
+
+Runs the Teachable Machine model checked into ``teachable_model/`` with the
+NumPy runtime in ``utils.tfjs``.  The model is loaded once per process, and
+images are center-cropped, resized to 224x224 and scaled to ``[-1, 1]``
+the same way the Teachable Machine library does in the browser.  Results
+are memoized in a content-hash :class:`~utils.inference_cache.InferenceCache`
+so repeated images skip the forward pass.
+
+The model can also be served from float16 or uint8 quantized copies (see
+``utils.water_quantize``); select one with the ``DENGUE_WATER_PRECISION``
+environment variable.  Copies shipped under ``model/`` are used as they are;
+missing ones are converted into ``GENERATED_MODEL_DIR``.  Quantization only
+shrinks the stored weights: they are dequantized to float32 on load, so
+inference runs at full-precision speed.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+from PIL import Image, ImageOps
+
+from utils.inference_cache import InferenceCache, tensor_key
+from utils.paths import DATA_DIR, GENERATED_MODEL_DIR, MODEL_DIR, ROOT_DIR
+from utils.tfjs import LayersModel, quantize_model
+
+TEACHABLE_MODEL_DIR = ROOT_DIR / "teachable_model"
+
+# Weight precision -> tfjs quantization dtype (None keeps the float32 export)
+PRECISIONS = {"full": None, "fp16": "float16", "int8": "uint8"}
+
+INFERENCE_CACHE_PATH = DATA_DIR / "inference_cache.sqlite"
+
+# Index of the "Stagnant Water" class in the Teachable Machine labels
+STAGNANT_WATER_CLASS = 0
+
+
+def load_image(source):
+    """Decode an image (path, bytes or file-like object) to an RGB uint8 array."""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with Image.open(source) as image:
+        # Respect camera orientation so phone photos are not sideways
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        return np.asarray(image)
+
+
+def center_crop(image):
+    """Largest centered square of an ``(h, w, c)`` array."""
+    height, width = image.shape[:2]
+    side = min(height, width)
+    top = (height - side) // 2
+    left = (width - side) // 2
+    return image[top : top + side, left : left + side]
+
+
+def preprocess(image, size=224):
+    """Center-crop, resize to ``size`` x ``size`` and scale to ``[-1, 1]``."""
+    image = center_crop(np.asarray(image, dtype=np.uint8))
+    if image.shape[0] != size:
+        image = np.asarray(Image.fromarray(image).resize((size, size), Image.BILINEAR))
+    return image.astype(np.float32) / 127.5 - 1.0
+
+
+def model_fingerprint(model_dir):
+    """Digest of a tfjs export's files, so cached results never outlive the model."""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(model_dir.iterdir()):
+        if path.is_file():
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class WaterClassifier:
+    """The Teachable Machine model plus its labels and input size.
+
+    With a ``cache``, ``predict_proba`` only runs the model on inputs it has
+    not seen before; ``model_id`` namespaces the cache keys.
+    """
+
+    def __init__(self, model, labels, image_size=224, cache=None, model_id=""):
+        self.model = model
+        self.labels = labels
+        self.image_size = image_size
+        self.cache = cache
+        self.model_id = model_id
+
+    @classmethod
+    def load(cls, model_dir=TEACHABLE_MODEL_DIR, cache=None):
+        model_dir = Path(model_dir)
+        with open(model_dir / "metadata.json") as f:
+            metadata = json.load(f)
+        return cls(
+            LayersModel.load(model_dir),
+            metadata["labels"],
+            metadata.get("imageSize", 224),
+            cache=cache,
+            model_id=model_fingerprint(model_dir),
+        )
+
+    def predict_proba(self, batch):
+        """Class probabilities for a preprocessed ``(n, size, size, 3)`` batch."""
+        if self.cache is None:
+            return self.model.predict(batch)
+
+        batch = np.asarray(batch, dtype=np.float32)
+        keys = [tensor_key(tensor, self.model_id) for tensor in batch]
+        found = self.cache.get_many(keys)
+        # Duplicates within a batch are only run once
+        todo = {}
+        for i, (key, row) in enumerate(zip(keys, found)):
+            if row is None:
+                todo.setdefault(key, i)
+        if todo:
+            computed = self.model.predict(batch[list(todo.values())])
+            self.cache.put_many(list(todo), computed)
+            fresh = dict(zip(todo, computed))
+            found = [
+                fresh[key] if row is None else row for key, row in zip(keys, found)
+            ]
+        return np.stack(found).astype(np.float32, copy=False)
+
+    def classify(self, images):
+        """Classify decoded images; returns one result dict per image."""
+        batch = np.stack([preprocess(image, self.image_size) for image in images])
+        return self.results(self.predict_proba(batch))
+
+    def results(self, probabilities):
+        """Turn rows of class probabilities into result dicts."""
+        classes = probabilities.argmax(axis=1)
+        return [
+            {
+                "predicted_class": self.labels[index],
+                "confidence": float(row[index]),
+                "has_stagnant_water": bool(index == STAGNANT_WATER_CLASS),
+                "probabilities": dict(zip(self.labels, row.tolist())),
+            }
+            for index, row in zip(classes, probabilities)
+        ]
+
+
+def model_precision():
+    """Precision to serve, from ``DENGUE_WATER_PRECISION`` (default ``full``)."""
+    precision = os.environ.get("DENGUE_WATER_PRECISION", "full")
+    if precision not in PRECISIONS:
+        raise ValueError(
+            f"DENGUE_WATER_PRECISION must be one of {list(PRECISIONS)}, got {precision!r}"
+        )
+    return precision
+
+
+def generated_model_dir(precision, model_dir=TEACHABLE_MODEL_DIR):
+    """Where the app writes its own ``precision`` copy of ``model_dir``."""
+    return GENERATED_MODEL_DIR / f"{Path(model_dir).name}_{precision}"
+
+
+def precision_model_dir(precision, model_dir=TEACHABLE_MODEL_DIR):
+    """Directory holding the ``precision`` copy of the model in ``model_dir``:
+    the copy shipped under ``model/`` if there is one, else the generated one."""
+    if PRECISIONS[precision] is None:
+        return Path(model_dir)
+    shipped = MODEL_DIR / f"{Path(model_dir).name}_{precision}"
+    if (shipped / "model.json").exists():
+        return shipped
+    return generated_model_dir(precision, model_dir)
+
+
+def ensure_precision_model(precision, model_dir=TEACHABLE_MODEL_DIR):
+    """Path of the ``precision`` model, converting it (uncalibrated) if missing."""
+    out_dir = precision_model_dir(precision, model_dir)
+    if not (out_dir / "model.json").exists():
+        quantize_model(model_dir, out_dir, PRECISIONS[precision])
+        shutil.copy(Path(model_dir) / "metadata.json", out_dir / "metadata.json")
+    return out_dir
+
+
+@st.cache_resource(show_spinner="Loading stagnant water model...")
+def load_water_classifier(
+    model_dir=TEACHABLE_MODEL_DIR, cache_path=INFERENCE_CACHE_PATH, precision=None
+):
+    """The stagnant-water classifier, loaded once per process, with a result
+    cache persisted to ``cache_path`` (in memory only when ``None``).
+
+    ``precision`` is ``full``, ``fp16`` or ``int8`` and defaults to
+    :func:`model_precision`.
+    """
+    model_dir = ensure_precision_model(precision or model_precision(), model_dir)
+    return WaterClassifier.load(model_dir, cache=InferenceCache(db_path=cache_path))
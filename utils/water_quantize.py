@@ -0,0 +1,224 @@
+"""Calibrated float16 / int8 conversion of the stagnant-water model.
+
+    python -m utils.water_quantize CALIBRATION_DIR
+
+writes quantized copies of ``teachable_model/`` and an accuracy-comparison
+report (``quantization_report.csv``) under ``GENERATED_MODEL_DIR``; copy
+the calibrated directories into ``model/`` to ship them.
+
+The images in ``CALIBRATION_DIR`` (a few dozen survey photos are enough)
+are run through the float32 model and each quantized candidate.  If the
+quantized model's top-1 predictions drift from the float32 ones, the
+weights whose rounding moves the outputs most are restored to float32 one
+at a time until the agreement target is met.  Images in sub-folders named
+after a class label (the layout of a Teachable Machine sample export) are
+also scored for accuracy in the report.  The report compares freshly
+calibrated copies in ``GENERATED_MODEL_DIR`` over any shipped ones.
+"""
+
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.paths import GENERATED_MODEL_DIR
+from utils.tfjs import (
+    LayersModel,
+    dequantize_weight,
+    load_weights,
+    quantize_model,
+    quantize_weight,
+)
+from utils.water_model import (
+    PRECISIONS,
+    TEACHABLE_MODEL_DIR,
+    ensure_precision_model,
+    generated_model_dir,
+    load_image,
+    preprocess,
+)
+from utils.water_scan import folder_sources
+
+CALIBRATION_SIZE = 64
+
+# Share of calibration images whose top-1 class must match the float32 model
+TARGET_AGREEMENT = 0.99
+
+# Largest allowed mean absolute change in class probabilities
+MAX_PROBABILITY_DRIFT = 0.02
+
+REPORT_PATH = GENERATED_MODEL_DIR / "quantization_report.csv"
+
+REPORT_COLUMNS = [
+    "precision",
+    "weights_bytes",
+    "load_seconds",
+    "images_per_second",
+    "top1_agreement",
+    "probability_drift",
+    "accuracy",
+]
+
+
+def calibration_set(
+    folder, model_dir=TEACHABLE_MODEL_DIR, limit=CALIBRATION_SIZE, seed=0
+):
+    """Preprocessed ``(n, size, size, 3)`` batch from ``folder`` plus the label
+    index of each image (``-1`` when its folder is not a class label)."""
+    with open(Path(model_dir) / "metadata.json") as f:
+        metadata = json.load(f)
+    labels, size = metadata["labels"], metadata.get("imageSize", 224)
+
+    sources = list(folder_sources(folder))
+    if not sources:
+        raise ValueError(f"No calibration images found in {folder}")
+    if len(sources) > limit:
+        picks = np.random.default_rng(seed).choice(len(sources), limit, replace=False)
+        sources = [sources[i] for i in sorted(picks)]
+
+    tensors, targets = [], []
+    for name, reader in sources:
+        try:
+            tensors.append(preprocess(load_image(reader()), size))
+        except Exception:  # unreadable files are left out of calibration
+            continue
+        parent = Path(name).parent.name
+        targets.append(labels.index(parent) if parent in labels else -1)
+    if not tensors:
+        raise ValueError("None of the calibration images could be decoded")
+    return np.stack(tensors), np.array(targets)
+
+
+def _compare(reference, probabilities):
+    """Top-1 agreement and mean absolute probability change vs ``reference``."""
+    agreement = float((reference.argmax(axis=1) == probabilities.argmax(axis=1)).mean())
+    return agreement, float(np.abs(reference - probabilities).mean())
+
+
+def _load_spec(model_dir):
+    with open(Path(model_dir) / "model.json") as f:
+        spec = json.load(f)
+    topology = spec["modelTopology"]
+    return topology.get("model_config", topology), spec["weightsManifest"]
+
+
+def calibrate(
+    precision,
+    batch,
+    model_dir=TEACHABLE_MODEL_DIR,
+    target_agreement=TARGET_AGREEMENT,
+    max_drift=MAX_PROBABILITY_DRIFT,
+):
+    """Write the ``precision`` model, keeping sensitive weights in float32.
+
+    Returns a dict with the calibration outcome.
+    """
+    dtype = PRECISIONS[precision]
+    if dtype is None:
+        raise ValueError("The full-precision model needs no conversion")
+    model_dir = Path(model_dir)
+    out_dir = generated_model_dir(precision, model_dir)
+
+    topology, manifest = _load_spec(model_dir)
+    weights = load_weights(model_dir, manifest)
+    reference = LayersModel(topology, weights).predict(batch)
+
+    # Quantize everything quantize_model would, in memory
+    quantized = {}
+    for name in quantize_model(model_dir, out_dir, dtype):
+        stored, quantization = quantize_weight(weights[name], dtype)
+        quantized[name] = dequantize_weight(stored, quantization)
+
+    def evaluate(keep):
+        candidate = {
+            name: weights[name] if name in keep else quantized.get(name, weights[name])
+            for name in weights
+        }
+        return _compare(reference, LayersModel(topology, candidate).predict(batch))
+
+    keep = set()
+    agreement, drift = evaluate(keep)
+    if agreement < target_agreement or drift > max_drift:
+        # Sensitivity of the outputs to rounding each weight on its own
+        sensitivity = {name: evaluate(set(quantized) - {name})[1] for name in quantized}
+        for name in sorted(quantized, key=sensitivity.get, reverse=True):
+            keep.add(name)
+            agreement, drift = evaluate(keep)
+            if agreement >= target_agreement and drift <= max_drift:
+                break
+        quantize_model(model_dir, out_dir, dtype, keep_float=keep)
+
+    shutil.copy(model_dir / "metadata.json", out_dir / "metadata.json")
+    return {
+        "precision": precision,
+        "quantized_weights": len(quantized) - len(keep),
+        "float32_weights": len(weights) - len(quantized) + len(keep),
+        "top1_agreement": agreement,
+        "probability_drift": drift,
+    }
+
+
+def compare_precisions(
+    batch, targets=None, model_dir=TEACHABLE_MODEL_DIR, batch_size=32
+):
+    """Accuracy and speed of every precision on the same images (``REPORT_COLUMNS``)."""
+    rows = []
+    reference = None
+    for precision in PRECISIONS:
+        # The copies ``calibrate`` just wrote, not older shipped ones
+        precision_dir = generated_model_dir(precision, model_dir)
+        if not (precision_dir / "model.json").exists():
+            precision_dir = ensure_precision_model(precision, model_dir)
+        start = time.perf_counter()
+        model = LayersModel.load(precision_dir)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        probabilities = np.concatenate(
+            [
+                model.predict(batch[i : i + batch_size])
+                for i in range(0, len(batch), batch_size)
+            ]
+        )
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = probabilities
+        agreement, drift = _compare(reference, probabilities)
+        labelled = (
+            targets >= 0 if targets is not None else np.zeros(len(batch), dtype=bool)
+        )
+        accuracy = (
+            float((probabilities[labelled].argmax(axis=1) == targets[labelled]).mean())
+            if labelled.any()
+            else np.nan
+        )
+        rows.append(
+            (
+                precision,
+                (precision_dir / "weights.bin").stat().st_size,
+                load_seconds,
+                len(batch) / elapsed,
+                agreement,
+                drift,
+                accuracy,
+            )
+        )
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m utils.water_quantize CALIBRATION_DIR")
+    batch, targets = calibration_set(sys.argv[1])
+    for precision, dtype in PRECISIONS.items():
+        if dtype is not None:
+            print(calibrate(precision, batch))
+    report = compare_precisions(batch, targets)
+    report.to_csv(REPORT_PATH, index=False)
+    print(report.to_string(index=False))
+    print(REPORT_PATH)
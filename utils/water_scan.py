@@ -0,0 +1,146 @@
+"""Bulk stagnant-water scanning of image folders, ZIP archives and uploads.
+
+Images are decoded and preprocessed in a thread pool (Pillow releases the
+GIL while decoding), stacked into fixed-size batches of 224x224 tensors and
+classified one batch per forward pass.  Only one batch is held in memory at
+a time, so a sweep of thousands of tiles runs in bounded memory.
+"""
+
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.water_model import load_image, preprocess
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"}
+
+DEFAULT_BATCH_SIZE = 32
+
+RESULT_COLUMNS = [
+    "image",
+    "predicted_class",
+    "confidence",
+    "has_stagnant_water",
+    "error",
+]
+
+
+def _is_image(name):
+    return Path(name).suffix.lower() in IMAGE_EXTENSIONS
+
+
+def folder_sources(folder):
+    """``(name, reader)`` pairs for every image below ``folder``."""
+    folder = Path(folder)
+    for path in sorted(folder.rglob("*")):
+        if path.is_file() and _is_image(path.name):
+            yield str(path.relative_to(folder)), path.read_bytes
+
+
+def zip_sources(archive):
+    """``(name, reader)`` pairs for every image in a ZIP (path or file-like)."""
+    members = _ZipMembers(archive)
+    with members.open() as zf:
+        names = [
+            info.filename
+            for info in zf.infolist()
+            if not info.is_dir() and _is_image(info.filename)
+        ]
+    for name in names:
+        yield name, lambda name=name: members.read(name)
+
+
+class _ZipMembers:
+    """Reads members of one archive through one open handle per thread."""
+
+    def __init__(self, archive):
+        # Uploads are copied out once per scan, not once per member
+        self.archive = archive.getvalue() if hasattr(archive, "getvalue") else archive
+        self._local = threading.local()
+
+    def open(self):
+        return zipfile.ZipFile(
+            io.BytesIO(self.archive)
+            if isinstance(self.archive, bytes)
+            else self.archive
+        )
+
+    def read(self, name):
+        zf = getattr(self._local, "zf", None)
+        if zf is None:
+            zf = self._local.zf = self.open()
+        return zf.read(name)
+
+
+def upload_sources(uploaded_files):
+    """``(name, reader)`` pairs for Streamlit uploads; ZIP uploads are expanded."""
+    for uploaded in uploaded_files:
+        if uploaded.name.lower().endswith(".zip"):
+            for name, reader in zip_sources(uploaded):
+                yield f"{uploaded.name}/{name}", reader
+        else:
+            yield uploaded.name, uploaded.getvalue
+
+
+def _decode(source, size):
+    name, reader = source
+    try:
+        return name, preprocess(load_image(reader()), size), None
+    except Exception as e:  # a corrupt tile must not abort the sweep
+        return name, None, str(e)
+
+
+def scan_images(
+    classifier, sources, batch_size=DEFAULT_BATCH_SIZE, workers=None, progress=None
+):
+    """Classify every ``(name, reader)`` in ``sources``.
+
+    Returns a DataFrame with one row per image (``RESULT_COLUMNS``); images
+    that fail to decode get an ``error`` instead of a prediction.
+    ``progress(done, total)`` is called after each batch.
+    """
+    sources = list(sources)
+    total = len(sources)
+    workers = workers or min(8, (os.cpu_count() or 1) + 4)
+    rows = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, total, batch_size):
+            chunk = sources[start : start + batch_size]
+            decoded = list(
+                pool.map(lambda source: _decode(source, classifier.image_size), chunk)
+            )
+
+            ok = [i for i, (_, _, error) in enumerate(decoded) if error is None]
+            predictions = {}
+            if ok:
+                batch = np.stack([decoded[i][1] for i in ok])
+                predictions = dict(
+                    zip(ok, classifier.results(classifier.predict_proba(batch)))
+                )
+
+            for i, (name, _, error) in enumerate(decoded):
+                if i in predictions:
+                    result = predictions[i]
+                    rows.append(
+                        (
+                            name,
+                            result["predicted_class"],
+                            result["confidence"],
+                            result["has_stagnant_water"],
+                            None,
+                        )
+                    )
+                else:
+                    rows.append((name, None, np.nan, None, error))
+
+            if progress is not None:
+                progress(min(start + batch_size, total), total)
+
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)